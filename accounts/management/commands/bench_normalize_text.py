@@ -0,0 +1,47 @@
+import random
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.text import _normalize, _strip_accents, normalize_text
+
+NOMBRES = ['José', 'María', 'Íñigo', 'Begoña', 'Raúl', 'Lucía', 'Adrián', 'Nerea', 'Óscar', 'Zoë', 'Joan', 'Àngels']
+APELLIDOS = ['Pérez', 'Núñez', 'García', 'Fernández', 'Muñoz', 'López', 'Güell', 'Martínez', 'Ibáñez', 'Sánchez', 'de la Fuente']
+
+
+class Command(BaseCommand):
+    help = 'Compara normalize_text (tabla + caché) con la versión anterior basada en NFD'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--names', type=int, default=500, help='Nombres distintos a generar')
+        parser.add_argument('--calls', type=int, default=20000, help='Llamadas por medición')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        names = [
+            f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}"
+            for _ in range(options['names'])
+        ]
+        # Como en los juegos: muchas llamadas repetidas sobre pocos nombres
+        calls = [rng.choice(names) for _ in range(options['calls'])]
+
+        for text in names:
+            if normalize_text(text) != _strip_accents(text):
+                raise CommandError(f"Resultado distinto para {text!r}")
+
+        def run(func):
+            return min(timeit.repeat(lambda: [func(t) for t in calls], number=1, repeat=5))
+
+        legacy = run(_strip_accents)
+        _normalize.cache_clear()
+        cold = run(_normalize.__wrapped__)
+        cached = run(normalize_text)
+
+        per_call = lambda seconds: seconds / len(calls) * 1e6
+        self.stdout.write(f"{len(calls)} llamadas sobre {len(names)} nombres distintos")
+        self.stdout.write(f"  NFD + categoría (anterior): {per_call(legacy):.2f} µs/llamada")
+        self.stdout.write(f"  Tabla translate, sin caché: {per_call(cold):.2f} µs/llamada ({legacy / cold:.1f}x)")
+        self.stdout.write(self.style.SUCCESS(
+            f"  Tabla translate + LRU:      {per_call(cached):.2f} µs/llamada ({legacy / cached:.1f}x)"
+        ))
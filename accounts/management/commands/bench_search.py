@@ -0,0 +1,71 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from accounts.models import UserProfile
+from accounts.search import _backend, search_profiles
+from accounts.text import build_answer_keys, build_search_text
+
+NOMBRES = ['José', 'María', 'Íñigo', 'Begoña', 'Raúl', 'Lucía', 'Adrián', 'Nerea', 'Óscar', 'Zoë', 'Joan', 'Àngels']
+APELLIDOS = ['Pérez', 'Núñez', 'García', 'Fernández', 'Muñoz', 'López', 'Güell', 'Martínez', 'Ibáñez', 'Sánchez']
+ZONAS = ['Alicante', 'Elche', 'San Vicente', 'Sant Joan', 'Mutxamel', 'El Campello']
+BUSQUEDAS = ['jose', 'maria perez', 'nunez', 'inigo', 'garcia elche', 'zoe', 'fernandez lucia', 'campello']
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el buscador de perfiles (search_profiles) contra icontains con N perfiles de prueba. '
+        'Todo se hace en una transacción que se deshace al final.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=5, help='Veces que se repite cada búsqueda')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            started = time.perf_counter()
+            profiles = []
+            for i in range(options['profiles']):
+                profile = UserProfile(
+                    username=f'bench-{i}', role='student', residence_area=rng.choice(ZONAS),
+                    full_name=f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}",
+                )
+                profile.answer_keys = build_answer_keys(getattr(profile, f) for f in UserProfile.ANSWER_KEY_FIELDS)
+                profile.search_text = build_search_text(getattr(profile, f) for f in UserProfile.SEARCH_TEXT_FIELDS)
+                profiles.append(profile)
+            UserProfile.objects.bulk_create(profiles, batch_size=2000)
+            del profiles
+            self.stdout.write(f"{options['profiles']} perfiles creados en {time.perf_counter() - started:.1f}s")
+
+            students = UserProfile.objects.filter(role='student')
+            self.stdout.write(f"Índice: {_backend(students)} ({connection.vendor})")
+            for query in BUSQUEDAS:
+                def ranked():
+                    return list(search_profiles(students, query).values_list('id', flat=True)[:20])
+
+                def legacy():
+                    # Lo de antes: icontains de cada columna (y sin quitar tildes)
+                    return list(students.filter(
+                        Q(nickname__icontains=query) | Q(full_name__icontains=query) | Q(residence_area__icontains=query)
+                    ).values_list('id', flat=True)[:20])
+
+                timings = {}
+                for name, func in (('buscador', ranked), ('icontains', legacy)):
+                    runs = []
+                    for _ in range(options['repeat']):
+                        started = time.perf_counter()
+                        found = func()
+                        runs.append((time.perf_counter() - started) * 1000)
+                    timings[name] = (min(runs), len(found))
+                self.stdout.write(
+                    f"  {query!r:20} buscador {timings['buscador'][0]:7.1f} ms ({timings['buscador'][1]} resultados) · "
+                    f"icontains {timings['icontains'][0]:7.1f} ms ({timings['icontains'][1]} resultados)"
+                )
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('Perfiles de prueba descartados.'))
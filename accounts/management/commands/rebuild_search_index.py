@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from accounts.models import UserProfile
+from accounts.search import drop_search_index, install_search_index
+from accounts.text import build_search_text
+
+
+class Command(BaseCommand):
+    help = 'Recalcula search_text de todos los perfiles y vuelve a crear el índice del buscador'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        fields = UserProfile.SEARCH_TEXT_FIELDS
+        profiles = UserProfile.objects.using(options['database']).only('id', 'search_text', *fields).order_by('id')
+        batch, changed = [], 0
+        for profile in profiles.iterator(chunk_size=options['batch_size']):
+            text = build_search_text(getattr(profile, f) for f in fields)
+            if text != profile.search_text:
+                profile.search_text = text
+                batch.append(profile)
+            if len(batch) >= options['batch_size']:
+                UserProfile.objects.using(options['database']).bulk_update(batch, ['search_text'])
+                changed, batch = changed + len(batch), []
+        UserProfile.objects.using(options['database']).bulk_update(batch, ['search_text'])
+        changed += len(batch)
+
+        connection = connections[options['database']]
+        drop_search_index(connection)
+        if install_search_index(connection):
+            self.stdout.write(self.style.SUCCESS(
+                f"{changed} perfiles actualizados; índice de búsqueda creado ({connection.vendor})."
+            ))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f"{changed} perfiles actualizados; esta base de datos no tiene índice de búsqueda (LIKE sin índice)."
+            ))
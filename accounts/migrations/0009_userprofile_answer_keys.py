@@ -0,0 +1,64 @@
+# Generated by Django 4.2.27 on 2026-10-18 15:31
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+ANSWER_KEY_FIELDS = ('username', 'first_name', 'last_name', 'full_name', 'nickname')
+
+# Copia de accounts/text.py tal como estaba al crear la migración: si aquel
+# módulo cambia, la migración sigue haciendo lo mismo
+NAME_PARTICLES = frozenset({'DE', 'DEL', 'LA', 'LAS', 'LOS', 'Y', 'E', 'I'})
+NAME_TOKEN_RE = re.compile(r'\w+')
+
+
+def normalize_text(text):
+    if not text:
+        return ''
+    return ''.join(c for c in unicodedata.normalize('NFD', text) if unicodedata.category(c) != 'Mn').upper()
+
+
+def build_answer_keys(values):
+    keys = {}
+    for value in values:
+        tokens = NAME_TOKEN_RE.findall(normalize_text(value))
+        if not tokens:
+            continue
+        keys[' '.join(tokens)] = None
+        if len(tokens) > 1:
+            for token in tokens:
+                if len(token) > 1 and token not in NAME_PARTICLES:
+                    keys[token] = None
+    return list(keys)
+
+
+def fill_answer_keys(apps, schema_editor):
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+    profiles = list(UserProfile.objects.only('id', *ANSWER_KEY_FIELDS))
+    for profile in profiles:
+        profile.answer_keys = build_answer_keys(getattr(profile, f) for f in ANSWER_KEY_FIELDS)
+    UserProfile.objects.bulk_update(profiles, ['answer_keys'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_userprofile_favorite_place'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='answer_keys',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        # No tiene que ver con answer_keys: es el cambio de favorite_place que el
+        # modelo ya tenía pendiente (makemigrations lo detectaba) y se generó aquí
+        migrations.AlterField(
+            model_name='userprofile',
+            name='favorite_place',
+            field=models.CharField(blank=True, db_column='favorite_place', max_length=255, null=True, verbose_name='Lugar favorito'),
+        ),
+        migrations.RunPython(fill_answer_keys, migrations.RunPython.noop),
+    ]
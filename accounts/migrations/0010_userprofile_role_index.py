@@ -0,0 +1,17 @@
+# Generated by Django 4.2.27 on 2026-10-18 15:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_userprofile_answer_keys'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['role', 'id'], name='userprofile_role_id_idx'),
+        ),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 4.2.27 on 2026-10-18 16:06
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+SEARCH_TEXT_FIELDS = ('username', 'first_name', 'last_name', 'full_name', 'nickname', 'residence_area')
+
+# Copias de accounts/text.py y accounts/search.py tal como estaban al crear la
+# migración: si aquellos módulos cambian, la migración sigue haciendo lo mismo
+NAME_TOKEN_RE = re.compile(r'\w+')
+PROFILE_TABLE = 'accounts_userprofile'
+FTS_TABLE = 'accounts_userprofile_fts'
+TRIGRAM_INDEX = 'userprofile_search_trgm'
+
+INDEX_SQL = {
+    'postgresql': [
+        'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+        f'CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON {PROFILE_TABLE} USING gin (search_text gin_trgm_ops)',
+    ],
+    'sqlite': [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"search_text, content='{PROFILE_TABLE}', content_rowid='id')",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {PROFILE_TABLE} BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {PROFILE_TABLE} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text); END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF search_text ON {PROFILE_TABLE} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text); "
+        f"INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END",
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+    ],
+}
+DROP_INDEX_SQL = {
+    'postgresql': [f'DROP INDEX IF EXISTS {TRIGRAM_INDEX}'],
+    'sqlite': [
+        *(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}' for suffix in ('ai', 'ad', 'au')),
+        f'DROP TABLE IF EXISTS {FTS_TABLE}',
+    ],
+}
+
+
+def normalize_text(text):
+    if not text:
+        return ''
+    return ''.join(c for c in unicodedata.normalize('NFD', text) if unicodedata.category(c) != 'Mn').upper()
+
+
+def build_search_text(values):
+    words = {}
+    for value in values:
+        for token in NAME_TOKEN_RE.findall(normalize_text(value)):
+            words[token] = None
+    return ' '.join(words)
+
+
+def fill_search_text(apps, schema_editor):
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+    profiles = list(UserProfile.objects.only('id', *SEARCH_TEXT_FIELDS))
+    for profile in profiles:
+        profile.search_text = build_search_text(getattr(profile, f) for f in SEARCH_TEXT_FIELDS)
+    UserProfile.objects.bulk_update(profiles, ['search_text'], batch_size=500)
+
+
+def create_search_index(apps, schema_editor):
+    # Trigramas en Postgres, FTS5 en SQLite (ver accounts/search.py)
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if not cursor.fetchone()[0]:
+                return
+        for sql in INDEX_SQL.get(connection.vendor, ()):
+            cursor.execute(sql)
+
+
+def remove_search_index(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for sql in DROP_INDEX_SQL.get(schema_editor.connection.vendor, ()):
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_userprofile_role_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, remove_search_index),
+    ]
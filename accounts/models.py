@@ -2,6 +2,8 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 from cloudinary.models import CloudinaryField
 
+from .text import build_answer_keys, build_search_text
+
 class UserProfile(AbstractUser):
     ROLE_CHOICES = (
         ('student', 'Alumno'),
@@ -56,6 +58,37 @@ class UserProfile(AbstractUser):
         help_text="Pega aquí el enlace de la canción (Compartir > Copiar enlace de canción)"
     )
 
+    # --- ÍNDICE DE NOMBRES PARA LOS MINIJUEGOS ---
+    # Formas normalizadas del nombre (completas y por palabras), calculadas al
+    # guardar para no normalizar en cada respuesta de "Adivina quién"
+    ANSWER_KEY_FIELDS = ('username', 'first_name', 'last_name', 'full_name', 'nickname')
+    answer_keys = models.JSONField(default=list, blank=True, editable=False)
+
+    # --- TEXTO DEL BUSCADOR ---
+    # Nombres y zona sin tildes y en mayúsculas, en una sola columna con su
+    # índice (trigramas en Postgres, FTS5 en SQLite; ver accounts/search.py)
+    SEARCH_TEXT_FIELDS = ('username', 'first_name', 'last_name', 'full_name', 'nickname', 'residence_area')
+    search_text = models.TextField(blank=True, default='', editable=False)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Buscador de alumnos de los profesores: filtra por rol y pagina por id
+            models.Index(fields=['role', 'id'], name='userprofile_role_id_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        derived = set()
+        if update_fields is None or set(update_fields) & set(self.ANSWER_KEY_FIELDS):
+            self.answer_keys = build_answer_keys(getattr(self, f) for f in self.ANSWER_KEY_FIELDS)
+            derived.add('answer_keys')
+        if update_fields is None or set(update_fields) & set(self.SEARCH_TEXT_FIELDS):
+            self.search_text = build_search_text(getattr(self, f) for f in self.SEARCH_TEXT_FIELDS)
+            derived.add('search_text')
+        if update_fields is not None and derived:
+            kwargs['update_fields'] = {*update_fields, *derived}
+        super().save(*args, **kwargs)
+
     @property
     def spotify_embed_url(self):
         """
@@ -0,0 +1,159 @@
+"""
+Buscador de perfiles (compañeros de clase, selector de alumnos del profesor).
+
+Se buscaba con icontains sobre varias columnas unidas con OR: recorrido
+secuencial de la tabla y "Jose" no encontraba a "José". Ahora cada perfil
+guarda en search_text sus nombres normalizados (sin tildes y en mayúsculas,
+ver UserProfile.save) y la búsqueda va contra esa columna:
+
+- en Postgres, con un índice GIN de trigramas (pg_trgm): cada palabra se
+  busca con LIKE '%PALABRA%' y los resultados se ordenan por
+  word_similarity;
+- en SQLite (desarrollo), con una tabla FTS5 sobre la columna, mantenida con
+  triggers: cada palabra se busca como prefijo de una palabra y se ordena
+  por bm25;
+- si no hay ninguno de los dos (otra base de datos, SQLite sin FTS5), LIKE
+  sobre search_text sin índice: al menos sin tildes.
+
+El índice se crea en la migración accounts/0011; rebuild_search_index lo
+vuelve a crear. En SQLite, si una migración rehace la tabla de perfiles, los
+triggers se pierden con ella: mientras falte alguno la búsqueda usa LIKE, y
+al terminar migrate se vuelven a instalar (accounts/signals.py).
+"""
+from django.db import connections
+from django.db.models import FloatField, Func, Q, Value
+
+from .text import NAME_TOKEN_RE, normalize_text
+
+PROFILE_TABLE = 'accounts_userprofile'
+FTS_TABLE = 'accounts_userprofile_fts'
+TRIGRAM_INDEX = 'userprofile_search_trgm'
+
+POSTGRES_INDEX_SQL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    f'CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON {PROFILE_TABLE} USING gin (search_text gin_trgm_ops)',
+]
+SQLITE_INDEX_SQL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"search_text, content='{PROFILE_TABLE}', content_rowid='id')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {PROFILE_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {PROFILE_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF search_text ON {PROFILE_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+FTS_TRIGGERS = [f'{FTS_TABLE}_{suffix}' for suffix in ('ai', 'ad', 'au')]
+DROP_INDEX_SQL = {
+    'postgresql': [f'DROP INDEX IF EXISTS {TRIGRAM_INDEX}'],
+    'sqlite': [
+        *(f'DROP TRIGGER IF EXISTS {trigger}' for trigger in FTS_TRIGGERS),
+        f'DROP TABLE IF EXISTS {FTS_TABLE}',
+    ],
+}
+
+
+class WordSimilarity(Func):
+    # pg_trgm: parecido entre la búsqueda y la palabra más parecida del texto
+    function = 'WORD_SIMILARITY'
+    output_field = FloatField()
+
+
+def search_terms(query):
+    """Palabras normalizadas de lo que ha escrito el usuario."""
+    return NAME_TOKEN_RE.findall(normalize_text(query or ''))
+
+
+def _sqlite_has_fts(connection):
+    # La tabla sola no basta: sin los triggers se queda desfasada
+    names = [FTS_TABLE, *FTS_TRIGGERS]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT COUNT(*) FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(names))})", names
+        )
+        return cursor.fetchone()[0] == len(names)
+
+
+def search_index_installed(connection):
+    """True si el índice de esta base de datos está completo."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1 FROM pg_indexes WHERE indexname = %s', [TRIGRAM_INDEX])
+            return cursor.fetchone() is not None
+    if connection.vendor == 'sqlite':
+        return _sqlite_has_fts(connection)
+    return False
+
+
+def _backend(queryset):
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        return 'trigram'
+    if connection.vendor == 'sqlite' and _sqlite_has_fts(connection):
+        return 'fts'
+    return 'like'
+
+
+def _fts_match(terms):
+    # Cada palabra como prefijo; las comillas evitan que FTS5 lea AND, OR, NEAR...
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_profiles(queryset, query, ranked=True):
+    """
+    Filtra queryset (de UserProfile) por la búsqueda; con ranked, además lo
+    ordena del más al menos parecido. Una búsqueda vacía no filtra nada.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset
+    backend = _backend(queryset)
+
+    if backend == 'fts':
+        # Unión con la tabla FTS5 (no hay forma de expresarla con el ORM): el
+        # MATCH se hace una vez y rank (bm25, cuanto más negativo mejor) sale
+        # de la misma fila
+        queryset = queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = {PROFILE_TABLE}.id', f'{FTS_TABLE} MATCH %s'],
+            params=[_fts_match(terms)],
+        )
+        if ranked:
+            queryset = queryset.extra(select={'search_rank': f'{FTS_TABLE}.rank'}).order_by('search_rank', 'id')
+        return queryset
+
+    condition = Q()
+    for term in terms:
+        condition &= Q(search_text__contains=term)
+    queryset = queryset.filter(condition)
+    if ranked and backend == 'trigram':
+        queryset = queryset.annotate(
+            search_rank=WordSimilarity(Value(' '.join(terms)), 'search_text')
+        ).order_by('-search_rank', 'id')
+    return queryset
+
+
+def install_search_index(connection):
+    """Crea el índice de búsqueda de esta base de datos (si lo tiene); devuelve si se ha creado."""
+    if connection.vendor == 'postgresql':
+        statements = POSTGRES_INDEX_SQL
+    elif connection.vendor == 'sqlite':
+        statements = SQLITE_INDEX_SQL
+    else:
+        return False
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if not cursor.fetchone()[0]:
+                return False
+        for sql in statements:
+            cursor.execute(sql)
+    return True
+
+
+def drop_search_index(connection):
+    with connection.cursor() as cursor:
+        for sql in DROP_INDEX_SQL.get(connection.vendor, ()):
+            cursor.execute(sql)
@@ -0,0 +1,22 @@
+from django.db import connections
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
+
+from .search import drop_search_index, install_search_index, search_index_installed
+
+SEARCH_INDEX_MIGRATION = ('accounts', '0011_userprofile_search_text')
+
+
+@receiver(post_migrate)
+def restore_search_index(sender, using, **kwargs):
+    # Una migración que rehace accounts_userprofile (SQLite) se lleva los
+    # triggers del índice; se vuelve a crear si falta algo
+    if sender.name != 'accounts':
+        return
+    connection = connections[using]
+    if SEARCH_INDEX_MIGRATION not in MigrationRecorder(connection).applied_migrations():
+        return  # Aún no existe search_text (o se ha deshecho la migración)
+    if not search_index_installed(connection):
+        drop_search_index(connection)
+        install_search_index(connection)
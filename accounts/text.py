@@ -0,0 +1,91 @@
+"""
+Utilidades de texto compartidas: normalización de nombres y claves de
+respuesta precalculadas para los juegos de adivinar nombres.
+
+normalize_text se llama con los mismos nombres una y otra vez (objetivos del
+ahorcado, respuestas, claves). En vez de descomponer (NFD) y mirar la categoría
+Unicode de cada carácter, el caso normal (letras latinas con o sin tilde) se
+resuelve con un único str.translate sobre una tabla precalculada, y los
+resultados se guardan en una caché LRU. Solo si queda algún carácter fuera de
+la tabla se usa la versión general, que da exactamente el mismo resultado.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+# Palabras de enlace que no identifican a nadie por sí solas ("de la Fuente")
+NAME_PARTICLES = frozenset({'DE', 'DEL', 'LA', 'LAS', 'LOS', 'Y', 'E', 'I'})
+NAME_TOKEN_RE = re.compile(r'\w+')
+NORMALIZE_CACHE_SIZE = 4096
+
+
+def _strip_accents(text):
+    """Versión general: descompone (NFD) y quita las marcas diacríticas."""
+    return ''.join(
+        c for c in unicodedata.normalize('NFD', text)
+        if unicodedata.category(c) != 'Mn'
+    ).upper()
+
+
+def _build_accent_table():
+    # Minúsculas ASCII y todo el rango latino con tildes (Latin-1 y Latin
+    # Extended-A: á, ñ, ü, ç, à, ł...). Solo entran los caracteres cuyo
+    # resultado es ASCII; el resto se deja para la versión general.
+    table = {ord(c): c.upper() for c in 'abcdefghijklmnopqrstuvwxyz'}
+    for code in range(0xC0, 0x180):
+        plain = _strip_accents(chr(code))
+        if plain.isascii() and plain != chr(code):
+            table[code] = plain
+    return table
+
+
+ACCENT_TABLE = _build_accent_table()
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize(text):
+    plain = text.translate(ACCENT_TABLE)
+    if plain.isascii():
+        return plain
+    # Quedan caracteres fuera de la tabla (marcas combinadas sueltas, otros alfabetos)
+    return _strip_accents(plain)
+
+
+def normalize_text(text):
+    """Elimina tildes y convierte a mayúsculas."""
+    if not text: return ""
+    return _normalize(text)
+
+
+def name_tokens(text):
+    """Palabras normalizadas de un nombre, sin signos de puntuación."""
+    return NAME_TOKEN_RE.findall(normalize_text(text))
+
+
+def build_answer_keys(values):
+    """
+    Claves normalizadas con las que se acepta un nombre como respuesta.
+
+    Incluye cada valor completo ("JOSE PEREZ") y cada una de sus palabras
+    significativas ("JOSE", "PEREZ"), sin repetir y en orden.
+    """
+    keys = {}
+    for value in values:
+        tokens = name_tokens(value)
+        if not tokens:
+            continue
+        keys[' '.join(tokens)] = None
+        if len(tokens) > 1:
+            for token in tokens:
+                if len(token) > 1 and token not in NAME_PARTICLES:
+                    keys[token] = None
+    return list(keys)
+
+
+def build_search_text(values):
+    """Palabras normalizadas de todos los valores, sin repetir: la columna del buscador."""
+    words = {}
+    for value in values:
+        for token in name_tokens(value):
+            words[token] = None
+    return ' '.join(words)
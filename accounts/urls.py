@@ -10,6 +10,7 @@ urlpatterns = [
     path('alumno/editar/', views.edit_student_profile, name='edit_student_profile'),
     path('alumno/perfil/', views.view_student_profile, name='view_student_profile'),
     path('alumno/clase/', views.public_classmates_list, name='classmates_list'),
+    path('alumno/clase/buscar/', views.classmates_search, name='classmates_search'),
     path('alumno/perfil-publico/<int:student_id>/', views.public_student_profile, name='public_student_profile'),
     path('perfil/', views.view_profile, name='view_profile'),
     # NUEVA RUTA
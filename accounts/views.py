@@ -4,7 +4,12 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from .forms import RegisterForm, StudentProfileForm
 from .models import UserProfile
+from .search import search_profiles, search_terms
 from django.db.models import Q
+from django.http import JsonResponse
+from teachers.dashboard import teacher_dashboard
+
+CLASSMATE_SUGGESTIONS = 8
 
 def register_view(request):
     if request.method == 'POST':
@@ -45,7 +50,7 @@ def student_home(request):
 def teacher_home(request):
     if request.user.role != 'teacher':
         return redirect('student_home')
-    return render(request, 'accounts/teacher_home.html')
+    return render(request, 'accounts/teacher_home.html', {'groups': teacher_dashboard(request.user.id)})
 
 @login_required
 def edit_student_profile(request):
@@ -72,41 +77,46 @@ def view_student_profile(request):
         'student': request.user
     })
 
+def _classmates_of(user):
+    from teachers.models import ClassGroup
+    # Perfiles compartidos de los alumnos de mis grupos (sin mí)
+    return UserProfile.objects.filter(
+        student_groups__in=ClassGroup.objects.filter(students=user),
+        share_with_class=True
+    ).exclude(id=user.id).distinct()
+
 @login_required
 def public_classmates_list(request):
     if request.user.role != 'student':
         return redirect('teacher_home')
 
-    from teachers.models import ClassGroup
-    from django.db.models import Q
-
-    # 1. Buscamos los grupos donde está metido el alumno actual
-    mis_grupos = ClassGroup.objects.filter(students=request.user)
-
-    if not mis_grupos.exists():
+    if not request.user.student_groups.exists():
         return render(request, 'accounts/classmates_list.html', {'classmates': [], 'no_group': True})
 
-    # 2. Obtenemos los perfiles que pertenecen a esos grupos directamente
-    # Filtramos UserProfile que estén en la relación 'students' de mis_grupos
-    classmates = UserProfile.objects.filter(
-        student_groups__in=mis_grupos,
-        share_with_class=True
-    ).exclude(id=request.user.id).distinct()
-
-    # 3. Lógica de buscador
-    query = request.GET.get('q')
-    if query:
-        classmates = classmates.filter(
-            Q(nickname__icontains=query) | 
-            Q(full_name__icontains=query) |
-            Q(residence_area__icontains=query)
-        )
+    # Buscador: sin tildes, con índice y los más parecidos primero (ver accounts/search.py)
+    query = request.GET.get('q', '').strip()
+    classmates = search_profiles(_classmates_of(request.user), query)
 
     return render(request, 'accounts/classmates_list.html', {
         'classmates': classmates,
         'query': query
     })
 
+@login_required
+def classmates_search(request):
+    # JSON para las sugerencias del buscador de compañeros: ?q=texto
+    if request.user.role != 'student':
+        return JsonResponse({'error': 'Solo para alumnos'}, status=403)
+
+    query = request.GET.get('q', '')
+    rows = []
+    if search_terms(query):
+        rows = search_profiles(_classmates_of(request.user), query).values('id', 'username', 'nickname', 'full_name')
+    return JsonResponse({'results': [
+        {'id': r['id'], 'name': r['nickname'] or r['username'], 'full_name': r['full_name'] or ''}
+        for r in rows[:CLASSMATE_SUGGESTIONS]
+    ]})
+
 @login_required
 def public_student_profile(request, student_id):
     from teachers.models import ClassGroup
@@ -147,23 +157,21 @@ def join_group_by_code(request):
         return redirect('teacher_home')
 
     if request.method == 'POST':
-        code = request.POST.get('invite_code', '').strip().upper()
-        from teachers.models import ClassGroup
-        
-        try:
-            # Buscamos el grupo que tenga ese código único
-            group = ClassGroup.objects.get(invite_code=code)
-            
-            # Si el alumno ya está en el grupo, avisamos
-            if group.students.filter(id=request.user.id).exists():
-                messages.info(request, f"Ya eres miembro del grupo: {group.name}")
-            else:
-                group.students.add(request.user)
-                messages.success(request, f"Te has unido con éxito al grupo: {group.name}")
-            
+        from teachers.invite_codes import is_valid_invite_code, normalize_invite_code
+        from teachers.joining import ALREADY_MEMBER, JOINED, RATE_LIMITED, join_with_code
+        code = normalize_invite_code(request.POST.get('invite_code', ''))
+
+        # Una errata en un código nuevo se detecta sin ir a la base de datos
+        status, group = join_with_code(request.user, code) if is_valid_invite_code(code) else (None, None)
+        if status == JOINED:
+            messages.success(request, f"Te has unido con éxito al grupo: {group.name}")
             return redirect('classmates_list')
-            
-        except ClassGroup.DoesNotExist:
-            messages.error(request, "El código introducido no es válido.")
-            
+        if status == ALREADY_MEMBER:
+            messages.info(request, f"Ya eres miembro del grupo: {group.name}")
+            return redirect('classmates_list')
+        if status == RATE_LIMITED:
+            messages.error(request, "Demasiados intentos. Espera un minuto y vuelve a probar.")
+            return render(request, 'accounts/join_group.html', status=429)
+        messages.error(request, "El código introducido no es válido.")
+
     return render(request, 'accounts/join_group.html')
\ No newline at end of file
@@ -1,3 +1,28 @@
 from django.contrib import admin
+from .models import ContentEntry, ContentPack, GameScore
 
-# Register your models here.
+@admin.register(GameScore)
+class GameScoreAdmin(admin.ModelAdmin):
+    list_display = ('player', 'group', 'game', 'correct', 'total', 'best_streak', 'updated_at')
+    list_filter = ('game', 'group')
+    search_fields = ('player__username', 'player__full_name')
+
+
+class ContentEntryInline(admin.TabularInline):
+    model = ContentEntry
+    extra = 5
+    fields = ('category', 'text', 'hint', 'order')
+
+
+@admin.register(ContentPack)
+class ContentPackAdmin(admin.ModelAdmin):
+    list_display = ('name', 'game', 'is_active', 'version', 'created_by', 'updated_at')
+    list_filter = ('game', 'is_active')
+    search_fields = ('name', 'entries__text')
+    readonly_fields = ('version',)
+    inlines = [ContentEntryInline]
+
+    def save_model(self, request, obj, form, change):
+        if not change and obj.created_by_id is None:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MinigamesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'minigames'
+
+    def ready(self):
+        # Registra los receptores que invalidan la caché de alumnos por grupo
+        from . import signals  # noqa: F401
@@ -0,0 +1,63 @@
+"""
+Fichas de alumnos para los juegos basados en resultados de los tests.
+
+Antes cada opción del juego hacía dos consultas a UserResult (VARK y Chapman)
+más dos búsquedas del Questionnaire por título en cada petición. Aquí las
+fichas de cualquier lista de alumnos se cargan en una sola consulta, con los
+resultados dominantes anotados mediante subconsultas.
+"""
+from datetime import date
+
+from accounts.models import UserProfile
+from quizzes.constants import CHAPMAN_CHOICES, VARK_CHOICES
+from quizzes.services import dominant_category
+
+CARD_FIELDS = (
+    'id', 'username', 'full_name', 'profile_picture', 'date_of_birth',
+    'favorite_artist', 'motivation',
+)
+VARK_LABELS = dict(VARK_CHOICES)
+CHAPMAN_LABELS = dict(CHAPMAN_CHOICES)
+
+
+def calculate_age(birth_date):
+    if not birth_date: return "desconocida"
+    today = date.today()
+    return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
+
+
+def picture_url(student):
+    return student.profile_picture.url if student.profile_picture else None
+
+
+def load_student_cards(student_ids):
+    """Devuelve {id: ficha} con datos de perfil y resultados de VARK y Chapman."""
+    students = (
+        UserProfile.objects.filter(id__in=student_ids)
+        .only(*CARD_FIELDS)
+        .annotate(vark=dominant_category('vark'), chapman=dominant_category('chapman'))
+    )
+    return {
+        s.id: {
+            'student': s,
+            'student_id': s.id,
+            'full_name': s.full_name or s.username,
+            'picture': picture_url(s),
+            'age': calculate_age(s.date_of_birth),
+            'favorite_artist': s.favorite_artist,
+            'motivation': s.motivation,
+            'vark': s.vark,
+            'vark_label': VARK_LABELS.get(s.vark),
+            'chapman': s.chapman,
+            'chapman_label': CHAPMAN_LABELS.get(s.chapman),
+        }
+        for s in students
+    }
+
+
+def results_description(card):
+    """Texto de la opción en "Adivina Tests" (la plantilla lo parte por el punto)."""
+    return (
+        f"Estilo VARK: {card['vark_label'] or 'Pendiente'}. "
+        f"Lenguaje amor: {card['chapman_label'] or 'Pendiente'}"
+    )
@@ -0,0 +1,82 @@
+"""
+Paquetes de palabras de El Impostor y Charadas ya compilados.
+
+Las vistas construían en cada petición la lista del Impostor y el diccionario
+de Charadas (más un json.dumps para incrustarlo en la página). Ahora las
+palabras están en ContentPack/ContentEntry y cada paquete activo se compila una
+vez: los datos en Python para las vistas y el JSON ya serializado, con su ETag
+(hash del contenido), para el endpoint. Todo se guarda en la caché por juego y
+se invalida desde minigames/signals.py cuando cambia un paquete o sus palabras.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.urls import reverse
+
+CONTENT_CACHE_TIMEOUT = 60 * 60 * 24  # Las señales invalidan antes si hay cambios
+
+
+def content_cache_key(game):
+    return f'minigames:content:{game}'
+
+
+class CompiledPack:
+    """Paquete listo para servir: datos, JSON serializado y ETag."""
+
+    __slots__ = ('id', 'game', 'name', 'version', 'data', 'body', 'fingerprint')
+
+    def __init__(self, pack, entries):
+        self.id = pack.id
+        self.game = pack.game
+        self.name = pack.name
+        self.version = pack.version
+        if pack.game == 'charadas':
+            categories = {}
+            for entry in entries:
+                categories.setdefault(entry.category, []).append(entry.text)
+            self.data = {'categories': categories}
+        else:
+            # Mismas claves que usaba la vista del Impostor
+            self.data = {'entries': [{'tema': e.category, 'p': e.text, 'i': e.hint} for e in entries]}
+        payload = {'id': self.id, 'game': self.game, 'name': self.name, 'version': self.version, **self.data}
+        self.body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode()
+        self.fingerprint = hashlib.sha256(self.body).hexdigest()[:32]
+
+    @property
+    def etag(self):
+        return f'"{self.fingerprint}"'
+
+    @property
+    def url(self):
+        # La huella en la URL permite cachear la respuesta sin caducidad
+        return f"{reverse('content_pack', args=[self.game, self.id])}?v={self.fingerprint[:12]}"
+
+    @property
+    def categories(self):
+        return list(self.data.get('categories', ()))
+
+
+def load_game_content(game):
+    """Paquetes activos del juego, compilados y cacheados."""
+    key = content_cache_key(game)
+    packs = cache.get(key)
+    if packs is None:
+        from .models import ContentPack
+
+        packs = [
+            CompiledPack(pack, pack.entries.all())
+            for pack in ContentPack.objects.filter(game=game, is_active=True).prefetch_related('entries')
+        ]
+        cache.set(key, packs, CONTENT_CACHE_TIMEOUT)
+    return packs
+
+
+def get_compiled_pack(game, pack_id):
+    return next((p for p in load_game_content(game) if p.id == pack_id), None)
+
+
+def invalidate_game_content(games):
+    keys = [content_cache_key(game) for game in games]
+    if keys:
+        cache.delete_many(keys)
@@ -0,0 +1,111 @@
+"""
+Motor del ahorcado.
+
+Las letras ya probadas se guardan como una máscara de bits sobre el alfabeto
+español de 27 letras (con la Ñ): comprobar una letra es una operación de bits
+y el estado de la partida cabe en dos enteros, [id del alumno, máscara y
+fallos empaquetados], en lugar de la lista de letras y el nombre completo.
+
+De cada nombre objetivo se precalcula (y se cachea) la máscara de sus letras y
+las posiciones de cada una, así al acertar solo se destapan esas posiciones.
+"""
+from functools import lru_cache
+
+from accounts.text import normalize_text
+
+ALPHABET = "ABCDEFGHIJKLMNÑOPQRSTUVWXYZ"
+LETTER_BITS = {letter: 1 << i for i, letter in enumerate(ALPHABET)}
+MASK_BITS = len(ALPHABET)
+MAX_INCORRECT = 6
+
+
+def hangman_target(name):
+    """Nombre en mayúsculas y sin tildes, pero conservando la Ñ."""
+    return 'Ñ'.join(normalize_text(part) for part in (name or '').upper().split('Ñ'))
+
+
+@lru_cache(maxsize=1024)
+def target_layout(target):
+    """Máscara de letras del nombre y posiciones de cada letra."""
+    mask, positions = 0, {}
+    for i, c in enumerate(target):
+        bit = LETTER_BITS.get(c)
+        if bit:
+            mask |= bit
+            positions.setdefault(c, []).append(i)
+    return mask, {c: tuple(p) for c, p in positions.items()}
+
+
+class HangmanEngine:
+    """Una partida de ahorcado sobre el nombre de un alumno."""
+
+    __slots__ = ('target_id', 'target', 'guessed', 'incorrect', '_mask', '_positions', '_display')
+
+    def __init__(self, target_id, target, guessed=0, incorrect=0):
+        self.target_id = target_id
+        self.target = target
+        self.guessed = guessed
+        self.incorrect = incorrect
+        self._mask, self._positions = target_layout(target)
+        # Los caracteres que no son letras del alfabeto (espacios, guiones) se ven siempre
+        self._display = [c if c not in self._positions else '_' for c in target]
+        for letter, positions in self._positions.items():
+            if guessed & LETTER_BITS[letter]:
+                self._reveal(positions, letter)
+
+    # --- Serialización ---
+    def to_state(self):
+        return [self.target_id, self.guessed | (self.incorrect << MASK_BITS)]
+
+    @classmethod
+    def from_state(cls, state, roster):
+        """Reconstruye la partida; None si el estado no vale o el alumno ya no está en el grupo."""
+        try:
+            target_id, packed = state
+            packed = int(packed)
+        except (TypeError, ValueError):
+            return None
+        name = roster.display_name(target_id)
+        if not name:
+            return None
+        return cls(target_id, hangman_target(name), packed & ((1 << MASK_BITS) - 1), packed >> MASK_BITS)
+
+    # --- Juego ---
+    def _reveal(self, positions, letter):
+        for i in positions:
+            self._display[i] = letter
+
+    @property
+    def won(self):
+        return self.guessed & self._mask == self._mask
+
+    @property
+    def lost(self):
+        return self.incorrect >= MAX_INCORRECT
+
+    @property
+    def game_over(self):
+        return self.won or self.lost
+
+    @property
+    def displayed(self):
+        return ''.join(self._display)
+
+    @property
+    def used_letters(self):
+        return [letter for letter in ALPHABET if self.guessed & LETTER_BITS[letter]]
+
+    def guess(self, letter):
+        """
+        Prueba una letra. Devuelve True si está en el nombre, False si no y
+        None si la jugada no cuenta (partida acabada, letra repetida o inválida).
+        """
+        bit = LETTER_BITS.get(letter)
+        if not bit or self.guessed & bit or self.game_over:
+            return None
+        self.guessed |= bit
+        if self._mask & bit:
+            self._reveal(self._positions[letter], letter)
+            return True
+        self.incorrect += 1
+        return False
@@ -0,0 +1,87 @@
+"""
+Corrección de las respuestas escritas de "Adivina quién".
+
+Antes se normalizaban los cinco campos del nombre del alumno en cada respuesta
+y se aceptaba cualquier trozo de 3+ letras ("OSE" valía para "José"). Ahora
+las formas normalizadas vienen precalculadas (UserProfile.answer_keys, en la
+instantánea del grupo) y la respuesta se compara con ellas tolerando alguna
+errata mediante una distancia de Levenshtein acotada: en cuanto una fila de la
+tabla supera el máximo permitido se deja de calcular.
+
+Erratas que se aceptan (typo_tolerance): ninguna en palabras de hasta 3
+letras, una hasta 7 y dos a partir de 8. En las claves cortas (hasta
+SHORT_KEY_LENGTH letras) la errata no puede ser una letra de menos: si no,
+"OSE" valdría para "JOSE" y "PERE" para "PEREZ".
+"""
+from accounts.text import NAME_PARTICLES, name_tokens
+
+SHORT_KEY_LENGTH = 5
+
+
+def typo_tolerance(length):
+    """Erratas (distancia de Levenshtein) permitidas según la longitud de la palabra correcta."""
+    if length <= 3:
+        return 0
+    if length <= 7:
+        return 1
+    return 2
+
+
+def within_distance(a, b, limit):
+    """True si la distancia de Levenshtein entre a y b es <= limit."""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > limit:
+        return False
+    if la > lb:
+        a, b, la, lb = b, a, lb, la
+
+    over = limit + 1  # Cualquier valor mayor que el límite vale lo mismo
+    prev = [j if j <= limit else over for j in range(lb + 1)]
+    for i in range(1, la + 1):
+        ca = a[i - 1]
+        cur = [over] * (lb + 1)
+        if i <= limit:
+            cur[0] = i
+        # Solo hace falta la banda diagonal de ancho 2*limit+1
+        lo, hi = max(1, i - limit), min(lb, i + limit)
+        row_min = cur[lo - 1]
+        for j in range(lo, hi + 1):
+            value = min(prev[j - 1] + (ca != b[j - 1]), prev[j] + 1, cur[j - 1] + 1)
+            cur[j] = value if value <= limit else over
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return False
+        prev = cur
+    return prev[lb] <= limit
+
+
+def _matches_key(word, keys):
+    for key in keys:
+        if len(key) <= SHORT_KEY_LENGTH and len(word) < len(key):
+            continue  # Clave corta: un trozo de ella no vale
+        if within_distance(word, key, typo_tolerance(len(key))):
+            return True
+    return False
+
+
+def match_answer(raw_answer, answer_keys):
+    """
+    Comprueba una respuesta contra las claves de un alumno.
+
+    Vale el nombre completo, el usuario, el apodo o cualquier palabra
+    significativa del nombre ("Juan" para "Juan Alberto"); con varias palabras
+    ("jose perez") cada una tiene que coincidir con alguna clave. Las
+    partículas se ignoran: "Perez de" vale como "Perez".
+    """
+    words = name_tokens(raw_answer)
+    if not words or not answer_keys:
+        return False
+    if _matches_key(' '.join(words), answer_keys):
+        return True
+    significant = [word for word in words if word not in NAME_PARTICLES]
+    if significant == words and len(words) == 1:
+        return False  # Ya se ha comprobado entera
+    return bool(significant) and all(_matches_key(word, answer_keys) for word in significant)
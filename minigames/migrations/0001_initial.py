@@ -0,0 +1,35 @@
+# Generated by Django 4.2.27 on 2026-10-18 15:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('teachers', '0002_classgroup_invite_code'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game', models.CharField(choices=[('face_guess', 'Adivina quién es'), ('name_to_face', 'Adivina la imagen'), ('hangman', 'Ahorcado'), ('interests', 'Adivina gustos'), ('quiz', 'Adivina tests'), ('complete_profile', 'Perfil completo'), ('spotify', 'Spotify Mystery')], max_length=30)),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('current_streak', models.PositiveIntegerField(default=0)),
+                ('best_streak', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='game_scores', to='teachers.classgroup')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='game_scores', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('player', 'group', 'game')},
+            },
+        ),
+    ]
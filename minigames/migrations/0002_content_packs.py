@@ -0,0 +1,45 @@
+# Generated by Django 4.2.27 on 2026-10-18 15:35
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('minigames', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentPack',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game', models.CharField(choices=[('impostor', 'El Impostor'), ('charadas', 'Charadas')], max_length=20)),
+                ('name', models.CharField(max_length=100, verbose_name='Nombre')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Activo')),
+                ('version', models.PositiveIntegerField(default=1, editable=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(blank=True, limit_choices_to={'role': 'teacher'}, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='content_packs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('game', 'id'),
+            },
+        ),
+        migrations.CreateModel(
+            name='ContentEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=100, verbose_name='Categoría / tema')),
+                ('text', models.CharField(max_length=150, verbose_name='Palabra')),
+                ('hint', models.CharField(blank=True, max_length=150, verbose_name='Pista del impostor')),
+                ('order', models.PositiveIntegerField(default=0)),
+                ('pack', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='minigames.contentpack')),
+            ],
+            options={
+                'ordering': ('pack', 'order', 'id'),
+            },
+        ),
+    ]
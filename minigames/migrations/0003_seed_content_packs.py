@@ -0,0 +1,156 @@
+"""
+Carga los paquetes de palabras que antes estaban escritos dentro de las vistas
+de El Impostor y Charadas.
+"""
+from django.db import migrations
+
+IMPOSTOR = [
+    ('Futuro', 'Calidad de Vida', 'Estabilidad Económica'),
+    ('Pedagogía', 'Bosque-Escuela', 'Pedagogía Verde'),
+    ('Metodología', 'Pedagogía del Flow', 'Gamificación'),
+    ('EF Especializada', 'Aprendizaje de Aventura', 'Pedagogía Experidencial'),
+    ('Filosofía Educativa', 'Pedagogía Crítica', 'Transformación Social'),
+    ('Ocio', 'Pedagogía del Ocio', 'Recreación Deportiva'),
+    ('Inclusión', 'Interculturalidad', 'Pedagogía Social'),
+    ('Evaluación', 'Competencia', 'Capacidad'),
+    ('Modelos', 'Modelo Técnico', 'Modelo Comprensivo'),
+    ('Iniciación', 'Deporte Escolar', 'Deporte Federado'),
+    ('Estructura', 'Táctica', 'Estrategia'),
+    ('Feedback', 'Conocimiento de los Resultados', 'Conocimiento de la Ejecución'),
+    ('Aprendizaje', 'Práctica Global', 'Práctica Analítica'),
+    ('Diseño', 'Tarea Jugada', 'Ejercicio'),
+    ('Grecia', 'Gimnasio', 'Palestra'),
+    ('Grecia', 'Esparta', 'Atenas'),
+    ('Edad Media', 'Justa', 'Torneo'),
+    ('Profesión', 'Colegiación', 'Asociacionismo'),
+    ('Roma', 'Circo Romano', 'Anfiteatro'),
+    ('Valores', 'Juego Limpio', 'Deportividad'),
+    ('Cognición', 'Atención', 'Concentración'),
+    ('Estado', 'Ansiedad', 'Estrés'),
+    ('Motivación', 'Intrínseca', 'Extrínseca'),
+    ('Conducta', 'Refuerzo', 'Castigo'),
+    ('Personalidad', 'Rasgo', 'Estado'),
+    ('Social', 'Liderazgo Autocrático', 'Liderazgo Democrático'),
+    ('Laban', 'Espacio', 'Tiempo'),
+    ('Arte', 'Coreografía', 'Improvisación'),
+    ('Ritmo', 'Pulso', 'Acento'),
+    ('Composición', 'Canon', 'Unísono'),
+    ('Cuerpo', 'Esquema Corporal', 'Imagen Corporal'),
+    ('Carreras', 'Velocidad', 'Resistencia'),
+    ('Saltos', 'Longitud', 'Triple Salto'),
+    ('Vallas', 'Pierna de Ataque', 'Pierna de Recobro'),
+    ('Lanzamientos', 'Peso', 'Disco'),
+    ('Medición', 'Anemómetro', 'Cronómetro'),
+    ('Velocidad', 'Amplitud de Zancada', 'Frecuencia de Zancada'),
+    ('Evaluación', 'Examen Parcial', 'Examen Final'),
+    ('Título', 'CAFYD', 'Magisterio EF'),
+]
+
+CHARADAS = {
+    'ENSEÑANZA E INICIACIÓN': [
+        'Habilidad Motriz', 'Deporte Individual', 'Deporte de Equipo', 'Adversario',
+        'Blanco y Diana', 'Cancha Dividida', 'Incertidumbre', 'Espacio Común', 'Reglamento',
+        'Falta Técnica', 'Fuera de Juego', 'Talento Deportivo', 'Modelo Técnico',
+        'Modelo Comprensivo', 'Creatividad', 'Gesto Deportivo', 'Repetición',
+        'Toma de Decisiones', 'Estrategia', 'Rendimiento Experto', 'Novato',
+        'Iniciación Deportiva', 'Deporte Escolar', 'Competición', 'Victoria', 'Derrota',
+        'Juego Limpio', 'Entrenador', 'Silbato', 'Pizarra Táctica', 'Cronómetro', 'Sustitución',
+        'Tiempo Muerto', 'Edad Madurativa', 'Estímulo',
+    ],
+    'EPISTEMOLOGÍA E HISTORIA': [
+        'Método Científico', 'Investigación', 'Laboratorio', 'Profesor de EF', 'Entrenador',
+        'Gestión Deportiva', 'Recreación', 'Director Deportivo', 'Código Ético', 'Juego Limpio',
+        'Colegio Profesional', 'Pre-colegiación', 'Igualdad', 'Diversidad',
+        'Deporte Espectáculo', 'Violencia Deportiva', 'Prehistoria', 'Caza y Supervivencia',
+        'Grecia Antigua', 'Juegos Olímpicos', 'Lucha Canaria', 'Maratón', 'Ilíada y Odisea',
+        'Platón', 'Aristóteles', 'Gladiador', 'Caballero Medieval', 'Torneo', 'Justa',
+        'Artes Guerreras', 'Renacimiento', 'Humanismo', 'Inglaterra', 'Burguesía', 'Reglamento',
+        'Pierre de Coubertin', 'Anillos Olímpicos', 'Antorcha', 'Ideología Política',
+        'Capitalismo', 'Dopaje',
+    ],
+    'PSICOLOGÍA DEL DEPORTE': [
+        'Psicólogo del Deporte', 'Atención', 'Concentración', 'Percepción', 'Sensación',
+        'Memoria', 'Procesamiento de Información', 'Falso Recuerdo', 'Condicionamiento Clásico',
+        'Recompensa', 'Castigo', 'Observación', 'Imitación', 'Modificación de Conducta',
+        'Evaluación', 'Hábito de Sueño', 'Personalidad', 'Emoción', 'Ansiedad', 'Estrés',
+        'Activación', 'Afrontamiento', 'Relajación', 'Autocontrol', 'Motivación',
+        'Abandono Deportivo', 'Éxito', 'Fracaso', 'Liderazgo', 'Cohesión de Grupo',
+        'Comunicación', 'Role-playing', 'Dinámica de Grupo', 'Infancia', 'Tercera Edad',
+        'Retirada Deportiva',
+    ],
+    'DANZA Y EXPRESIÓN CORPORAL': [
+        'Danza', 'Técnica de Estilo', 'Técnica Creativa', 'Cuerpo', 'Espacio', 'Tiempo',
+        'Energía', 'Fluidez', 'Dimensión Expresiva', 'Comunicación', 'Proyecto Artístico',
+        'Simbolización', 'Feminismo', 'Identidad', 'Inventiva', 'Comparación', 'Combinación',
+        'Observador', 'Impresionismo', 'Análisis', 'Contexto', 'Actividades Físico Artísticas',
+        'Docente Mediador', 'Escenario', 'Recursos Musicales', 'Dinámica de Grupo', 'Reflexión',
+        'Evaluación', 'Coreografía', 'Puesta en Escena', 'Inclusión',
+    ],
+    'INICIACIÓN AL ATLETISMO': [
+        'Pista Cubierta', 'Aire Libre', 'Juez de Pista', 'Técnica de Carrera',
+        'Salida de Tacos', 'Foto-finish', 'Carrera de Velocidad', 'Maratón', 'Testigo',
+        'Zona de Transferencia', 'Paso de Valla', 'Descalificación', 'Salto de Longitud',
+        'Triple Salto', 'Salto de Altura', 'Fosbury Flop', 'Tabla de Batida', 'Foso de Arena',
+        'Listón', 'Nulo', 'Viento a Favor', 'Lanzamiento de Peso', 'Artefacto',
+        'Círculo de Lanzamiento', 'Parada', 'Lanzamiento Nulo', 'Fase de Impulso',
+        'Fase de Vuelo', 'Cronómetro', 'Educación Física', 'Escuela Deportiva',
+    ],
+    'PRESENTACIÓN': [
+        'Profesor', 'Delegado', 'Subdelegado', 'Bedel', 'Conserje', 'Alumno de Tercero',
+        'Novato', 'Graduado', 'Decano', 'Rector', 'Secretaria', 'Personal de Limpieza',
+        'Cafetería', 'Gimnasio', 'Pabellón', 'Piscina', 'Pistas de Tenis', 'Laboratorio',
+        'Biblioteca', 'Reprografía', 'Salón de Actos', 'Despacho', 'Parking', 'Parada de Bus',
+        'Residencia', 'Césped', 'Cantina', 'Vestuarios', 'Mochila', 'Carnet Universitario',
+        'Apuntes', 'Silbato', 'Cronómetro', 'Ordenador', 'Proyector', 'Pizarra', 'Tupper',
+        'Café', 'Botella de Agua', 'Chándal', 'Zapatillas', 'Cascos', 'Examen', 'Prácticas',
+        'Matrícula', 'Beca', 'Fiesta Universitaria', 'TFG', 'Erasmus', 'Exposición Oral',
+        'Trabajo en Grupo', 'Nota de Corte', 'Suspenso', 'Aprobado', 'Matrícula de Honor',
+        'Revisión de Examen',
+    ],
+    'DEPORTES': [
+        'Baloncesto', 'Fútbol', 'Voleibol', 'Balonmano', 'Rugby', 'Waterpolo', 'Fútbol Sala',
+        'Hockey Hierba', 'Hockey Patines', 'Béisbol', 'Softbol', 'Tenis', 'Pádel', 'Bádminton',
+        'Tenis de Mesa', 'Squash', 'Pickleball', 'Atletismo', 'Natación', 'Gimnasia Rítmica',
+        'Gimnasia Artística', 'Halterofilia', 'Ciclismo', 'Triatlón', 'Patinaje', 'Esgrima',
+        'Boxeo', 'Judo', 'Karate', 'Taekwondo', 'Lucha Libre', 'Kickboxing', 'Escalada',
+        'Senderismo', 'Piragüismo', 'Surf', 'Snowboard', 'Esquí', 'Orientación', 'Barranquismo',
+        'Vela', 'Equitación', 'Yoga', 'Pilates', 'Crossfit', 'Ultimate Frisbee', 'Parkour',
+        'Skateboarding', 'Golf', 'Tiro con Arco', 'Ajedrez Deportivo',
+    ],
+}
+
+
+def seed_packs(apps, schema_editor):
+    ContentPack = apps.get_model('minigames', 'ContentPack')
+    ContentEntry = apps.get_model('minigames', 'ContentEntry')
+
+    impostor = ContentPack.objects.create(game='impostor', name='Ciencias del Deporte')
+    ContentEntry.objects.bulk_create([
+        ContentEntry(pack=impostor, category=tema, text=palabra, hint=pista, order=i)
+        for i, (tema, palabra, pista) in enumerate(IMPOSTOR)
+    ])
+
+    charadas = ContentPack.objects.create(game='charadas', name='Charadas Máster')
+    entries = []
+    for categoria, palabras in CHARADAS.items():
+        for palabra in palabras:
+            entries.append(ContentEntry(pack=charadas, category=categoria, text=palabra, order=len(entries)))
+    ContentEntry.objects.bulk_create(entries)
+
+
+def remove_packs(apps, schema_editor):
+    ContentPack = apps.get_model('minigames', 'ContentPack')
+    ContentPack.objects.filter(
+        created_by__isnull=True, name__in=['Ciencias del Deporte', 'Charadas Máster']
+    ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('minigames', '0002_content_packs'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_packs, remove_packs),
+    ]
@@ -1,3 +1,80 @@
 from django.db import models
+from accounts.models import UserProfile
+from teachers.models import ClassGroup
 
-# Create your models here.
+
+class GameScore(models.Model):
+    """Marcador persistente de un alumno en un minijuego y grupo."""
+    GAME_CHOICES = (
+        ('face_guess', 'Adivina quién es'),
+        ('name_to_face', 'Adivina la imagen'),
+        ('hangman', 'Ahorcado'),
+        ('interests', 'Adivina gustos'),
+        ('quiz', 'Adivina tests'),
+        ('complete_profile', 'Perfil completo'),
+        ('spotify', 'Spotify Mystery'),
+    )
+
+    player = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='game_scores')
+    group = models.ForeignKey(ClassGroup, on_delete=models.CASCADE, related_name='game_scores')
+    game = models.CharField(max_length=30, choices=GAME_CHOICES)
+    correct = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    current_streak = models.PositiveIntegerField(default=0)
+    best_streak = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('player', 'group', 'game')
+
+    def __str__(self):
+        return f"{self.player.username} - {self.get_game_display()}: {self.correct}/{self.total}"
+
+
+class ContentPack(models.Model):
+    """Paquete de palabras para los juegos sin alumnos (Impostor, Charadas)."""
+    GAME_CHOICES = (
+        ('impostor', 'El Impostor'),
+        ('charadas', 'Charadas'),
+    )
+
+    game = models.CharField(max_length=20, choices=GAME_CHOICES)
+    name = models.CharField(max_length=100, verbose_name="Nombre")
+    created_by = models.ForeignKey(
+        UserProfile, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='content_packs', limit_choices_to={'role': 'teacher'},
+    )
+    is_active = models.BooleanField(default=True, verbose_name="Activo")
+    # Sube con cada cambio del paquete o de sus palabras
+    version = models.PositiveIntegerField(default=1, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ('game', 'id')
+
+    def save(self, *args, **kwargs):
+        if self.pk:
+            self.version += 1
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.get_game_display()}: {self.name} (v{self.version})"
+
+
+class ContentEntry(models.Model):
+    """
+    Una palabra de un paquete. En Charadas category es la categoría y text la
+    palabra; en El Impostor category es el tema, text la palabra de los
+    jugadores y hint la del impostor.
+    """
+    pack = models.ForeignKey(ContentPack, on_delete=models.CASCADE, related_name='entries')
+    category = models.CharField(max_length=100, verbose_name="Categoría / tema")
+    text = models.CharField(max_length=150, verbose_name="Palabra")
+    hint = models.CharField(max_length=150, blank=True, verbose_name="Pista del impostor")
+    order = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ('pack', 'order', 'id')
+
+    def __str__(self):
+        return f"{self.category}: {self.text}"
@@ -0,0 +1,82 @@
+"""
+Instantánea cacheada de los alumnos de cada grupo para los minijuegos.
+
+Cada ronda de juego necesitaba varias consultas (exists, count, random.choice)
+sobre el mismo queryset de alumnos. Aquí guardamos en la caché de Django una
+lista compacta con los ids, el nombre a mostrar, si tienen foto o Spotify y
+las claves de respuesta precalculadas (UserProfile.answer_keys), de modo que con la caché caliente una ronda no consulta la lista del grupo.
+
+La caché se invalida desde minigames/signals.py cuando cambia la pertenencia
+al grupo o se guarda un perfil.
+"""
+from django.core.cache import cache
+
+ROSTER_CACHE_TIMEOUT = 60 * 60  # 1 hora; las señales invalidan antes si hay cambios
+
+
+def roster_cache_key(group_id):
+    return f'minigames:roster:v2:{group_id}'
+
+
+class GroupRoster:
+    """Lista inmutable de alumnos de un grupo con los datos mínimos para jugar."""
+
+    __slots__ = ('group_id', 'ids', 'names', 'has_photo', 'has_spotify', 'answer_keys')
+
+    def __init__(self, group_id, rows):
+        # rows: tuplas (id, nombre, tiene_foto, tiene_spotify, claves_respuesta)
+        self.group_id = group_id
+        self.ids = tuple(r[0] for r in rows)
+        self.names = {r[0]: r[1] for r in rows}
+        self.has_photo = frozenset(r[0] for r in rows if r[2])
+        self.has_spotify = frozenset(r[0] for r in rows if r[3])
+        self.answer_keys = {r[0]: r[4] for r in rows}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def eligible(self, exclude_id=None, photo=False, spotify=False):
+        """Ids de los alumnos que pueden salir en el juego."""
+        return [
+            sid for sid in self.ids
+            if sid != exclude_id
+            and (not photo or sid in self.has_photo)
+            and (not spotify or sid in self.has_spotify)
+        ]
+
+    def display_name(self, student_id):
+        return self.names.get(student_id, '')
+
+    def answers(self, student_id):
+        """Claves normalizadas con las que se acepta el nombre del alumno."""
+        return self.answer_keys.get(student_id, ())
+
+
+def _load_rows(group_id):
+    from accounts.models import UserProfile
+
+    rows = UserProfile.objects.filter(student_groups__id=group_id).order_by('id').values_list(
+        'id', 'full_name', 'username', 'profile_picture', 'spotify_link', 'answer_keys'
+    ).distinct()
+    # Mismos criterios que los filtros originales: profile_picture__isnull=False
+    # y spotify_link ni nulo ni vacío.
+    return tuple(
+        (sid, full_name or username, picture is not None, bool(spotify), tuple(keys or ()))
+        for sid, full_name, username, picture, spotify, keys in rows
+    )
+
+
+def get_group_roster(group_id):
+    """Devuelve el GroupRoster del grupo, cargándolo en caché si hace falta."""
+    key = roster_cache_key(group_id)
+    rows = cache.get(key)
+    if rows is None:
+        rows = _load_rows(group_id)
+        cache.set(key, rows, ROSTER_CACHE_TIMEOUT)
+    return GroupRoster(group_id, rows)
+
+
+def invalidate_group_rosters(group_ids):
+    keys = [roster_cache_key(gid) for gid in group_ids]
+    if keys:
+        cache.delete_many(keys)
@@ -0,0 +1,64 @@
+"""
+Reparto de alumnos objetivo sin repeticiones para los minijuegos.
+
+Antes cada ronda hacía random.choice(queryset) (que evalúa el queryset entero)
+u order_by('?') y solo recordaba el último alumno visto. Aquí cada jugador
+tiene, por juego y grupo, una "baraja" barajada con los ids de sus compañeros:
+cada ronda saca la siguiente carta en O(1) y solo se vuelve a barajar cuando
+se acaba, así todos los compañeros salen antes de que se repita ninguno.
+
+La baraja se guarda en la caché como un array de enteros sin signo (unos pocos
+bytes por alumno), no en la sesión.
+"""
+import random
+from array import array
+
+from django.core.cache import cache
+
+DECK_CACHE_TIMEOUT = 60 * 60 * 6  # Una jornada de clase
+
+
+def deck_cache_key(player_id, game, group_id):
+    return f'minigames:deck:{player_id}:{game}:{group_id}'
+
+
+class TargetDeck:
+    """Baraja de ids de alumnos de un jugador para un juego y grupo concretos."""
+
+    def __init__(self, player_id, game, group_id):
+        self.key = deck_cache_key(player_id, game, group_id)
+
+    def _load(self):
+        data = cache.get(self.key)
+        cards = array('L')
+        if data:
+            cards.frombytes(data)
+        return cards
+
+    def _save(self, cards):
+        cache.set(self.key, cards.tobytes(), DECK_CACHE_TIMEOUT)
+
+    def deal(self, eligible_ids):
+        """Saca el siguiente alumno de la baraja; baraja de nuevo si se ha agotado."""
+        eligible = set(eligible_ids)
+        cards = self._load()
+        while cards:
+            student_id = cards.pop()
+            # La lista del grupo puede haber cambiado desde que se barajó
+            if student_id in eligible:
+                self._save(cards)
+                return student_id
+        cards = array('L', eligible_ids)
+        random.shuffle(cards)
+        student_id = cards.pop()
+        self._save(cards)
+        return student_id
+
+    def reset(self):
+        cache.delete(self.key)
+
+
+def pick_distractors(eligible_ids, target_id, k=3):
+    """Elige k alumnos al azar distintos del objetivo (sin recorrer la lista)."""
+    picks = random.sample(eligible_ids, min(k + 1, len(eligible_ids)))
+    return [sid for sid in picks if sid != target_id][:k]
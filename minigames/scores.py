@@ -0,0 +1,201 @@
+"""
+Buffer de escritura diferida para los marcadores de los minijuegos.
+
+Guardar el GameScore en cada respuesta pondría un UPDATE en cada clic. En su
+lugar las respuestas se acumulan en memoria del proceso y se vuelcan a la base
+de datos en bloque cada pocos segundos o cada N respuestas: se crean las filas
+que falten, se leen todas con select_for_update y se escriben con un único
+bulk_create con upsert.
+
+Para poder calcular la mejor racha sin guardar cada respuesta, por cada
+(jugador, grupo, juego) se resume la secuencia de aciertos pendiente en:
+racha inicial (aciertos antes del primer fallo), mejor racha interna, racha
+final y si hubo algún fallo.
+
+Las claves cuyo jugador o grupo se ha borrado mientras esperaban se
+descartan antes de escribir. Si el volcado falla, lo que se había sacado del
+buffer vuelve a él (delante de lo que haya llegado mientras) y se reintenta
+en el siguiente; un volcado que falla dentro de una petición no la rompe.
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+
+class PendingScore:
+    __slots__ = ('correct', 'total', 'leading', 'best', 'trailing', 'missed')
+
+    def __init__(self):
+        self.correct = self.total = 0
+        self.leading = self.best = self.trailing = 0
+        self.missed = False
+
+    def add(self, is_correct):
+        self.total += 1
+        if is_correct:
+            self.correct += 1
+            self.trailing += 1
+            if not self.missed:
+                self.leading += 1
+            self.best = max(self.best, self.trailing)
+        else:
+            self.missed = True
+            self.trailing = 0
+
+    def extend(self, later):
+        """Añade detrás las respuestas de later (posteriores a las de self)."""
+        self.best = max(self.best, later.best, self.trailing + later.leading)
+        if not self.missed:
+            self.leading += later.leading
+        self.trailing = later.trailing if later.missed else self.trailing + later.trailing
+        self.missed = self.missed or later.missed
+        self.correct += later.correct
+        self.total += later.total
+
+    def merge_into(self, score):
+        """Aplica lo pendiente sobre un GameScore (sin guardarlo)."""
+        score.correct += self.correct
+        score.total += self.total
+        if self.missed:
+            joined = score.current_streak + self.leading
+            score.current_streak = self.trailing
+        else:
+            joined = score.current_streak = score.current_streak + self.leading
+        score.best_streak = max(score.best_streak, joined, self.best, score.current_streak)
+
+
+class ScoreBuffer:
+    """Acumula respuestas en memoria y las vuelca periódicamente a GameScore."""
+
+    def __init__(self, flush_interval=None, max_events=None):
+        self.flush_interval = flush_interval or getattr(settings, 'MINIGAMES_SCORE_FLUSH_SECONDS', 5)
+        self.max_events = max_events or getattr(settings, 'MINIGAMES_SCORE_FLUSH_EVENTS', 50)
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._events = 0
+        self._timer = None
+
+    def add(self, player_id, group_id, game, results):
+        """Registra una o varias respuestas (True/False) de un jugador."""
+        results = list(results)
+        if not results:
+            return  # Nada que sumar: no se crea una fila 0/0
+        with self._lock:
+            pending = self._pending.get((player_id, group_id, game))
+            if pending is None:
+                pending = self._pending[(player_id, group_id, game)] = PendingScore()
+            for is_correct in results:
+                pending.add(is_correct)
+                self._events += 1
+            flush_now = self._events >= self.max_events
+            if not flush_now and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if flush_now:
+            try:
+                self.flush()
+            except DatabaseError:
+                # Lo pendiente ha vuelto al buffer: la respuesta del jugador no depende de esto
+                logger.exception("No se pudieron guardar los marcadores de los minijuegos")
+
+    def _take(self):
+        with self._lock:
+            pending, self._pending, self._events = self._pending, {}, 0
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        return pending
+
+    def _restore(self, taken):
+        # Vuelve a dejar en el buffer lo que no se pudo guardar
+        with self._lock:
+            for key, pending in taken.items():
+                later = self._pending.get(key)
+                if later is not None:
+                    pending.extend(later)
+                self._pending[key] = pending
+            self._events = sum(pending.total for pending in self._pending.values())
+            if self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("No se pudieron guardar los marcadores de los minijuegos")
+        finally:
+            # El hilo del temporizador abre su propia conexión
+            close_old_connections()
+
+    def flush(self):
+        """Vuelca lo pendiente: un insert de las filas nuevas, una lectura bloqueante y un upsert en bloque."""
+        pending = self._take()
+        if not pending:
+            return 0
+        try:
+            return self._write(pending)
+        except Exception:
+            self._restore(pending)
+            raise
+
+    def _write(self, pending):
+        from accounts.models import UserProfile
+        from teachers.models import ClassGroup
+        from .models import GameScore
+
+        # Jugadores o grupos borrados mientras esperaban: su marcador ya no tiene dónde ir
+        players = set(UserProfile.objects.filter(id__in={key[0] for key in pending}).values_list('id', flat=True))
+        groups = set(ClassGroup.objects.filter(id__in={key[1] for key in pending}).values_list('id', flat=True))
+        pending = {key: data for key, data in pending.items() if key[0] in players and key[1] in groups}
+        if not pending:
+            return 0
+
+        lookup = Q()
+        for player_id, group_id, game in pending:
+            lookup |= Q(player_id=player_id, group_id=group_id, game=game)
+
+        with transaction.atomic():
+            # Primero se crean (vacías) las filas que falten: así el
+            # select_for_update bloquea todas y dos procesos que vuelcan la
+            # misma clave nueva no se pisan los incrementos
+            GameScore.objects.bulk_create(
+                [GameScore(player_id=player_id, group_id=group_id, game=game) for player_id, group_id, game in pending],
+                ignore_conflicts=True,
+            )
+            existing = {
+                (s.player_id, s.group_id, s.game): s
+                for s in GameScore.objects.select_for_update().filter(lookup)
+            }
+            rows = []
+            for key, data in pending.items():
+                score = existing.get(key)
+                if score is None:
+                    continue  # Borrado entre la comprobación y el insert
+                data.merge_into(score)
+                # Sin pk todas las filas pasan por el ON CONFLICT de (player, group, game)
+                score.pk = None
+                rows.append(score)
+            GameScore.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['player', 'group', 'game'],
+                update_fields=['correct', 'total', 'current_streak', 'best_streak', 'updated_at'],
+            )
+        return len(rows)
+
+
+score_buffer = ScoreBuffer()
+atexit.register(score_buffer.flush)
+
+
+def record_results(player_id, group_id, game, results):
+    score_buffer.add(player_id, group_id, game, results)
@@ -0,0 +1,60 @@
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from accounts.models import UserProfile
+from teachers.models import ClassGroup
+from .content import invalidate_game_content
+from .models import ContentEntry, ContentPack
+from .roster import invalidate_group_rosters
+
+# Campos del perfil que forman parte de la instantánea del grupo (UserProfile.save
+# añade answer_keys a update_fields cuando cambia cualquier campo del nombre)
+ROSTER_FIELDS = {'username', 'full_name', 'profile_picture', 'spotify_link', 'answer_keys'}
+
+
+@receiver(m2m_changed, sender=ClassGroup.students.through)
+def group_students_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # group.students.add/remove/clear(...)
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_group_rosters([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        # user.student_groups.add/remove(...): pk_set son ids de grupos
+        invalidate_group_rosters(pk_set or [])
+    elif action == 'pre_clear':
+        # Tras el clear ya no sabríamos de qué grupos salía el alumno
+        invalidate_group_rosters(instance.student_groups.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=UserProfile)
+def profile_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        return  # Un perfil nuevo aún no pertenece a ningún grupo
+    if update_fields is not None and not ROSTER_FIELDS.intersection(update_fields):
+        return  # p.ej. el update de last_login al iniciar sesión
+    invalidate_group_rosters(instance.student_groups.values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=UserProfile)
+def profile_deleted(sender, instance, **kwargs):
+    invalidate_group_rosters(instance.student_groups.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=ClassGroup)
+def group_deleted(sender, instance, **kwargs):
+    invalidate_group_rosters([instance.pk])
+
+
+@receiver(post_save, sender=ContentPack)
+@receiver(post_delete, sender=ContentPack)
+def content_pack_changed(sender, instance, **kwargs):
+    # Si se cambia el juego del paquete hay que limpiar los dos
+    invalidate_game_content(game for game, _ in ContentPack.GAME_CHOICES)
+
+
+@receiver(post_save, sender=ContentEntry)
+@receiver(post_delete, sender=ContentEntry)
+def content_entry_changed(sender, instance, **kwargs):
+    ContentPack.objects.filter(pk=instance.pack_id).update(version=F('version') + 1)
+    invalidate_game_content(game for game, _ in ContentPack.GAME_CHOICES)
@@ -0,0 +1,227 @@
+"""
+Estado de las rondas de los minijuegos sin escribir en la sesión.
+
+Con el backend de sesiones en base de datos cada clic hacía un UPDATE sobre
+django_session (objetivo actual, último visto, aciertos, total...). En el modo
+de tokens la vista entrega con cada ronda un token firmado (HMAC, con
+caducidad) que lleva la respuesta esperada, y el marcador viaja en una cookie
+firmada. Al corregir basta con verificar el token: no se lee ni se escribe la
+sesión.
+
+Cada token lleva un nonce. Al corregirlo, el nonce se apunta en la caché
+(cache.add, mientras dura el token) y un token cuyo nonce ya está apuntado se
+rechaza: borrar o restaurar la cookie no permite volver a contestarlo. Con la
+caché por defecto (memoria local) la marca es del proceso; con una compartida
+(CACHE_BACKEND) vale para todos. Además cada token guarda el nonce de la
+última ronda contestada cuando se emitió ("parent") y solo se acepta si sigue
+siendo el último, para no contestar dos rondas emitidas en paralelo.
+
+La firma solo impide modificar el token, no leerlo (es JSON en base64): la
+respuesta ('a') va además cifrada, XOR con un flujo de claves sacado de
+salted_hmac (SECRET_KEY) y del nonce, que es distinto en cada token. Sin eso
+bastaba con decodificar el token para saber la solución de cada ronda.
+
+El modo se activa con settings.MINIGAMES_ROUND_TOKENS; si está desactivado
+RoundState usa las claves de sesión de siempre.
+"""
+import base64
+import json
+import secrets
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.utils.crypto import salted_hmac
+
+from .scores import record_results
+
+ROUND_TOKEN_SALT = 'minigames.round'
+ROUND_CIPHER_SALT = 'minigames.round.answer'
+ROUND_TOKEN_MAX_AGE = 60 * 30  # Una ronda (o una partida de ahorcado) no dura más
+SCORE_COOKIE_SALT = 'minigames.score'
+SCORE_COOKIE_MAX_AGE = 60 * 60 * 24 * 7
+
+
+def used_nonce_key(nonce):
+    return f'minigames:round-nonce:{nonce}'
+
+
+def _keystream(nonce, length):
+    blocks = (
+        salted_hmac(ROUND_CIPHER_SALT, f'{nonce}:{i}', algorithm='sha256').digest()
+        for i in range(-(-length // 32))
+    )
+    return b''.join(blocks)[:length]
+
+
+def seal_answer(answer, nonce):
+    """Cifra la respuesta para meterla en el token (el nonce no se puede repetir)."""
+    raw = json.dumps(answer, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(bytes(a ^ b for a, b in zip(raw, _keystream(nonce, len(raw))))).decode()
+
+
+def open_answer(sealed, nonce):
+    raw = base64.urlsafe_b64decode(sealed)
+    return json.loads(bytes(a ^ b for a, b in zip(raw, _keystream(nonce, len(raw)))))
+
+
+def round_tokens_enabled():
+    return getattr(settings, 'MINIGAMES_ROUND_TOKENS', False)
+
+
+class InvalidRound(Exception):
+    """El token de la ronda falta, está manipulado, caducado o ya se usó."""
+
+
+class RoundState:
+    """
+    Respuesta esperada y marcador de un juego para el usuario actual.
+
+    answer_key es la clave de sesión que usa el juego en el modo clásico para
+    guardar la respuesta (p.ej. 'spotify_target_id'). Si se indica group_id,
+    las respuestas también se acumulan en el marcador persistente (GameScore).
+    """
+
+    def __init__(self, request, prefix, answer_key, group_id=None):
+        self.request = request
+        self.prefix = prefix
+        self.answer_key = answer_key
+        self.group_id = group_id
+        self.use_tokens = round_tokens_enabled()
+        self.token = None
+        self._score = None
+        self._score_changed = False
+
+    # --- Marcador ---
+    @property
+    def cookie_name(self):
+        return f'mg_{self.prefix}'
+
+    def _load_score(self):
+        if self._score is None:
+            if self.use_tokens:
+                self._score = self._read_cookie()
+            else:
+                session = self.request.session
+                self._score = (session.get(f'{self.prefix}_correct', 0),
+                               session.get(f'{self.prefix}_total', 0), None)
+        return self._score
+
+    def _read_cookie(self):
+        raw = self.request.get_signed_cookie(self.cookie_name, default=None, salt=SCORE_COOKIE_SALT)
+        try:
+            user_id, correct, total, nonce = raw.split(':')
+            if int(user_id) == self.request.user.id:
+                return int(correct), int(total), nonce or None
+        except (AttributeError, ValueError):
+            pass
+        return 0, 0, None
+
+    @property
+    def correct(self):
+        return self._load_score()[0]
+
+    @property
+    def total(self):
+        return self._load_score()[1]
+
+    def record(self, *results):
+        """Suma al marcador una o varias respuestas (True si fue acierto)."""
+        correct, total, nonce = self._load_score()
+        self._score = (correct + sum(map(bool, results)), total + len(results), nonce)
+        if self.group_id:
+            record_results(self.request.user.id, self.group_id, self.prefix, results)
+        if self.use_tokens:
+            self._score_changed = True
+        else:
+            self.request.session[f'{self.prefix}_correct'] = self._score[0]
+            self.request.session[f'{self.prefix}_total'] = self._score[1]
+
+    # --- Respuesta esperada ---
+    def start(self, answer):
+        """Guarda la respuesta de una ronda nueva (en un token o en la sesión)."""
+        if self.use_tokens:
+            nonce = secrets.token_hex(8)
+            self.token = signing.dumps({
+                'u': self.request.user.id,
+                'g': self.prefix,
+                'a': seal_answer(answer, nonce),
+                'n': nonce,
+                'p': self._load_score()[2],
+            }, salt=ROUND_TOKEN_SALT, compress=True)
+        else:
+            self.request.session[self.answer_key] = answer
+            self.request.session.modified = True
+
+    def answer(self, consume=True):
+        """
+        Respuesta esperada de la ronda que se está contestando.
+
+        Lanza InvalidRound si el token no es válido o no hay ronda pendiente.
+        Con consume=True la ronda queda gastada: en modo token al guardar el
+        marcador y en modo sesión borrando la clave, para que no se corrija
+        dos veces.
+        """
+        if not self.use_tokens:
+            if not consume:
+                return self.request.session.get(self.answer_key)
+            value = self.request.session.pop(self.answer_key, None)
+            if value is None:
+                raise InvalidRound()
+            return value
+
+        token = self.request.POST.get('round_token') or self.request.headers.get('X-Round-Token')
+        data = self._verify(token)
+        if consume:
+            # add es atómico: si el nonce ya estaba, otra petición gastó el token
+            if not cache.add(used_nonce_key(data['n']), 1, ROUND_TOKEN_MAX_AGE):
+                raise InvalidRound()
+            correct, total, _last_nonce = self._load_score()
+            self._score = (correct, total, data['n'])
+            self._score_changed = True
+        return data['answer']
+
+    def resume(self):
+        """
+        Respuesta de la ronda en curso sin gastarla, para volver a pintar la
+        página (None si no hay ninguna). En modo token se reutiliza el token
+        que trae la URL (?round_token=...) en vez de emitir otro.
+        """
+        if not self.use_tokens:
+            return self.request.session.get(self.answer_key)
+        token = self.request.GET.get('round_token')
+        try:
+            data = self._verify(token)
+        except InvalidRound:
+            return None
+        self.token = token
+        return data['answer']
+
+    def _verify(self, token):
+        if not token:
+            raise InvalidRound()
+        try:
+            data = signing.loads(token, salt=ROUND_TOKEN_SALT, max_age=ROUND_TOKEN_MAX_AGE)
+        except signing.BadSignature:  # Incluye SignatureExpired
+            raise InvalidRound()
+        last_nonce = self._load_score()[2]
+        if data.get('u') != self.request.user.id or data.get('g') != self.prefix or data.get('p') != last_nonce:
+            raise InvalidRound()
+        if cache.get(used_nonce_key(data.get('n'))):
+            raise InvalidRound()
+        try:
+            data['answer'] = open_answer(data['a'], data['n'])
+        except (KeyError, TypeError, ValueError):  # Tokens de antes del cifrado
+            raise InvalidRound()
+        return data
+
+    def apply(self, response):
+        """Escribe la cookie del marcador en la respuesta si ha cambiado."""
+        if self._score_changed:
+            correct, total, nonce = self._score
+            response.set_signed_cookie(
+                self.cookie_name, f'{self.request.user.id}:{correct}:{total}:{nonce or ""}',
+                salt=SCORE_COOKIE_SALT, max_age=SCORE_COOKIE_MAX_AGE,
+                httponly=True, samesite='Lax', secure=self.request.is_secure(),
+            )
+        return response
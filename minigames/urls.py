@@ -40,4 +40,11 @@ urlpatterns = [
     # 10. Charadas (Adivina la palabra en la frente)
     path('charadas/', views.charadas_game, name='charadas_game'),
     path('charadas/<int:group_id>/', views.charadas_game, name='charadas_game'),
-]
\ No newline at end of file
+
+    # 11. Paquetes de rondas en JSON (varias preguntas por petición)
+    path('paquete/<str:game>/', views.round_pack, name='round_pack'),
+    path('paquete/<str:game>/<int:group_id>/', views.round_pack, name='round_pack'),
+
+    # 12. Paquetes de palabras de El Impostor y Charadas (JSON cacheado)
+    path('contenido/<str:game>/<int:pack_id>/', views.content_pack, name='content_pack'),
+]
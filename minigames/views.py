@@ -1,35 +1,40 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, HttpResponseNotModified, JsonResponse
 from django.contrib.auth.decorators import login_required
+from django.urls import reverse
 from accounts.models import UserProfile
 from teachers.models import ClassGroup
-from quizzes.models import UserResult, Questionnaire
+from .cards import calculate_age, load_student_cards, picture_url, results_description
+from .content import get_compiled_pack, load_game_content
+from .hangman import ALPHABET, MAX_INCORRECT, HangmanEngine, hangman_target
+from .matching import match_answer
+from .roster import get_group_roster
+from .sampler import TargetDeck, pick_distractors
+from .tokens import RoundState, InvalidRound
+import json
 import random
-import unicodedata
-from datetime import date
 
 # --- UTILIDADES ---
-def normalize_text(text):
-    """Elimina tildes y convierte a mayúsculas."""
-    if not text: return ""
-    return ''.join(
-        c for c in unicodedata.normalize('NFD', text)
-        if unicodedata.category(c) != 'Mn'
-    ).upper()
-
-def calculate_age(birth_date):
-    if not birth_date: return "desconocida"
-    today = date.today()
-    return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
-
-def get_ajax_response(request, success, message, prefix, extra_data=None):
+def load_students(student_ids):
+    """Carga los perfiles indicados en una sola consulta, respetando el orden."""
+    by_id = UserProfile.objects.in_bulk(student_ids)
+    return [by_id[sid] for sid in student_ids if sid in by_id]
+
+def interests_description(s):
+    return f"Tiene {calculate_age(s.date_of_birth)} años. Su artista favorito es {s.favorite_artist or 'desconocido'} y le motiva: {s.motivation or 'aprender'}."
+
+def get_ajax_response(request, success, message, rounds, extra_data=None):
     data = {
         'success': success, 'message': message,
-        'correct': request.session.get(f'{prefix}_correct', 0),
-        'total': request.session.get(f'{prefix}_total', 0),
+        'correct': rounds.correct,
+        'total': rounds.total,
     }
     if extra_data: data.update(extra_data)
-    return JsonResponse(data)
+    return rounds.apply(JsonResponse(data))
+
+def expired_round_response(request, rounds):
+    """La ronda ya no es válida (token caducado, manipulado o ya contestado)."""
+    return get_ajax_response(request, False, "Esta ronda ha caducado, vamos con otra.", rounds, {'expired': True})
 
 # --- SELECTOR DE GRUPO ---
 @login_required
@@ -48,6 +53,9 @@ def select_group_for_game(request, game_name):
     })
 
 # --- VISTAS DE JUEGOS ---
+# El estado de cada ronda pasa por RoundState: en modo token viaja firmado en
+# la propia página (round_token) y el marcador en una cookie firmada, sin
+# escribir en la sesión; si no, se usan las claves de sesión de siempre.
 
 @login_required
 def face_guess_game(request, group_id=None):
@@ -62,62 +70,16 @@ def face_guess_game(request, group_id=None):
     
     group = get_object_or_404(ClassGroup, id=group_id)
     # Mejora: Excluir al propio usuario si es alumno
-    students = group.students.filter(profile_picture__isnull=False).exclude(id=request.user.id).distinct()
-    
-    if not students.exists(): 
+    if not get_group_roster(group.id).eligible(exclude_id=request.user.id, photo=True):
         return render(request, 'minigames/no_students.html')
-    
-    if 'face_guess_correct' not in request.session: request.session['face_guess_correct'] = 0
-    if 'face_guess_total' not in request.session: request.session['face_guess_total'] = 0
-    
-    if request.method == 'POST':
-        target_id = request.session.get('face_guess_target_id')
-        # Normalizamos y limpiamos espacios de la respuesta del usuario
-        answer = normalize_text(request.POST.get('answer', '')).strip()
-        student = get_object_or_404(UserProfile, id=target_id)
-        
-        # Recogemos todos los campos posibles para validar
-        fields = ['username', 'first_name', 'last_name', 'full_name', 'nickname']
-        valid_answers = [normalize_text(getattr(student, f)).strip() for f in fields if getattr(student, f)]
-        
-        request.session['face_guess_total'] += 1
-        
-        # --- Lógica de validación mejorada ---
-        is_correct = False
-        if answer:  # Evitar procesar respuestas vacías
-            if answer in valid_answers:
-                is_correct = True
-            else:
-                # Comprobación parcial (ej. "Juan" coincide con "Juan Alberto")
-                for valid in valid_answers:
-                    if len(answer) > 2 and (answer in valid or valid in answer):
-                        is_correct = True
-                        break
-        # -------------------------------------
-
-        if is_correct: 
-            request.session['face_guess_correct'] += 1
-            
-        msg = f"¡Correcto! Es {student.full_name or student.username}" if is_correct else f"Incorrecto. Era: {student.full_name or student.username}"
-        
-        if request.headers.get('x-requested-with') == 'XMLHttpRequest': 
-            return get_ajax_response(request, is_correct, msg, 'face_guess')
-        
-        return redirect('face_guess_game', group_id=group_id)
 
-    # Selección del siguiente alumno evitando repetir el último visto
-    last_id = request.session.get('face_guess_last_id')
-    available_students = students.exclude(id=last_id) if students.count() > 1 else students
-    target_student = random.choice(available_students)
-    
-    request.session['face_guess_target_id'] = target_student.id
-    request.session['face_guess_last_id'] = target_student.id
-    
+    # Las rondas llegan por paquetes (round_pack) y se corrigen de una vez
+    rounds = RoundState(request, 'face_guess', 'face_guess_pack', group.id)
     return render(request, 'minigames/face_guess_game.html', {
-        'student': target_student, 
         'group': group,
-        'correct': request.session['face_guess_correct'], 
-        'total': request.session['face_guess_total']
+        'pack_url': reverse('round_pack', args=['face_guess', group.id]),
+        'correct': rounds.correct, 
+        'total': rounds.total
     })
 
 @login_required
@@ -131,32 +93,16 @@ def name_to_face_game(request, group_id=None):
     
     group = get_object_or_404(ClassGroup, id=group_id)
     # Mejora: Excluir al propio usuario
-    students = group.students.filter(profile_picture__isnull=False).exclude(id=request.user.id).distinct()
-    
-    if students.count() < 4: return render(request, 'minigames/not_enough_students.html')
+    student_ids = get_group_roster(group.id).eligible(exclude_id=request.user.id, photo=True)
     
-    if 'name_to_face_correct' not in request.session: request.session['name_to_face_correct'] = 0
-    if 'name_to_face_total' not in request.session: request.session['name_to_face_total'] = 0
+    if len(student_ids) < 4: return render(request, 'minigames/not_enough_students.html')
     
-    if request.method == 'POST':
-        is_correct = str(request.POST.get('selected_id')) == str(request.session.get('name_to_face_target_id'))
-        request.session['name_to_face_total'] += 1
-        if is_correct: request.session['name_to_face_correct'] += 1
-        msg = "¡Correcto!" if is_correct else "Incorrecto."
-        if request.headers.get('x-requested-with') == 'XMLHttpRequest': return get_ajax_response(request, is_correct, msg, 'name_to_face')
-        return redirect('name_to_face_game', group_id=group_id)
-
-    target = random.choice(students.exclude(id=request.session.get('name_to_face_last_id')) if students.count() > 1 else students)
-    request.session['name_to_face_target_id'] = target.id
-    request.session['name_to_face_last_id'] = target.id
-    options = list(random.sample(list(students.exclude(id=target.id)), 3)) + [target]
-    random.shuffle(options)
+    rounds = RoundState(request, 'name_to_face', 'name_to_face_pack', group.id)
     return render(request, 'minigames/name_to_face_game.html', {
-        'target_name': target.full_name or target.username, 
-        'options': options, 
         'group': group,
-        'correct': request.session['name_to_face_correct'], 
-        'total': request.session['name_to_face_total']
+        'pack_url': reverse('round_pack', args=['name_to_face', group.id]),
+        'correct': rounds.correct, 
+        'total': rounds.total
     })
 
 @login_required
@@ -170,87 +116,66 @@ def hangman_game(request, group_id=None):
     
     group = get_object_or_404(ClassGroup, id=group_id)
     # Mejora: Excluir al propio usuario
-    students = group.students.filter(profile_picture__isnull=False).exclude(id=request.user.id).distinct()
+    roster = get_group_roster(group.id)
+    student_ids = roster.eligible(exclude_id=request.user.id, photo=True)
     
-    if not students.exists():
+    if not student_ids:
         return render(request, 'minigames/no_students.html')
     
-    if request.session.get('hangman_game_over', False) and request.method == 'GET':
-        keys_to_reset = [
-            'hangman_target_id', 'hangman_target_name', 
-            'hangman_guessed_letters', 'hangman_incorrect_count', 
-            'hangman_game_over'
-        ]
-        for key in keys_to_reset:
-            request.session.pop(key, None)
-        request.session.modified = True
-
-    if 'hangman_target_id' not in request.session:
-        last_id = request.session.get('hangman_last_id')
-        possible_students = students.exclude(id=last_id) if students.count() > 1 else students
-        student = random.choice(possible_students)
-        
-        request.session['hangman_target_id'] = student.id
-        request.session['hangman_last_id'] = student.id
-        raw_name = student.full_name or student.username
-        request.session['hangman_target_name'] = normalize_text(raw_name)
-        request.session['hangman_guessed_letters'] = []
-        request.session['hangman_incorrect_count'] = 0
-        request.session['hangman_game_over'] = False
-        request.session.modified = True
-
-    if 'hangman_correct' not in request.session: request.session['hangman_correct'] = 0
-    if 'hangman_total' not in request.session: request.session['hangman_total'] = 0
-
-    target_name = request.session['hangman_target_name']
+    # Estado de la partida: [target_id, letras probadas y fallos] (ver hangman.py)
+    rounds = RoundState(request, 'hangman', 'hangman_state', group.id)
 
     if request.method == 'POST' and request.POST.get('action') == 'guess_letter':
+        try:
+            game = HangmanEngine.from_state(rounds.answer(), roster)
+        except InvalidRound:
+            game = None
+        if game is None:
+            return expired_round_response(request, rounds)
+
         letter = request.POST.get('letter', '').upper()
+        if game.guess(letter) is not None and game.game_over:
+            rounds.record(game.won)
         
-        if not request.session['hangman_game_over'] and letter not in request.session['hangman_guessed_letters']:
-            request.session['hangman_guessed_letters'].append(letter)
-            
-            if letter not in target_name:
-                request.session['hangman_incorrect_count'] += 1
-            
-            displayed = "".join([c if c in request.session['hangman_guessed_letters'] or not c.isalpha() else "_" for c in target_name])
-            won = all(c in request.session['hangman_guessed_letters'] or not c.isalpha() for c in target_name)
-            lost = request.session['hangman_incorrect_count'] >= 6
-            
-            if won or lost:
-                request.session['hangman_game_over'] = True
-                request.session['hangman_total'] += 1
-                if won: request.session['hangman_correct'] += 1
-            
-            request.session.modified = True
-            
-            return JsonResponse({
-                'success': True,
-                'displayed_name': displayed,
-                'incorrect_count': request.session['hangman_incorrect_count'],
-                'max_incorrect': 6,
-                'game_over': request.session['hangman_game_over'],
-                'won': won,
-                'target_name': target_name,
-                'correct': request.session['hangman_correct'],
-                'total': request.session['hangman_total']
-            })
-
-    current_student = get_object_or_404(UserProfile, id=request.session['hangman_target_id'])
-    displayed_name = "".join([c if c in request.session['hangman_guessed_letters'] or not c.isalpha() else "_" for c in target_name])
+        # El estado actualizado viaja en un token nuevo (o vuelve a la sesión)
+        rounds.start(game.to_state())
+        
+        return rounds.apply(JsonResponse({
+            'success': True,
+            'displayed_name': game.displayed,
+            'incorrect_count': game.incorrect,
+            'max_incorrect': MAX_INCORRECT,
+            'game_over': game.game_over,
+            'won': game.won,
+            # El nombre solo se desvela al acabar la partida
+            'target_name': game.target if game.game_over else None,
+            'round_token': rounds.token,
+            'correct': rounds.correct,
+            'total': rounds.total
+        }))
+
+    # Se continúa la partida en curso (en modo token, la del token de la URL,
+    # que la página va actualizando); si terminó o no hay, empieza una nueva.
+    game = HangmanEngine.from_state(rounds.resume(), roster)
+    if not game or game.game_over:
+        target_id = TargetDeck(request.user.id, 'hangman', group.id).deal(student_ids)
+        game = HangmanEngine(target_id, hangman_target(roster.display_name(target_id)))
+        rounds.start(game.to_state())
+
+    current_student = get_object_or_404(UserProfile, id=game.target_id)
     
     context = {
         'current_student': current_student,
         'group': group,
-        'displayed_name': displayed_name,
-        'incorrect_count': request.session['hangman_incorrect_count'],
-        'max_incorrect': 6,
-        'alphabet': "ABCDEFGHIJKLMNÑOPQRSTUVWXYZ",
-        'used_letters': request.session['hangman_guessed_letters'],
-        'game_over': request.session['hangman_game_over'],
-        'correct': request.session['hangman_correct'],
-        'total': request.session['hangman_total'],
-        'target_name': target_name,
+        'displayed_name': game.displayed,
+        'incorrect_count': game.incorrect,
+        'max_incorrect': MAX_INCORRECT,
+        'alphabet': ALPHABET,
+        'used_letters': game.used_letters,
+        'game_over': game.game_over,
+        'round_token': rounds.token,
+        'correct': rounds.correct,
+        'total': rounds.total,
     }
     return render(request, 'minigames/hangman_game.html', context)
 
@@ -265,35 +190,34 @@ def student_interests_game(request, group_id=None):
     
     group = get_object_or_404(ClassGroup, id=group_id)
     # Mejora: Excluir al propio usuario
-    students = group.students.all().exclude(id=request.user.id).distinct()
+    student_ids = get_group_roster(group.id).eligible(exclude_id=request.user.id)
     
-    if students.count() < 4: return render(request, 'minigames/not_enough_students.html')
+    if len(student_ids) < 4: return render(request, 'minigames/not_enough_students.html')
 
-    if 'interests_correct' not in request.session: request.session['interests_correct'] = 0
-    if 'interests_total' not in request.session: request.session['interests_total'] = 0
+    rounds = RoundState(request, 'interests', 'interests_correct_pos', group.id)
 
     if request.method == 'POST' and 'selected_option' in request.POST:
         selected_index = request.POST.get('selected_option') 
-        correct_index = request.session.get('interests_correct_pos')
-        request.session['interests_total'] += 1
+        try:
+            correct_index = rounds.answer()
+        except InvalidRound:
+            return expired_round_response(request, rounds)
         is_correct = str(selected_index) == str(correct_index)
-        if is_correct: request.session['interests_correct'] += 1
-        request.session.modified = True
-        return get_ajax_response(request, is_correct, "¡Correcto!" if is_correct else "¡No! Esa no era su descripción", 'interests')
+        rounds.record(is_correct)
+        return get_ajax_response(request, is_correct, "¡Correcto!" if is_correct else "¡No! Esa no era su descripción", rounds)
 
-    target = random.choice(students)
-    def get_desc(s):
-        return f"Tiene {calculate_age(s.date_of_birth)} años. Su artista favorito es {s.favorite_artist or 'desconocido'} y le motiva: {s.motivation or 'aprender'}."
+    target_id = TargetDeck(request.user.id, 'interests', group.id).deal(student_ids)
+    other_ids = pick_distractors(student_ids, target_id)
+    target, *others = load_students([target_id] + other_ids)
     
-    correct_desc = get_desc(target)
-    others = random.sample(list(students.exclude(id=target.id)), 3)
-    options = [get_desc(s) for s in others] + [correct_desc]
+    correct_desc = interests_description(target)
+    options = [interests_description(s) for s in others] + [correct_desc]
     random.shuffle(options)
-    request.session['interests_correct_pos'] = options.index(correct_desc) + 1
+    rounds.start(options.index(correct_desc) + 1)
     
     return render(request, 'minigames/student_interests_game.html', {
-        'target_student': target, 'group': group, 'options': options, 
-        'correct': request.session['interests_correct'], 'total': request.session['interests_total']
+        'target_student': target, 'group': group, 'options': options, 'round_token': rounds.token,
+        'correct': rounds.correct, 'total': rounds.total
     })
 
 @login_required
@@ -307,30 +231,38 @@ def quiz_results_game(request, group_id=None):
     
     group = get_object_or_404(ClassGroup, id=group_id)
     # Mejora: Excluir al propio usuario
-    students = group.students.all().exclude(id=request.user.id).distinct()
+    student_ids = get_group_roster(group.id).eligible(exclude_id=request.user.id)
     
-    if students.count() < 4: return render(request, 'minigames/not_enough_students.html')
+    if len(student_ids) < 4: return render(request, 'minigames/not_enough_students.html')
     
-    if 'quiz_correct' not in request.session: request.session['quiz_correct'] = 0
-    if 'quiz_total' not in request.session: request.session['quiz_total'] = 0
+    rounds = RoundState(request, 'quiz', 'quiz_correct_pos', group.id)
     
-    if request.method == 'POST':
-        is_correct = str(request.POST.get('selected_id')) == str(request.session.get('quiz_target_id'))
-        request.session['quiz_total'] += 1
-        if is_correct: request.session['quiz_correct'] += 1
-        return get_ajax_response(request, is_correct, "¡Resultado!", 'quiz')
-
-    target = random.choice(students)
-    request.session['quiz_target_id'] = target.id
-    options = list(random.sample(list(students.exclude(id=target.id)), 3)) + [target]
-    random.shuffle(options)
+    if request.method == 'POST' and 'selected_option' in request.POST:
+        try:
+            correct_index = rounds.answer()
+        except InvalidRound:
+            return expired_round_response(request, rounds)
+        is_correct = str(request.POST.get('selected_option')) == str(correct_index)
+        rounds.record(is_correct)
+        return get_ajax_response(request, is_correct, "¡Correcto!" if is_correct else "¡No! Esos no son sus resultados", rounds)
+
+    target_id = TargetDeck(request.user.id, 'quiz', group.id).deal(student_ids)
+    option_ids = pick_distractors(student_ids, target_id) + [target_id]
+    random.shuffle(option_ids)
+    cards = load_student_cards(option_ids)
+    target = cards[target_id]
+    # Varios alumnos pueden tener los mismos resultados: vale la posición del objetivo
+    options = [results_description(cards[sid]) for sid in option_ids]
+    rounds.start(option_ids.index(target_id) + 1)
     
     return render(request, 'minigames/quiz_results_game.html', {
-        'target_student': target, 
+        'target_student': target['student'],
+        'target_name': target['full_name'],
         'options': options, 
         'group': group,
-        'correct': request.session['quiz_correct'], 
-        'total': request.session['quiz_total']
+        'round_token': rounds.token,
+        'correct': rounds.correct, 
+        'total': rounds.total
     })
 
 @login_required
@@ -344,45 +276,42 @@ def student_complete_profile_game(request, group_id=None):
         
     group = get_object_or_404(ClassGroup, id=group_id)
     # Mejora: Excluir al propio usuario
-    students = group.students.filter(profile_picture__isnull=False).exclude(id=request.user.id).distinct()
+    student_ids = get_group_roster(group.id).eligible(exclude_id=request.user.id, photo=True)
     
-    if students.count() < 4: return render(request, 'minigames/not_enough_students.html')
+    if len(student_ids) < 4: return render(request, 'minigames/not_enough_students.html')
     
-    if 'complete_profile_correct' not in request.session: request.session['complete_profile_correct'] = 0
-    if 'complete_profile_total' not in request.session: request.session['complete_profile_total'] = 0
+    rounds = RoundState(request, 'complete_profile', 'complete_profile_target_id', group.id)
     
     if request.method == 'POST' and 'selected_student_id' in request.POST:
-        is_correct = str(request.POST.get('selected_student_id')) == str(request.session.get('complete_profile_target_id'))
-        request.session['complete_profile_total'] += 1
-        if is_correct: request.session['complete_profile_correct'] += 1
-        request.session.modified = True
-        return get_ajax_response(request, is_correct, "¡Listo!", 'complete_profile')
-    
-    vark_q = Questionnaire.objects.filter(title="VARK").first()
-    chapman_q = Questionnaire.objects.filter(title="Chapman").first()
-    target = random.choice(students)
-    request.session['complete_profile_target_id'] = target.id
-    
-    raw_options = list(students.exclude(id=target.id).order_by('?')[:3]) + [target]
-    random.shuffle(raw_options)
-    
-    options_data = []
-    for s in raw_options:
-        vark = UserResult.objects.filter(user=s, questionnaire=vark_q).first()
-        chapman = UserResult.objects.filter(user=s, questionnaire=chapman_q).first()
-        options_data.append({
-            'student_id': s.id,
-            'full_name': s.full_name or s.username,
-            'age': calculate_age(s.date_of_birth),
-            'favorite_artist': s.favorite_artist or "N/A",
-            'vark_result': vark.dominant_category if vark else "Pte",
-            'chapman_result': chapman.dominant_category if chapman else "Pte",
-            'motivation': s.motivation or "N/A"
-        })
+        try:
+            target_id = rounds.answer()
+        except InvalidRound:
+            return expired_round_response(request, rounds)
+        is_correct = str(request.POST.get('selected_student_id')) == str(target_id)
+        rounds.record(is_correct)
+        return get_ajax_response(request, is_correct, "¡Listo!", rounds)
+    
+    target_id = TargetDeck(request.user.id, 'complete_profile', group.id).deal(student_ids)
+    rounds.start(target_id)
+    
+    option_ids = pick_distractors(student_ids, target_id) + [target_id]
+    random.shuffle(option_ids)
+    cards = load_student_cards(option_ids)
+    target = cards[target_id]['student']
+    
+    options_data = [{
+        'student_id': card['student_id'],
+        'full_name': card['full_name'],
+        'age': card['age'],
+        'favorite_artist': card['favorite_artist'] or "N/A",
+        'vark_result': card['vark'] or "Pte",
+        'chapman_result': card['chapman'] or "Pte",
+        'motivation': card['motivation'] or "N/A"
+    } for card in map(cards.get, option_ids)]
         
     return render(request, 'minigames/student_complete_profile_game.html', {
-        'target_student': target, 'options': options_data, 'group': group,
-        'correct': request.session['complete_profile_correct'], 'total': request.session['complete_profile_total']
+        'target_student': target, 'options': options_data, 'group': group, 'round_token': rounds.token,
+        'correct': rounds.correct, 'total': rounds.total
     })
 
 @login_required
@@ -396,44 +325,47 @@ def spotify_guess_game(request, group_id=None):
     
     group = get_object_or_404(ClassGroup, id=group_id)
     # Mejora: Excluir al propio usuario
-    students = group.students.exclude(spotify_link__isnull=True).exclude(spotify_link='').exclude(id=request.user.id).distinct()
+    roster = get_group_roster(group.id)
+    student_ids = roster.eligible(exclude_id=request.user.id, spotify=True)
     
-    if students.count() < 4:
+    if len(student_ids) < 4:
         return render(request, 'minigames/not_enough_students.html', {
             'message': "Se necesitan al menos 4 compañeros con su canción de Spotify configurada."
         })
     
-    if 'spotify_correct' not in request.session: request.session['spotify_correct'] = 0
-    if 'spotify_total' not in request.session: request.session['spotify_total'] = 0
+    rounds = RoundState(request, 'spotify', 'spotify_target_id', group.id)
     
     if request.method == 'POST':
-        is_correct = str(request.POST.get('selected_id')) == str(request.session.get('spotify_target_id'))
-        request.session['spotify_total'] += 1
-        if is_correct: request.session['spotify_correct'] += 1
+        try:
+            target_id = rounds.answer()
+        except InvalidRound:
+            return expired_round_response(request, rounds)
+        is_correct = str(request.POST.get('selected_id')) == str(target_id)
+        rounds.record(is_correct)
         
-        target = UserProfile.objects.get(id=request.session.get('spotify_target_id'))
-        msg = f"¡Correcto! Es la canción de {target.full_name or target.username}" if is_correct else "¡Ups! No es de ese compañero."
+        target_name = roster.display_name(target_id)
+        msg = f"¡Correcto! Es la canción de {target_name}" if is_correct else "¡Ups! No es de ese compañero."
         
         if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-            return get_ajax_response(request, is_correct, msg, 'spotify')
-        return redirect('spotify_guess_game', group_id=group_id)
+            return get_ajax_response(request, is_correct, msg, rounds)
+        return rounds.apply(redirect('spotify_guess_game', group_id=group_id))
 
-    last_id = request.session.get('spotify_last_id')
-    possible_targets = students.exclude(id=last_id) if students.count() > 1 else students
-    target = random.choice(possible_targets)
+    target_id = TargetDeck(request.user.id, 'spotify', group.id).deal(student_ids)
     
-    request.session['spotify_target_id'] = target.id
-    request.session['spotify_last_id'] = target.id
+    rounds.start(target_id)
     
-    options = list(random.sample(list(students.exclude(id=target.id)), 3)) + [target]
-    random.shuffle(options)
+    option_ids = pick_distractors(student_ids, target_id) + [target_id]
+    random.shuffle(option_ids)
+    options = load_students(option_ids)
+    target = next(s for s in options if s.id == target_id)
     
     return render(request, 'minigames/spotify_guess_game.html', {
         'target_embed': target.spotify_embed_url,
         'options': options,
         'group': group,
-        'correct': request.session['spotify_correct'],
-        'total': request.session['spotify_total']
+        'round_token': rounds.token,
+        'correct': rounds.correct,
+        'total': rounds.total
     })
 
 @login_required
@@ -462,58 +394,9 @@ def impostor_game(request, group_id=None):
     """
     Juego del Impostor con control de historial para no repetir temas.
     """
-    biblioteca_palabras = [
-        {'tema': 'Futuro', 'p': 'Calidad de Vida', 'i': 'Estabilidad Económica'},
-        {'tema': 'Pedagogía', 'p': 'Bosque-Escuela', 'i': 'Pedagogía Verde'},
-        {'tema': 'Metodología', 'p': 'Pedagogía del Flow', 'i': 'Gamificación'},
-        {'tema': 'EF Especializada', 'p': 'Aprendizaje de Aventura', 'i': 'Pedagogía Experidencial'},
-        {'tema': 'Filosofía Educativa', 'p': 'Pedagogía Crítica', 'i': 'Transformación Social'},
-        {'tema': 'Ocio', 'p': 'Pedagogía del Ocio', 'i': 'Recreación Deportiva'},
-        {'tema': 'Inclusión', 'p': 'Interculturalidad', 'i': 'Pedagogía Social'},
-        {'tema': 'Evaluación', 'p': 'Competencia', 'i': 'Capacidad'},
-        # Enseñanza e Iniciación
-    {'tema': 'Modelos', 'p': 'Modelo Técnico', 'i': 'Modelo Comprensivo'},
-    {'tema': 'Iniciación', 'p': 'Deporte Escolar', 'i': 'Deporte Federado'},
-    {'tema': 'Estructura', 'p': 'Táctica', 'i': 'Estrategia'},
-    {'tema': 'Feedback', 'p': 'Conocimiento de los Resultados', 'i': 'Conocimiento de la Ejecución'},
-    {'tema': 'Aprendizaje', 'p': 'Práctica Global', 'i': 'Práctica Analítica'},
-    {'tema': 'Diseño', 'p': 'Tarea Jugada', 'i': 'Ejercicio'},
-
-    # Historia y Epistemología
-    {'tema': 'Grecia', 'p': 'Gimnasio', 'i': 'Palestra'},
-    {'tema': 'Grecia', 'p': 'Esparta', 'i': 'Atenas'},
-    {'tema': 'Edad Media', 'p': 'Justa', 'i': 'Torneo'},
-    {'tema': 'Profesión', 'p': 'Colegiación', 'i': 'Asociacionismo'},
-    {'tema': 'Roma', 'p': 'Circo Romano', 'i': 'Anfiteatro'},
-    {'tema': 'Valores', 'p': 'Juego Limpio', 'i': 'Deportividad'},
-
-    # Psicología del Deporte
-    {'tema': 'Cognición', 'p': 'Atención', 'i': 'Concentración'},
-    {'tema': 'Estado', 'p': 'Ansiedad', 'i': 'Estrés'},
-    {'tema': 'Motivación', 'p': 'Intrínseca', 'i': 'Extrínseca'},
-    {'tema': 'Conducta', 'p': 'Refuerzo', 'i': 'Castigo'},
-    {'tema': 'Personalidad', 'p': 'Rasgo', 'i': 'Estado'},
-    {'tema': 'Social', 'p': 'Liderazgo Autocrático', 'i': 'Liderazgo Democrático'},
-
-    # Danza y Expresión
-    {'tema': 'Laban', 'p': 'Espacio', 'i': 'Tiempo'},
-    {'tema': 'Arte', 'p': 'Coreografía', 'i': 'Improvisación'},
-    {'tema': 'Ritmo', 'p': 'Pulso', 'i': 'Acento'},
-    {'tema': 'Composición', 'p': 'Canon', 'i': 'Unísono'},
-    {'tema': 'Cuerpo', 'p': 'Esquema Corporal', 'i': 'Imagen Corporal'},
-
-    # Atletismo
-    {'tema': 'Carreras', 'p': 'Velocidad', 'i': 'Resistencia'},
-    {'tema': 'Saltos', 'p': 'Longitud', 'i': 'Triple Salto'},
-    {'tema': 'Vallas', 'p': 'Pierna de Ataque', 'i': 'Pierna de Recobro'},
-    {'tema': 'Lanzamientos', 'p': 'Peso', 'i': 'Disco'},
-    {'tema': 'Medición', 'p': 'Anemómetro', 'i': 'Cronómetro'},
-    {'tema': 'Velocidad', 'p': 'Amplitud de Zancada', 'i': 'Frecuencia de Zancada'},
-
-    # Vida Universitaria UEx
-    {'tema': 'Evaluación', 'p': 'Examen Parcial', 'i': 'Examen Final'},
-    {'tema': 'Título', 'p': 'CAFYD', 'i': 'Magisterio EF'}
-    ]
+    biblioteca_palabras = [entry for pack in load_game_content('impostor') for entry in pack.data['entries']]
+    if not biblioteca_palabras:
+        raise Http404("No hay paquetes de palabras activos para El Impostor")
 
     # 1. Recuperar el historial de la sesión
     historial = request.session.get('impostor_history', [])
@@ -547,144 +430,196 @@ def charadas_game(request, group_id=None):
     """
     Juego de mímica y charadas (tipo Heads Up).
     """
-    biblioteca_charadas = {
-        'ENSEÑANZA E INICIACIÓN': [
-    # --- De los Temas 1 y 2 (Estructura y Habilidades) ---
-    'Habilidad Motriz', 'Deporte Individual', 'Deporte de Equipo', 'Adversario', 
-    'Blanco y Diana', 'Cancha Dividida', 'Incertidumbre', 'Espacio Común', 
-    'Reglamento', 'Falta Técnica', 'Fuera de Juego',
-
-    # --- De los Temas 3 y 4 (Modelos y Pericia) ---
-    'Talento Deportivo', 'Modelo Técnico', 'Modelo Comprensivo', 'Creatividad', 
-    'Gesto Deportivo', 'Repetición', 'Toma de Decisiones', 'Estrategia', 
-    'Rendimiento Experto', 'Novato',
-
-    # --- De los Temas 5, 6, 7 y 8 (Iniciación y Entrenador) ---
-    'Iniciación Deportiva', 'Deporte Escolar', 'Competición', 'Victoria', 
-    'Derrota', 'Juego Limpio', 'Entrenador', 'Silbato', 'Pizarra Táctica', 
-    'Cronómetro', 'Sustitución', 'Tiempo Muerto', 'Edad Madurativa', 'Estímulo'
-],
-
-        'EPISTEMOLOGÍA E HISTORIA': [
-    # --- Bloque Epistemología (Ciencia y Profesión) ---
-    'Método Científico', 'Investigación', 'Laboratorio', 'Profesor de EF', 
-    'Entrenador', 'Gestión Deportiva', 'Recreación', 'Director Deportivo',
-    'Código Ético', 'Juego Limpio', 'Colegio Profesional', 'Pre-colegiación',
-    'Igualdad', 'Diversidad', 'Deporte Espectáculo', 'Violencia Deportiva',
-
-    # --- Bloque Historia (Antigüedad y Medievo) ---
-    'Prehistoria', 'Caza y Supervivencia', 'Grecia Antigua', 'Juegos Olímpicos', 
-    'Lucha Canaria', 'Maratón', 'Ilíada y Odisea', 'Platón', 'Aristóteles', 
-    'Gladiador', 'Caballero Medieval', 'Torneo', 'Justa', 'Artes Guerreras',
-
-    # --- Bloque Historia (Moderna y Contemporánea) ---
-    'Renacimiento', 'Humanismo', 'Inglaterra', 'Burguesía', 'Reglamento', 
-    'Pierre de Coubertin', 'Anillos Olímpicos', 'Antorcha', 'Ideología Política', 
-    'Capitalismo', 'Dopaje'
-],
-    
-        'PSICOLOGÍA DEL DEPORTE': [
-    # --- Tema 1 y 2 (Introducción y Procesos Cognitivos) ---
-    'Psicólogo del Deporte', 'Atención', 'Concentración', 'Percepción', 
-    'Sensación', 'Memoria', 'Procesamiento de Información', 'Falso Recuerdo',
-
-    # --- Tema 3 y 4 (Aprendizaje e Intervención) ---
-    'Condicionamiento Clásico', 'Recompensa', 'Castigo', 'Observación', 
-    'Imitación', 'Modificación de Conducta', 'Evaluación', 'Hábito de Sueño',
-
-    # --- Tema 5 y 6 (Emoción, Personalidad y Motivación) ---
-    'Personalidad', 'Emoción', 'Ansiedad', 'Estrés', 'Activación', 
-    'Afrontamiento', 'Relajación', 'Autocontrol', 'Motivación', 
-    'Abandono Deportivo', 'Éxito', 'Fracaso',
-
-    # --- Tema 7 y 8 (Social y Ciclo Vital) ---
-    'Liderazgo', 'Cohesión de Grupo', 'Comunicación', 'Role-playing', 
-    'Dinámica de Grupo', 'Infancia', 'Tercera Edad', 'Retirada Deportiva'
-],
-
-        'DANZA Y EXPRESIÓN CORPORAL': [
-    # --- Tema 1 y 2 (Fundamentos y Factores) ---
-    'Danza', 'Técnica de Estilo', 'Técnica Creativa', 'Cuerpo', 'Espacio', 
-    'Tiempo', 'Energía', 'Fluidez', 'Dimensión Expresiva', 'Comunicación',
-
-    # --- Tema 3, 4 y 5 (Creación y Proyectos) ---
-    'Proyecto Artístico', 'Simbolización', 'Feminismo', 'Identidad', 
-    'Inventiva', 'Comparación', 'Combinación', 'Observador', 
-    'Impresionismo', 'Análisis', 'Contexto',
-
-    # --- Tema 6 y 7 (Didáctica y AFA) ---
-    'Actividades Físico Artísticas', 'Docente Mediador', 'Escenario', 
-    'Recursos Musicales', 'Dinámica de Grupo', 'Reflexión', 
-    'Evaluación', 'Coreografía', 'Puesta en Escena', 'Inclusión'
-],
-
-        'INICIACIÓN AL ATLETISMO': [
-    # --- Bloque I y II (Generalidades y Carreras) ---
-    'Pista Cubierta', 'Aire Libre', 'Juez de Pista', 'Técnica de Carrera', 
-    'Salida de Tacos', 'Foto-finish', 'Carrera de Velocidad', 'Maratón', 
-    'Testigo', 'Zona de Transferencia', 'Paso de Valla', 'Descalificación',
-
-    # --- Bloque III (Saltos) ---
-    'Salto de Longitud', 'Triple Salto', 'Salto de Altura', 'Fosbury Flop', 
-    'Tabla de Batida', 'Foso de Arena', 'Listón', 'Nulo', 'Viento a Favor',
-
-    # --- Bloque IV (Lanzamientos y Otros) ---
-    'Lanzamiento de Peso', 'Artefacto', 'Círculo de Lanzamiento', 'Parada', 
-    'Lanzamiento Nulo', 'Fase de Impulso', 'Fase de Vuelo', 'Cronómetro', 
-    'Educación Física', 'Escuela Deportiva'
-],
-
-        'PRESENTACIÓN': [
-    # --- Personajes y Gente ---
-    'Profesor', 'Delegado', 'Subdelegado', 'Bedel', 'Conserje', 'Alumno de Tercero', 
-    'Novato', 'Graduado', 'Decano', 'Rector', 'Secretaria', 'Personal de Limpieza',
-
-    # --- Lugares del Campus y alrededores ---
-    'Cafetería', 'Gimnasio', 'Pabellón', 'Piscina', 'Pistas de Tenis', 'Laboratorio', 
-    'Biblioteca', 'Reprografía', 'Salón de Actos', 'Despacho', 'Parking', 'Parada de Bus', 
-    'Residencia', 'Césped', 'Cantina', 'Vestuarios',
-
-    # --- Objetos y Material ---
-    'Mochila', 'Carnet Universitario', 'Apuntes', 'Silbato', 'Cronómetro', 
-    'Ordenador', 'Proyector', 'Pizarra', 'Tupper', 'Café', 'Botella de Agua', 
-    'Chándal', 'Zapatillas', 'Cascos', 'Examen',
-
-    # --- Situaciones y Vida Universitaria ---
-    'Prácticas', 'Matrícula', 'Beca', 'Fiesta Universitaria', 'TFG', 'Erasmus', 
-    'Exposición Oral', 'Trabajo en Grupo', 'Nota de Corte', 'Suspenso', 'Aprobado', 
-    'Matrícula de Honor', 'Revisión de Examen'
-],
-        'DEPORTES': [
-    # --- Deportes de Equipo (Clásicos y sala) ---
-    'Baloncesto', 'Fútbol', 'Voleibol', 'Balonmano', 'Rugby', 'Waterpolo', 
-    'Fútbol Sala', 'Hockey Hierba', 'Hockey Patines', 'Béisbol', 'Softbol',
-
-    # --- Deportes de Raqueta y Implemento ---
-    'Tenis', 'Pádel', 'Bádminton', 'Tenis de Mesa', 'Squash', 'Pickleball',
-
-    # --- Deportes Individuales y Gimnásticos ---
-    'Atletismo', 'Natación', 'Gimnasia Rítmica', 'Gimnasia Artística', 
-    'Halterofilia', 'Ciclismo', 'Triatlón', 'Patinaje', 'Esgrima',
-
-    # --- Deportes de Combate ---
-    'Boxeo', 'Judo', 'Karate', 'Taekwondo', 'Lucha Libre', 'Kickboxing',
-
-    # --- Deportes de Naturaleza y Aventura ---
-    'Escalada', 'Senderismo', 'Piragüismo', 'Surf', 'Snowboard', 'Esquí', 
-    'Orientación', 'Barranquismo', 'Vela', 'Equitación',
-
-    # --- Deportes Alternativos y Nuevas Tendencias ---
-    'Yoga', 'Pilates', 'Crossfit', 'Ultimate Frisbee', 'Parkour', 
-    'Skateboarding', 'Golf', 'Tiro con Arco', 'Ajedrez Deportivo'
-],
-    }
-    
-    # Convertimos a JSON para pasarlo a JavaScript fácilmente
-    import json
+    # Las palabras las descarga el navegador del endpoint de cada paquete (cacheado)
     context = {
-        'biblioteca_json': json.dumps(biblioteca_charadas),
-        'categorias': biblioteca_charadas.keys(),
+        'packs': load_game_content('charadas'),
         'group_id': group_id,
     }
     
-    return render(request, 'minigames/charadas_game.html', context)
\ No newline at end of file
+    return render(request, 'minigames/charadas_game.html', context)
+
+# --- PAQUETES DE PALABRAS (JSON) ---
+CONTENT_MAX_AGE = 60 * 60 * 24 * 365
+
+@login_required
+def content_pack(request, game, pack_id):
+    """JSON ya compilado de un paquete de palabras, con ETag y caché larga."""
+    pack = get_compiled_pack(game, pack_id)
+    if pack is None:
+        return JsonResponse({'error': 'Paquete no encontrado.'}, status=404)
+
+    if pack.etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(pack.body, content_type='application/json')
+    response['ETag'] = pack.etag
+    if request.GET.get('v') == pack.fingerprint[:12]:
+        # URL con la huella del contenido: si cambia el paquete cambia la URL
+        response['Cache-Control'] = f'private, max-age={CONTENT_MAX_AGE}, immutable'
+    else:
+        response['Cache-Control'] = 'private, no-cache'
+    return response
+
+# --- PAQUETES DE RONDAS (JSON) ---
+# Cada paquete trae N rondas de golpe (con las URLs de las fotos ya resueltas)
+# y el cliente devuelve todas las respuestas en un único POST, en lugar de
+# GET + POST AJAX + recarga por cada pregunta.
+
+PACK_DEFAULT_SIZE = 10
+PACK_MAX_SIZE = 20
+
+# juego -> (prefijo de puntuación en sesión, filtro del roster, alumnos mínimos)
+PACK_GAMES = {
+    'face_guess': ('face_guess', {'photo': True}, 1),
+    'name_to_face': ('name_to_face', {'photo': True}, 4),
+    'spotify_guess': ('spotify', {'spotify': True}, 4),
+    'quiz_results': ('quiz', {}, 4),
+    'student_interests': ('interests', {}, 4),
+}
+
+
+def build_round(game, target, options, cards=None):
+    """
+    Datos públicos de una ronda y la respuesta esperada (que no se envía).
+    quiz_results necesita las fichas de los alumnos (load_student_cards).
+    """
+    if game == 'face_guess':
+        return {'image': picture_url(target)}, target.id
+
+    if game == 'student_interests':
+        descriptions = [interests_description(s) for s in options]
+        return {
+            'target_name': target.full_name or target.username,
+            'image': picture_url(target),
+            'options': descriptions,
+        }, options.index(target) + 1
+
+    choices = [
+        {'id': s.id, 'name': s.full_name or s.username, 'image': picture_url(s)}
+        for s in options
+    ]
+    if game == 'name_to_face':
+        return {'target_name': target.full_name or target.username, 'options': choices}, target.id
+    if game == 'spotify_guess':
+        return {'embed': target.spotify_embed_url, 'options': choices}, target.id
+    # quiz_results
+    return {
+        'target_name': target.full_name or target.username,
+        'image': picture_url(target),
+        'options': [results_description(cards[s.id]) for s in options],
+    }, options.index(target) + 1
+
+
+@login_required
+def round_pack(request, game, group_id=None):
+    """
+    GET: devuelve un paquete de rondas para el juego.
+    POST (JSON {"answers": {"<ronda>": respuesta}}): corrige el paquete entero.
+    """
+    if game not in PACK_GAMES:
+        return JsonResponse({'error': 'Juego desconocido.'}, status=404)
+    prefix, roster_filter, min_students = PACK_GAMES[game]
+
+    if request.user.role == 'student':
+        group = request.user.student_groups.first()
+        if not group:
+            return JsonResponse({'error': 'No perteneces a ningún grupo.'}, status=404)
+    else:
+        group = get_object_or_404(ClassGroup, id=group_id)
+
+    rounds_state = RoundState(request, prefix, f'{prefix}_pack', group.id)
+    if request.method == 'POST':
+        return grade_round_pack(request, game, rounds_state)
+
+    student_ids = get_group_roster(group.id).eligible(exclude_id=request.user.id, **roster_filter)
+    if len(student_ids) < min_students:
+        return JsonResponse({'error': 'No hay suficientes compañeros para este juego.'}, status=409)
+
+    try:
+        size = min(int(request.GET.get('n', PACK_DEFAULT_SIZE)), PACK_MAX_SIZE)
+    except ValueError:
+        size = PACK_DEFAULT_SIZE
+
+    # Misma selección que las vistas: baraja sin repeticiones + distractores
+    deck = TargetDeck(request.user.id, prefix, group.id)
+    plan = []
+    for _ in range(max(size, 1)):
+        target_id = deck.deal(student_ids)
+        option_ids = []
+        if game != 'face_guess':
+            option_ids = pick_distractors(student_ids, target_id) + [target_id]
+            random.shuffle(option_ids)
+        plan.append((target_id, option_ids))
+
+    needed = {sid for target_id, option_ids in plan for sid in [target_id, *option_ids]}
+    cards = None
+    if game == 'quiz_results':
+        cards = load_student_cards(needed)
+        students = {sid: card['student'] for sid, card in cards.items()}
+    else:
+        students = UserProfile.objects.in_bulk(needed)
+
+    pack, expected = [], {}
+    for target_id, option_ids in plan:
+        if not all(sid in students for sid in [target_id, *option_ids]):
+            continue  # Alguien se ha borrado desde la instantánea: ronda fuera
+        data, answer = build_round(game, students[target_id], [students[sid] for sid in option_ids], cards)
+        number = len(pack) + 1
+        data['round'] = number
+        pack.append(data)
+        expected[str(number)] = answer
+
+    if not pack:
+        return JsonResponse({'error': 'No hay suficientes compañeros para este juego.'}, status=409)
+
+    # Un solo token (o una sola escritura de sesión) por paquete
+    rounds_state.start(expected)
+    return JsonResponse({
+        'game': game,
+        'group': group.id,
+        'rounds': pack,
+        'round_token': rounds_state.token,
+        'correct': rounds_state.correct,
+        'total': rounds_state.total,
+    })
+
+
+def grade_round_pack(request, game, rounds):
+    # En modo token el cliente devuelve el token del paquete en la cabecera X-Round-Token
+    try:
+        expected = rounds.answer()
+    except InvalidRound:
+        expected = None
+    if not expected:
+        return JsonResponse({'error': 'No hay ningún paquete pendiente.'}, status=409)
+    try:
+        answers = json.loads(request.body or b'{}').get('answers', {})
+    except (ValueError, AttributeError):
+        return JsonResponse({'error': 'Formato de respuestas no válido.'}, status=400)
+    if not isinstance(answers, dict):
+        return JsonResponse({'error': 'Formato de respuestas no válido.'}, status=400)
+
+    roster = get_group_roster(rounds.group_id) if game == 'face_guess' else None
+    results = []
+    for number, solution in expected.items():
+        if number not in answers:
+            continue  # Ronda sin contestar: no cuenta
+        answer = answers[number]
+        result = {'round': int(number), 'solution': solution}
+        if game == 'face_guess':
+            keys = roster.answers(solution)
+            if not keys:
+                continue  # Ya no está en el grupo: como si no se hubiera contestado
+            is_correct = match_answer(str(answer), keys)
+            result['name'] = roster.display_name(solution)
+        else:
+            is_correct = str(answer) == str(solution)
+        result['success'] = is_correct
+        results.append(result)
+
+    rounds.record(*[r['success'] for r in results])
+    return rounds.apply(JsonResponse({
+        'results': results,
+        'correct': rounds.correct,
+        'total': rounds.total,
+    }))
@@ -1,3 +1,33 @@
 from django.contrib import admin
+from .models import Option, Question, Questionnaire, UserResult
 
-# Register your models here.
+
+class QuestionInline(admin.TabularInline):
+    model = Question
+    extra = 0
+
+
+@admin.register(Questionnaire)
+class QuestionnaireAdmin(admin.ModelAdmin):
+    list_display = ('title', 'slug', 'tie_policy', 'version')
+    readonly_fields = ('version',)
+    inlines = [QuestionInline]
+
+
+class OptionInline(admin.TabularInline):
+    model = Option
+    extra = 0
+
+
+@admin.register(Question)
+class QuestionAdmin(admin.ModelAdmin):
+    list_display = ('text', 'questionnaire')
+    list_filter = ('questionnaire',)
+    inlines = [OptionInline]
+
+
+@admin.register(UserResult)
+class UserResultAdmin(admin.ModelAdmin):
+    list_display = ('user', 'questionnaire', 'dominant_category')
+    list_filter = ('questionnaire', 'dominant_category')
+    search_fields = ('user__username', 'user__full_name')
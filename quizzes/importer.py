@@ -0,0 +1,253 @@
+"""
+Importación en streaming de fixtures grandes (volcados de dumpdata).
+
+loaddata y el antiguo load_chapman_from_json hacían json.load del fichero
+entero (y el cargador de Chapman, además, tres pasadas sobre la lista). Aquí:
+
+- iter_json_array lee el fichero por trozos y va sacando los objetos de la
+  lista con JSONDecoder.raw_decode: en memoria solo hay un trozo y un objeto;
+- FixtureImporter los convierte con el deserializador de Django, les asigna
+  ids nuevos y los inserta con bulk_create en lotes de tamaño fijo. Las claves
+  ajenas y los m2m se traducen con una tabla pk antiguo -> pk nuevo, que solo
+  se guarda para los modelos a los que apunta alguna relación.
+
+Como en loaddata, los objetos referenciados tienen que aparecer antes en el
+fichero (o existir ya en la base de datos con ese pk); si no, ImportError_.
+Las referencias a modelos excluidos (p. ej. user_permissions, que apunta a
+auth.permission) no se pueden traducir: se quitan y se avisa, salvo que la
+clave no admita nulos, que también da ImportError_.
+"""
+import json
+from collections import Counter
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.core.serializers import python as python_serializer
+from django.db import connection, transaction
+from django.utils.text import slugify
+
+from accounts.text import build_answer_keys, build_search_text
+from teachers.invite_codes import allocate_invite_codes
+
+# Tablas propias de cada instalación: sus ids no coinciden entre entornos
+DEFAULT_EXCLUDE = ('contenttypes', 'auth.permission', 'sessions', 'admin.logentry')
+
+READ_CHUNK_SIZE = 1 << 16
+
+
+def iter_json_array(fp, chunk_size=READ_CHUNK_SIZE):
+    """Genera uno a uno los elementos de una lista JSON leyendo fp por trozos."""
+    decoder = json.JSONDecoder()
+    buffer, pos, eof, started = '', 0, False, False
+
+    def read_more():
+        nonlocal buffer, pos, eof
+        chunk = fp.read(chunk_size)
+        buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                raise ValueError("El fixture termina sin cerrar la lista")
+            read_more()
+            continue
+        if not started:
+            if buffer[pos] != '[':
+                raise ValueError("El fixture debe ser una lista JSON")
+            started = True
+            pos += 1
+            continue
+        if buffer[pos] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            read_more()  # El objeto sigue en el siguiente trozo
+            continue
+        yield item
+        pos = end
+
+
+def _fill_profile_keys(profile):
+    # bulk_create no pasa por UserProfile.save
+    profile.answer_keys = build_answer_keys(getattr(profile, f) for f in profile.ANSWER_KEY_FIELDS)
+    profile.search_text = build_search_text(getattr(profile, f) for f in profile.SEARCH_TEXT_FIELDS)
+
+
+def _fill_slug(questionnaire):
+    if not questionnaire.slug:
+        questionnaire.slug = slugify(questionnaire.title)
+
+
+def _fill_invite_code(group):
+    if not group.invite_code:
+        group.invite_code = allocate_invite_codes(1)[0]
+
+
+# Lo que haría el save() de cada modelo y bulk_create se salta
+BEFORE_INSERT = {
+    'accounts.userprofile': _fill_profile_keys,
+    'quizzes.questionnaire': _fill_slug,
+    'teachers.classgroup': _fill_invite_code,
+}
+
+
+class ImportError_(Exception):
+    """Una referencia del fichero no apunta a nada que se pueda importar."""
+
+
+class _Dropped(Exception):
+    # La referencia apunta a un modelo excluido
+    pass
+
+
+class FixtureImporter:
+    """Inserta los objetos de un fixture en lotes; un importador por fichero."""
+
+    def __init__(self, batch_size=1000, exclude=DEFAULT_EXCLUDE, keep_pks=False):
+        self.batch_size = batch_size
+        self.exclude = set(exclude)
+        self.keep_pks = keep_pks
+        self.remap = {}       # (modelo, pk antiguo) -> pk nuevo
+        self.pending = {}     # modelo -> [(pk antiguo, objeto, m2m_data)]
+        self.pending_keys = set()
+        self.counts = {}
+        self.dropped = Counter()  # (modelo, campo, modelo apuntado) -> referencias quitadas
+        self.existing = {}    # modelo -> pks que ya estaban en la base de datos
+        # Solo hace falta recordar los pks de los modelos a los que apunta algo
+        self.referenced = {
+            field.related_model._meta.label_lower
+            for model in apps.get_models()
+            for field in model._meta.get_fields()
+            if field.is_relation and field.concrete and field.related_model is not None
+        }
+        if not keep_pks and not connection.features.can_return_rows_from_bulk_insert:
+            raise ValueError("Esta base de datos no devuelve los ids de bulk_create: usa keep_pks")
+
+    def _skip(self, label):
+        return label in self.exclude or label.split('.')[0] in self.exclude
+
+    def _resolve(self, model, pk):
+        label = model._meta.label_lower
+        key = (label, pk)
+        if key in self.pending_keys:
+            self.flush()  # El objeto apuntado aún no se ha insertado
+        if key in self.remap:
+            return self.remap[key]
+        if self._skip(label):
+            raise _Dropped()
+        if not self._exists(model, pk):
+            raise ImportError_(f"{label} con pk {pk} no está en el fichero ni en la base de datos")
+        return pk
+
+    def _exists(self, model, pk):
+        known = self.existing.setdefault(model._meta.label_lower, set())
+        if pk not in known and model._base_manager.filter(pk=pk).exists():
+            known.add(pk)
+        return pk in known
+
+    def _resolve_field(self, obj, field, value):
+        try:
+            return self._resolve(field.related_model, value)
+        except _Dropped:
+            if not field.null:
+                raise ImportError_(
+                    f"{obj._meta.label_lower}.{field.name} apunta a {field.related_model._meta.label_lower} "
+                    f"(pk {value}), que no se importa"
+                )
+            self.dropped[obj._meta.label_lower, field.name, field.related_model._meta.label_lower] += 1
+            return None
+
+    def _resolve_m2m(self, obj, name, pks):
+        field = obj._meta.get_field(name)
+        resolved = []
+        for pk in pks:
+            try:
+                resolved.append(self._resolve(field.related_model, pk))
+            except _Dropped:
+                self.dropped[obj._meta.label_lower, name, field.related_model._meta.label_lower] += 1
+        return resolved
+
+    @property
+    def warnings(self):
+        return [
+            f"{label}.{name}: {n} referencias a {target} (excluido) quitadas"
+            for (label, name, target), n in sorted(self.dropped.items())
+        ]
+
+    def add(self, deserialized):
+        obj = deserialized.object
+        label = obj._meta.label_lower
+        for field in obj._meta.concrete_fields:
+            if field.is_relation:
+                value = getattr(obj, field.attname)
+                if value is not None:
+                    setattr(obj, field.attname, self._resolve_field(obj, field, value))
+        m2m = {name: self._resolve_m2m(obj, name, pks) for name, pks in deserialized.m2m_data.items()}
+        old_pk = obj.pk
+        if not self.keep_pks:
+            obj.pk = None
+        prepare = BEFORE_INSERT.get(label)
+        if prepare:
+            prepare(obj)
+
+        batch = self.pending.setdefault(label, [])
+        batch.append((old_pk, obj, m2m))
+        if label in self.referenced:
+            self.pending_keys.add((label, old_pk))
+        if len(batch) >= self.batch_size:
+            self._flush_model(label)
+
+    def _flush_model(self, label):
+        batch = self.pending.pop(label, None)
+        if not batch:
+            return
+        model = batch[0][1].__class__
+        model.objects.bulk_create([obj for _old, obj, _m2m in batch])
+        if label in self.referenced:
+            for old_pk, obj, _m2m in batch:
+                self.remap[label, old_pk] = obj.pk
+                self.pending_keys.discard((label, old_pk))
+
+        # m2m: filas de la tabla intermedia, ya con los pks nuevos
+        through_rows = {}
+        for _old, obj, m2m in batch:
+            for name, target_pks in m2m.items():
+                field = model._meta.get_field(name)
+                through = field.remote_field.through
+                source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+                through_rows.setdefault(through, []).extend(
+                    through(**{f'{source}_id': obj.pk, f'{target}_id': pk}) for pk in target_pks
+                )
+        for through, rows in through_rows.items():
+            through.objects.bulk_create(rows, batch_size=self.batch_size)
+        self.counts[label] = self.counts.get(label, 0) + len(batch)
+
+    def flush(self):
+        for label in list(self.pending):
+            self._flush_model(label)
+
+    def load(self, items):
+        """Importa los objetos (dicts de dumpdata); devuelve {modelo: nº de objetos}."""
+        wanted = (item for item in items if not self._skip(item['model'].lower()))
+        for deserialized in python_serializer.Deserializer(wanted, ignorenonexistent=True):
+            self.add(deserialized)
+        self.flush()
+        if self.keep_pks:
+            # Como loaddata: las secuencias tienen que seguir por encima de los pks importados
+            models = [apps.get_model(label) for label in self.counts]
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                    cursor.execute(sql)
+        return self.counts
+
+
+def import_fixture(path, **options):
+    """Importa un fichero en una transacción; devuelve ({modelo: nº de objetos}, avisos)."""
+    with open(path, encoding='utf-8') as fp, transaction.atomic():
+        importer = FixtureImporter(**options)
+        return importer.load(iter_json_array(fp)), importer.warnings
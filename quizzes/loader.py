@@ -0,0 +1,179 @@
+"""
+Carga idempotente de cuestionarios (VARK, Chapman...).
+
+Los cargadores borraban el cuestionario y volvían a crear cada pregunta y
+opción con un create(): en cada despliegue se perdían en cascada todas las
+respuestas de los alumnos. Ahora el contenido se describe con un
+QuestionnaireSpec y sync_questionnaire:
+
+- calcula el hash del contenido y no hace nada si coincide con el guardado;
+- si no, compara por posición las preguntas y opciones con las de la base de
+  datos y aplica solo las diferencias con bulk_create/bulk_update, todo en
+  una transacción. Solo se borran (con sus respuestas) las preguntas y
+  opciones que ya no están en el contenido.
+
+Lo que no se hace nunca es cambiar el texto o la categoría de una pregunta u
+opción que ya tiene respuestas: la respuesta pasaría a decir otra cosa. En
+ese caso sync_questionnaire lanza SyncConflict y no toca nada; cambiar solo el
+valor sí se permite (después hay que pasar rescore_results).
+
+Al terminar se guarda el Questionnaire, que sube su versión e invalida el
+registry (los bulk_* no lanzan las señales de quizzes/signals.py).
+"""
+import hashlib
+import json
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Option, Question, Questionnaire, UserAnswer
+
+QuestionSpec = namedtuple('QuestionSpec', 'text options')  # options: tuplas (categoría, texto, valor)
+
+
+class QuestionnaireSpec(namedtuple('QuestionnaireSpec', 'slug title description categories questions')):
+    __slots__ = ()
+
+    @property
+    def fingerprint(self):
+        payload = json.dumps(self, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class SyncConflict(ValueError):
+    """El contenido nuevo cambiaría el sentido de preguntas u opciones ya respondidas."""
+
+
+class SyncReport(namedtuple('SyncReport', 'questionnaire skipped created updated deleted')):
+    __slots__ = ()
+
+    def __str__(self):
+        if self.skipped:
+            return f"{self.questionnaire.title}: sin cambios"
+        return (
+            f"{self.questionnaire.title}: {self.created} creadas, {self.updated} actualizadas, "
+            f"{self.deleted} borradas (preguntas + opciones)"
+        )
+
+
+def build_spec(slug, title, description, questions, categories=()):
+    """questions: [(texto, [(categoría, texto, valor), ...]), ...]"""
+    return QuestionnaireSpec(slug, title, description, tuple(categories), tuple(
+        QuestionSpec(text, tuple((category, option_text, value) for category, option_text, value in options))
+        for text, options in questions
+    ))
+
+
+def spec_from_fixture(items, title, slug=None, categories=()):
+    """
+    Spec de un cuestionario a partir de un volcado de dumpdata (lista de
+    objetos quizzes.questionnaire/question/option). Preguntas y opciones en
+    orden de pk, como las creaba el cargador antiguo.
+    """
+    questionnaire, questions, options = None, {}, {}
+    for item in items:
+        model, fields = item['model'], item['fields']
+        if model == 'quizzes.questionnaire' and fields['title'] == title:
+            questionnaire = item
+        elif model == 'quizzes.question':
+            questions[item['pk']] = fields
+        elif model == 'quizzes.option':
+            options.setdefault(fields['question'], []).append(item)
+    if questionnaire is None:
+        raise ValueError(f"No se encontró el cuestionario {title} en el fixture")
+
+    return build_spec(
+        slug or title.lower(), title, questionnaire['fields'].get('description', ''),
+        [
+            (fields['text'], [
+                (o['fields']['category'], o['fields']['text'], o['fields'].get('value', 1))
+                for o in sorted(options.get(pk, ()), key=lambda o: o['pk'])
+            ])
+            for pk, fields in sorted(questions.items())
+            if fields['questionnaire'] == questionnaire['pk']
+        ],
+        categories,
+    )
+
+
+def _check_not_answered(question_ids, option_ids):
+    if not question_ids and not option_ids:
+        return
+    answered = UserAnswer.objects.filter(Q(question_id__in=question_ids) | Q(selected_option_id__in=option_ids))
+    questions = sorted(set(answered.values_list('question_id', flat=True)))
+    if questions:
+        raise SyncConflict(
+            f"Se cambiaría el texto de preguntas u opciones que ya tienen respuestas "
+            f"(preguntas {', '.join(map(str, questions))}). Añade preguntas u opciones nuevas "
+            f"en lugar de reescribir las existentes."
+        )
+
+
+@transaction.atomic
+def sync_questionnaire(spec, force=False):
+    """Deja el cuestionario como dice spec tocando solo lo que cambia; devuelve un SyncReport."""
+    fingerprint = spec.fingerprint
+    questionnaire = Questionnaire.objects.select_for_update().filter(slug=spec.slug).first()
+    if questionnaire is not None and questionnaire.content_hash == fingerprint and not force:
+        return SyncReport(questionnaire, True, 0, 0, 0)
+    if questionnaire is None:
+        questionnaire = Questionnaire(slug=spec.slug, title=spec.title)
+        questionnaire.save()
+
+    existing = list(questionnaire.question_set.order_by('id').prefetch_related('options'))
+    new_questions, changed_questions, new_options, changed_options = [], [], [], []
+    stale_questions = [q.pk for q in existing[len(spec.questions):]]
+    stale_options = []
+
+    reworded_questions, reworded_options = [], []
+    pending = []  # (pregunta nueva, sus opciones): las opciones necesitan el pk
+    for question, wanted in zip(existing, spec.questions):
+        if question.text != wanted.text:
+            reworded_questions.append(question.pk)
+            question.text = wanted.text
+            changed_questions.append(question)
+        current = sorted(question.options.all(), key=lambda o: o.pk)
+        for option, (category, text, value) in zip(current, wanted.options):
+            if (option.category, option.text) != (category, text):
+                reworded_options.append(option.pk)
+            if (option.category, option.text, option.value) != (category, text, value):
+                option.category, option.text, option.value = category, text, value
+                changed_options.append(option)
+        new_options += [
+            Option(question=question, category=category, text=text, value=value)
+            for category, text, value in wanted.options[len(current):]
+        ]
+        stale_options += [option.pk for option in current[len(wanted.options):]]
+    for wanted in spec.questions[len(existing):]:
+        question = Question(questionnaire=questionnaire, text=wanted.text)
+        new_questions.append(question)
+        pending.append((question, wanted.options))
+
+    _check_not_answered(reworded_questions, reworded_options)
+
+    deleted = 0
+    for stale in (Option.objects.filter(pk__in=stale_options), Question.objects.filter(pk__in=stale_questions)):
+        # Cuenta también las opciones que caen en cascada, no las respuestas
+        counts = stale.delete()[1]
+        deleted += counts.get('quizzes.Option', 0) + counts.get('quizzes.Question', 0)
+    Question.objects.bulk_create(new_questions)
+    new_options += [
+        Option(question=question, category=category, text=text, value=value)
+        for question, options in pending
+        for category, text, value in options
+    ]
+    Option.objects.bulk_create(new_options, batch_size=500)
+    Question.objects.bulk_update(changed_questions, ['text'], batch_size=500)
+    Option.objects.bulk_update(changed_options, ['category', 'text', 'value'], batch_size=500)
+
+    questionnaire.title = spec.title
+    questionnaire.description = spec.description
+    if spec.categories:
+        questionnaire.categories = list(spec.categories)
+    questionnaire.content_hash = fingerprint
+    questionnaire.save()
+    return SyncReport(
+        questionnaire, False, len(new_questions) + len(new_options),
+        len(changed_questions) + len(changed_options), deleted,
+    )
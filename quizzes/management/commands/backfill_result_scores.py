@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from quizzes.models import Questionnaire, UserResult
+from quizzes.scoring import get_rubric
+from quizzes.services import iter_stored_scores, store_scores
+
+
+class Command(BaseCommand):
+    help = 'Rellena el vector de puntos y los empates de los UserResult guardados antes de tenerlos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--all', action='store_true', help='Recalcula también los que ya tienen puntos')
+
+    def handle(self, *args, **options):
+        for questionnaire in Questionnaire.objects.all():
+            started = time.monotonic()
+            users = None
+            if not options['all']:
+                users = UserResult.objects.filter(questionnaire=questionnaire, scores={}).values('user_id')
+            written = 0
+            for batch in iter_stored_scores(questionnaire, get_rubric(questionnaire), options['batch_size'], users):
+                written += store_scores(questionnaire, batch, only_changed=options['all'])
+            self.stdout.write(self.style.SUCCESS(
+                f"{questionnaire.title}: {written} resultados completados en {time.monotonic() - started:.2f}s"
+            ))
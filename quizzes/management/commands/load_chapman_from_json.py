@@ -1,13 +1,16 @@
-import json
 import os
 from django.core.management.base import BaseCommand
 from django.conf import settings
-from quizzes.models import Questionnaire, Question, Option
+from quizzes.importer import iter_json_array
+from quizzes.loader import spec_from_fixture, sync_questionnaire
 
 class Command(BaseCommand):
-    help = 'Carga el test de Chapman desde el archivo JSON'
+    help = 'Carga (o actualiza sin borrar respuestas) el test de Chapman desde el archivo JSON'
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Compara con la base de datos aunque el hash no haya cambiado')
+
+    def handle(self, *args, **options):
         # Ruta al archivo JSON
         json_file = os.path.join(settings.BASE_DIR, 'chapman_fixture_complete.json')
         
@@ -17,73 +20,21 @@ class Command(BaseCommand):
             )
             return
 
-        # FORZAR REEMPLAZO: Eliminar Chapman existente si existe
-        existing_chapman = Questionnaire.objects.filter(title__iexact="Chapman")
-        if existing_chapman.exists():
-            self.stdout.write(
-                self.style.WARNING('🗑️  Eliminando Chapman existente para cargar la versión actualizada...')
-            )
-            existing_chapman.delete()
-            self.stdout.write(
-                self.style.SUCCESS('✅ Chapman anterior eliminado correctamente.')
-            )
-
         try:
             self.stdout.write(
                 self.style.SUCCESS('📝 Cargando Chapman educativo desde chapman_fixture_complete.json...')
             )
             
+            # Una sola pasada en streaming sobre el fichero. Ya no se borra el
+            # Chapman existente: solo se aplican las diferencias
             with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            questionnaire_obj = None
-            old_q_pk_to_new = {}
-
-            # Primera pasada: crear Questionnaire
-            for item in data:
-                if item['model'] == 'quizzes.questionnaire':
-                    fields = item['fields']
-                    if fields['title'] == 'Chapman':
-                        questionnaire_obj = Questionnaire.objects.create(
-                            title=fields['title'],
-                            description=fields['description']
-                        )
-                        self.stdout.write(f'✅ Cuestionario creado: {questionnaire_obj.title}')
-                        self.stdout.write(f'📋 Descripción: {questionnaire_obj.description}')
-                        break
+                spec = spec_from_fixture(iter_json_array(f), 'Chapman', categories=['A', 'B', 'C', 'D', 'E'])
+            report = sync_questionnaire(spec, force=options['force'])
 
-            if not questionnaire_obj:
-                self.stdout.write(
-                    self.style.ERROR('No se encontró el cuestionario Chapman en el fixture')
-                )
+            if report.skipped:
+                self.stdout.write(self.style.SUCCESS('✅ Chapman ya estaba al día, no hay nada que cargar.'))
                 return
 
-            # Segunda pasada: crear Questions
-            for item in data:
-                if item['model'] == 'quizzes.question':
-                    fields = item['fields']
-                    question = Question.objects.create(
-                        questionnaire=questionnaire_obj,
-                        text=fields['text']
-                    )
-                    old_q_pk_to_new[item['pk']] = question
-
-            # Tercera pasada: crear Options
-            options_created = 0
-            for item in data:
-                if item['model'] == 'quizzes.option':
-                    fields = item['fields']
-                    old_question_pk = fields['question']
-                    question = old_q_pk_to_new.get(old_question_pk)
-                    if question:
-                        Option.objects.create(
-                            question=question,
-                            text=fields['text'],
-                            category=fields['category'],
-                            value=fields['value']
-                        )
-                        options_created += 1
-
             self.stdout.write(
                 self.style.SUCCESS(
                     f'🎉 ¡Test de Chapman EDUCATIVO cargado exitosamente desde JSON!'
@@ -91,14 +42,14 @@ class Command(BaseCommand):
             )
             self.stdout.write(
                 self.style.SUCCESS(
-                    f'📊 Estadísticas: {len(old_q_pk_to_new)} preguntas, {options_created} opciones'
+                    f'📊 Estadísticas: {len(spec.questions)} preguntas, '
+                    f'{sum(len(q.options) for q in spec.questions)} opciones ({report})'
                 )
             )
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f'🎓 Contexto: Lenguajes del amor adaptados al ámbito universitario'
+            if report.updated or report.deleted:
+                self.stdout.write(
+                    self.style.WARNING('Han cambiado opciones: ejecuta rescore_results para recalcular los resultados.')
                 )
-            )
 
         except Exception as e:
             self.stdout.write(
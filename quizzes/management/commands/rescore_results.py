@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quizzes.models import Questionnaire
+from quizzes.scoring import get_rubric
+from quizzes.services import iter_stored_scores, store_scores
+
+
+class Command(BaseCommand):
+    help = 'Vuelve a corregir todas las respuestas guardadas con la corrección actual de cada cuestionario'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questionnaire', help='Título, slug o id del cuestionario (por defecto, todos)')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--dry-run', action='store_true', help='Corrige pero no guarda')
+
+    def handle(self, *args, **options):
+        questionnaires = Questionnaire.objects.all()
+        wanted = options['questionnaire']
+        if wanted:
+            if wanted.isdigit():
+                questionnaires = questionnaires.filter(pk=wanted)
+            else:
+                questionnaires = questionnaires.filter(title__iexact=wanted) | questionnaires.filter(slug=wanted)
+            if not questionnaires:
+                raise CommandError(f'No existe el cuestionario "{wanted}".')
+
+        for questionnaire in questionnaires:
+            started = time.monotonic()
+            rubric = get_rubric(questionnaire)
+            scored = changed = 0
+            # Streaming por lotes de alumnos: solo un lote de respuestas en memoria
+            for batch in iter_stored_scores(questionnaire, rubric, options['batch_size']):
+                scored += len(batch)
+                if not options['dry_run']:
+                    changed += store_scores(questionnaire, batch)
+
+            self.stdout.write(self.style.SUCCESS(
+                f"{questionnaire.title}: {scored} alumnos corregidos, {changed} resultados cambiados "
+                f"en {time.monotonic() - started:.2f}s"
+            ))
@@ -2,7 +2,10 @@ from django.core.management.base import BaseCommand
 from django.core.management import call_command
 
 class Command(BaseCommand):
-    help = 'Carga ambos tests: Chapman y VARK para producción'
+    help = 'Carga ambos tests: Chapman y VARK para producción (sin tocar nada si no han cambiado)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Compara con la base de datos aunque el hash no haya cambiado')
 
     def handle(self, *args, **kwargs):
         self.stdout.write(self.style.WARNING('Iniciando carga de tests para producción...'))
@@ -10,11 +13,11 @@ class Command(BaseCommand):
         try:
             # Cargar Chapman desde JSON
             self.stdout.write(self.style.WARNING('Cargando test de Chapman...'))
-            call_command('load_chapman_from_json')
+            call_command('load_chapman_from_json', force=kwargs['force'])
             
             # Cargar VARK
             self.stdout.write(self.style.WARNING('Cargando test de VARK...'))
-            call_command('load_vark')
+            call_command('load_vark', force=kwargs['force'])
             
             self.stdout.write(
                 self.style.SUCCESS('✅ Ambos tests cargados exitosamente para producción.')
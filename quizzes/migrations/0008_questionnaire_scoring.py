@@ -0,0 +1,49 @@
+# Generated by Django 4.2.27 on 2026-10-18 15:37
+
+from django.db import migrations, models
+
+# Mismo orden de desempate que tenían las vistas (el orden del diccionario de puntos)
+DEFAULT_CATEGORIES = {
+    'vark': ['V', 'A', 'R', 'K'],
+    'chapman': ['A', 'B', 'C', 'D', 'E'],
+}
+
+
+def set_categories(apps, schema_editor):
+    Questionnaire = apps.get_model('quizzes', 'Questionnaire')
+    for questionnaire in Questionnaire.objects.all():
+        categories = DEFAULT_CATEGORIES.get(questionnaire.title.lower())
+        if categories:
+            questionnaire.categories = categories
+            questionnaire.save(update_fields=['categories'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0007_alter_option_category_alter_option_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionnaire',
+            name='categories',
+            field=models.JSONField(blank=True, default=list, help_text='Códigos de categoría en orden de desempate. Vacío: las de las opciones.'),
+        ),
+        migrations.AddField(
+            model_name='questionnaire',
+            name='category_weights',
+            field=models.JSONField(blank=True, default=dict, help_text='Peso de cada categoría, p.ej. {"V": 1.5}. Por defecto 1.'),
+        ),
+        migrations.AddField(
+            model_name='questionnaire',
+            name='tie_policy',
+            field=models.CharField(choices=[('order', 'La primera según el orden de categorías'), ('latest', 'La última elegida entre las empatadas')], default='order', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='questionnaire',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.RunPython(set_categories, migrations.RunPython.noop),
+    ]
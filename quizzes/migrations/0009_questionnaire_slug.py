@@ -0,0 +1,32 @@
+# Generated by Django 4.2.27 on 2026-10-18 15:39
+
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def fill_slugs(apps, schema_editor):
+    Questionnaire = apps.get_model('quizzes', 'Questionnaire')
+    used = set()
+    for questionnaire in Questionnaire.objects.order_by('id'):
+        slug = base = slugify(questionnaire.title) or f'test-{questionnaire.id}'
+        if slug in used:
+            slug = f'{base}-{questionnaire.id}'
+        used.add(slug)
+        questionnaire.slug = slug
+        questionnaire.save(update_fields=['slug'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0008_questionnaire_scoring'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionnaire',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=100, null=True, unique=True),
+        ),
+        migrations.RunPython(fill_slugs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.27 on 2026-10-18 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0009_questionnaire_slug'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userresult',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='userresult',
+            name='scores',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='userresult',
+            name='tied_categories',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
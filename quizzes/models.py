@@ -1,12 +1,44 @@
 from django.db import models
+from django.utils.text import slugify
 from accounts.models import UserProfile
 from .constants import ALL_CATEGORIES  
 
 
 class Questionnaire(models.Model):
+    TIE_POLICIES = (
+        ('order', 'La primera según el orden de categorías'),
+        ('latest', 'La última elegida entre las empatadas'),
+    )
+
     title = models.CharField(max_length=100)
+    # Identificador estable para buscar el test (ver quizzes/registry.py)
+    slug = models.SlugField(max_length=100, unique=True, null=True, blank=True)
     description = models.TextField(blank=True)
 
+    # --- CORRECCIÓN (ver quizzes/scoring.py) ---
+    categories = models.JSONField(
+        default=list, blank=True,
+        help_text="Códigos de categoría en orden de desempate. Vacío: las de las opciones."
+    )
+    category_weights = models.JSONField(
+        default=dict, blank=True,
+        help_text="Peso de cada categoría, p.ej. {\"V\": 1.5}. Por defecto 1."
+    )
+    tie_policy = models.CharField(max_length=10, choices=TIE_POLICIES, default='order')
+    # Sube con cada cambio del cuestionario, sus preguntas u opciones
+    version = models.PositiveIntegerField(default=1, editable=False)
+    # Hash del contenido cargado por quizzes/loader.py (si coincide, no se recarga)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = slugify(self.title)
+        if self.pk:
+            self.version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.title
 
@@ -42,6 +74,11 @@ class UserResult(models.Model):
     user = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
     questionnaire = models.ForeignKey(Questionnaire, on_delete=models.CASCADE)
     dominant_category = models.CharField(max_length=1, choices=ALL_CATEGORIES) 
+    # Vector completo de puntos por categoría ({"V": 5, "A": 3, ...}) y
+    # categorías empatadas en cabeza, guardados al enviar el test
+    scores = models.JSONField(default=dict, blank=True)
+    tied_categories = models.JSONField(default=list, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         unique_together = ('user', 'questionnaire')
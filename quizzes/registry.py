@@ -0,0 +1,103 @@
+"""
+Registro en memoria de los cuestionarios.
+
+Cada GET de un test buscaba el cuestionario por title__iexact (sin índice) y
+volvía a traer todas las preguntas y opciones, aunque solo cambian cuando se
+ejecuta un cargador o se toca el admin. Aquí cada proceso guarda, por slug,
+una instantánea inmutable (tuplas) de la versión actual del cuestionario, con
+su Rubric de corrección y los fragmentos HTML de las preguntas ya renderizados.
+
+Para saber si la instantánea sigue valiendo se mira la versión apuntada en la
+caché de Django, que las señales de quizzes/signals.py borran cuando cambia el
+contenido; si no está, una consulta de la versión basta para comprobarlo.
+"""
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from .models import Questionnaire
+from .scoring import Rubric
+
+# Tope de lo que puede tardar otro proceso en ver un cambio si la caché no es compartida
+REGISTRY_STAMP_TIMEOUT = 60 * 5
+
+OptionSnapshot = namedtuple('OptionSnapshot', 'id text category value')
+QuestionSnapshot = namedtuple('QuestionSnapshot', 'id text options')
+
+
+def version_cache_key(slug):
+    return f'quizzes:version:{slug}'
+
+
+class QuestionnaireSnapshot:
+    """Una versión concreta de un cuestionario, con sus preguntas y opciones."""
+
+    __slots__ = (
+        'id', 'slug', 'title', 'description', 'version',
+        'categories', 'category_weights', 'tie_policy',
+        'questions', 'rubric', '_fragments',
+    )
+
+    def __init__(self, questionnaire, questions):
+        self.id = questionnaire.id
+        self.slug = questionnaire.slug
+        self.title = questionnaire.title
+        self.description = questionnaire.description
+        self.version = questionnaire.version
+        self.categories = tuple(questionnaire.categories or ())
+        self.category_weights = dict(questionnaire.category_weights or {})
+        self.tie_policy = questionnaire.tie_policy
+        self.questions = tuple(
+            QuestionSnapshot(q.id, q.text, tuple(
+                OptionSnapshot(o.id, o.text, o.category, o.value) for o in q.options.all()
+            ))
+            for q in questions
+        )
+        self.rubric = Rubric(self, (
+            (o.id, o.category, o.value) for q in self.questions for o in q.options
+        ))
+        self._fragments = {}
+
+    def render_questions(self, template_name):
+        """HTML de las preguntas con la plantilla indicada (se renderiza una vez por versión)."""
+        html = self._fragments.get(template_name)
+        if html is None:
+            html = self._fragments[template_name] = render_to_string(template_name, {'questions': self.questions})
+        return html
+
+
+_snapshots = {}
+
+
+def _load(slug):
+    questionnaire = Questionnaire.objects.get(slug=slug)
+    questions = questionnaire.question_set.order_by('id').prefetch_related('options')
+    return QuestionnaireSnapshot(questionnaire, questions)
+
+
+def get_questionnaire(slug):
+    """
+    Instantánea del cuestionario; lanza Questionnaire.DoesNotExist si no existe.
+    Con la caché caliente no hace ninguna consulta.
+    """
+    key = version_cache_key(slug)
+    snapshot = _snapshots.get(slug)
+    stamp = cache.get(key)
+    if snapshot is not None:
+        if stamp == snapshot.version:
+            return snapshot
+        if stamp is None:
+            stamp = Questionnaire.objects.filter(slug=slug).values_list('version', flat=True).first()
+            if stamp == snapshot.version:
+                cache.set(key, stamp, REGISTRY_STAMP_TIMEOUT)
+                return snapshot
+    snapshot = _snapshots[slug] = _load(slug)
+    cache.set(key, snapshot.version, REGISTRY_STAMP_TIMEOUT)
+    return snapshot
+
+
+def invalidate_questionnaires(slugs):
+    keys = [version_cache_key(slug) for slug in slugs if slug]
+    if keys:
+        cache.delete_many(keys)
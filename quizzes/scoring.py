@@ -0,0 +1,113 @@
+"""
+Motor de corrección de cuestionarios.
+
+La corrección ya no está escrita a mano en cada vista: sale de los datos del
+Questionnaire (categories, category_weights, tie_policy). Para cada versión
+del cuestionario se construye una sola vez la matriz opción -> (categoría,
+peso), y corregir un envío (o miles de envíos guardados) es acumular esos pesos
+en un vector por alumno, sin más consultas.
+
+Para añadir un test nuevo basta con cargar sus preguntas y opciones y, si hace
+falta, ajustar categorías, pesos o desempate en el admin.
+"""
+from collections import namedtuple
+
+from .constants import ALL_CATEGORIES
+from .models import Option
+
+# Orden de desempate por defecto: el de las constantes (V, A, R, K / A..E)
+DEFAULT_CATEGORY_ORDER = [code for code, _label in ALL_CATEGORIES]
+
+ScoreResult = namedtuple('ScoreResult', 'scores dominant tied')
+
+
+class Rubric:
+    """Matriz de pesos de una versión concreta de un cuestionario."""
+
+    __slots__ = ('questionnaire_id', 'version', 'categories', 'tie_policy', 'weights')
+
+    def __init__(self, questionnaire, options):
+        # options: tuplas (id, categoría, valor)
+        options = list(options)
+        categories = list(questionnaire.categories or ())
+        if not categories:
+            present = {category for _id, category, _value in options}
+            categories = [c for c in DEFAULT_CATEGORY_ORDER if c in present]
+            categories += sorted(present - set(DEFAULT_CATEGORY_ORDER))
+        index = {category: i for i, category in enumerate(categories)}
+        category_weights = questionnaire.category_weights or {}
+
+        self.questionnaire_id = questionnaire.id
+        self.version = questionnaire.version
+        self.categories = tuple(categories)
+        self.tie_policy = questionnaire.tie_policy
+        # Las opciones de categorías que no están en la lista no puntúan
+        self.weights = {
+            option_id: (index[category], value * category_weights.get(category, 1))
+            for option_id, category, value in options
+            if category in index
+        }
+
+    def vector(self, option_ids):
+        scores = [0] * len(self.categories)
+        weights = self.weights
+        for option_id in option_ids:
+            weight = weights.get(option_id)
+            if weight:
+                scores[weight[0]] += weight[1]
+        return scores
+
+    def resolve(self, scores, option_ids=()):
+        """Categoría dominante y lista de empatadas según tie_policy."""
+        if not scores:
+            return ScoreResult({}, None, ())
+        best = max(scores)
+        tied = [i for i, value in enumerate(scores) if value == best]
+        winner = tied[0]
+        if len(tied) > 1 and self.tie_policy == 'latest':
+            for option_id in reversed(option_ids):
+                weight = self.weights.get(option_id)
+                if weight and weight[0] in tied:
+                    winner = weight[0]
+                    break
+        return ScoreResult(
+            dict(zip(self.categories, scores)),
+            self.categories[winner],
+            tuple(self.categories[i] for i in tied) if len(tied) > 1 else (),
+        )
+
+    def score(self, option_ids):
+        """Corrige un envío: option_ids en el orden en que se contestaron."""
+        option_ids = list(option_ids)
+        return self.resolve(self.vector(option_ids), option_ids)
+
+    def score_many(self, rows):
+        """
+        Corrige muchos envíos de una pasada. rows son pares (clave, option_id),
+        p.ej. (user_id, selected_option_id); devuelve {clave: ScoreResult}.
+        """
+        vectors, answered = {}, {}
+        size, weights = len(self.categories), self.weights
+        keep_order = self.tie_policy == 'latest'  # Solo entonces importa el orden
+        for key, option_id in rows:
+            scores = vectors.get(key)
+            if scores is None:
+                scores = vectors[key] = [0] * size
+            if keep_order:
+                answered.setdefault(key, []).append(option_id)
+            weight = weights.get(option_id)
+            if weight:
+                scores[weight[0]] += weight[1]
+        return {key: self.resolve(scores, answered.get(key, ())) for key, scores in vectors.items()}
+
+
+_rubrics = {}
+
+
+def get_rubric(questionnaire):
+    """Rubric de la versión actual del cuestionario (una consulta si no está en memoria)."""
+    rubric = _rubrics.get(questionnaire.id)
+    if rubric is None or rubric.version != questionnaire.version:
+        options = Option.objects.filter(question__questionnaire=questionnaire).values_list('id', 'category', 'value')
+        rubric = _rubrics[questionnaire.id] = Rubric(questionnaire, options)
+    return rubric
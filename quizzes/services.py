@@ -0,0 +1,152 @@
+"""
+Guardado de las respuestas de un cuestionario.
+
+Antes cada pregunta hacía un Option.objects.get y un UserAnswer.objects.create
+(más el borrado y la creación del resultado), fuera de cualquier transacción:
+más de 35 consultas por envío del VARK. Aquí las opciones se validan contra
+las que ya vienen precargadas con las preguntas y todo se escribe en bloque
+dentro de una transacción, con un número de consultas fijo.
+"""
+from itertools import groupby, islice
+
+from django.db import IntegrityError, transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from teachers.stats import record_result_changes
+from .models import UserAnswer, UserResult
+from .registry import invalidate_questionnaires
+
+
+class InvalidSubmission(ValueError):
+    """Alguna respuesta no corresponde a una opción de su pregunta."""
+
+
+def selected_options(questions, data, prefix='question_'):
+    """
+    Devuelve [(pregunta, opción)] con las respuestas enviadas.
+
+    questions son las preguntas de la instantánea del cuestionario (registry),
+    con sus opciones: no se hace ninguna consulta. Las preguntas sin contestar
+    se omiten.
+    """
+    selected = []
+    for question in questions:
+        raw = data.get(f"{prefix}{question.id}")
+        if not raw:
+            continue
+        options = {str(option.id): option for option in question.options}
+        option = options.get(str(raw))
+        if option is None:
+            raise InvalidSubmission(f"Opción {raw!r} no válida para la pregunta {question.id}")
+        selected.append((question, option))
+    return selected
+
+
+def save_submission(user, questionnaire, data):
+    """
+    Valida y guarda las respuestas de un cuestionario (instantánea del
+    registry) y su resultado.
+
+    En la transacción: un DELETE de las respuestas anteriores, un bulk_create
+    de las nuevas, un upsert del UserResult y el ajuste de las estadísticas de
+    sus grupos. Devuelve el resultado.
+    """
+    answers = selected_options(questionnaire.questions, data)
+    score = questionnaire.rubric.score(option.id for _question, option in answers)
+
+    result = UserResult(
+        user=user, questionnaire_id=questionnaire.id, dominant_category=score.dominant,
+        scores=score.scores, tied_categories=list(score.tied), completed_at=timezone.now(),
+    )
+    try:
+        with transaction.atomic():
+            # El upsert no lanza señales: la categoría anterior hace falta para las estadísticas
+            previous = UserResult.objects.filter(
+                user=user, questionnaire_id=questionnaire.id
+            ).values_list('dominant_category', flat=True).first()
+            UserAnswer.objects.filter(user=user, question__questionnaire_id=questionnaire.id).delete()
+            UserAnswer.objects.bulk_create([
+                UserAnswer(user=user, question_id=question.id, selected_option_id=option.id)
+                for question, option in answers
+            ])
+            UserResult.objects.bulk_create(
+                [result],
+                update_conflicts=True,
+                unique_fields=['user', 'questionnaire'],
+                update_fields=['dominant_category', 'scores', 'tied_categories', 'completed_at'],
+            )
+            record_result_changes([(user.id, questionnaire.id, previous, score.dominant)])
+    except IntegrityError:
+        # La instantánea era de una versión anterior (un cargador borró las opciones)
+        invalidate_questionnaires([questionnaire.slug])
+        raise InvalidSubmission("El cuestionario ha cambiado mientras se respondía")
+    return result
+
+
+def dominant_category(slug, user=OuterRef('pk')):
+    """Subquery con la categoría dominante del alumno en el test, para annotate()."""
+    return Subquery(
+        UserResult.objects.filter(user=user, questionnaire__slug=slug)
+        .values('dominant_category')[:1]
+    )
+
+
+# --- Corrección de respuestas ya guardadas (comandos rescore/backfill) ---
+
+def iter_stored_scores(questionnaire, rubric, batch_size=2000, users=None):
+    """
+    Recorre en streaming las respuestas guardadas del cuestionario, ordenadas
+    por alumno, y devuelve lotes de hasta batch_size pares (user_id, ScoreResult).
+    Solo hay en memoria las respuestas de un lote.
+    """
+    answers = UserAnswer.objects.filter(question__questionnaire=questionnaire)
+    if users is not None:
+        answers = answers.filter(user__in=users)
+    rows = (
+        answers.order_by('user_id', 'id')
+        .values_list('user_id', 'selected_option_id')
+        .iterator(chunk_size=batch_size)
+    )
+    per_user = groupby(rows, key=lambda row: row[0])
+    while True:
+        # Cada grupo se consume antes de avanzar groupby al siguiente alumno
+        chunk = [row for _user_id, user_rows in islice(per_user, batch_size) for row in user_rows]
+        if not chunk:
+            return
+        yield list(rubric.score_many(chunk).items())
+
+
+def store_scores(questionnaire, batch, only_changed=True):
+    """
+    Upsert en bloque de los resultados de un lote, ajustando las estadísticas
+    de los grupos; devuelve cuántos se escribieron.
+    """
+    current = {
+        user_id: (dominant, scores, tied)
+        for user_id, dominant, scores, tied in UserResult.objects.filter(
+            questionnaire=questionnaire, user_id__in=[user_id for user_id, _ in batch]
+        ).values_list('user_id', 'dominant_category', 'scores', 'tied_categories')
+    }
+    rows = [
+        UserResult(
+            user_id=user_id, questionnaire_id=questionnaire.id, dominant_category=score.dominant,
+            scores=score.scores, tied_categories=list(score.tied),
+        )
+        for user_id, score in batch
+        if score.dominant and not (
+            only_changed and current.get(user_id) == (score.dominant, score.scores, list(score.tied))
+        )
+    ]
+    with transaction.atomic():
+        UserResult.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['user', 'questionnaire'],
+            update_fields=['dominant_category', 'scores', 'tied_categories'],
+        )
+        record_result_changes(
+            (row.user_id, questionnaire.id, current.get(row.user_id, (None,))[0], row.dominant_category)
+            for row in rows
+        )
+    return len(rows)
@@ -0,0 +1,31 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Option, Question, Questionnaire
+from .registry import invalidate_questionnaires
+
+
+def bump_version(questionnaire_filter):
+    # update() no pasa por Questionnaire.save, así que subimos la versión aquí
+    questionnaires = Questionnaire.objects.filter(**questionnaire_filter)
+    questionnaires.update(version=F('version') + 1)
+    invalidate_questionnaires(questionnaires.values_list('slug', flat=True))
+
+
+@receiver(post_save, sender=Questionnaire)
+@receiver(post_delete, sender=Questionnaire)
+def questionnaire_changed(sender, instance, **kwargs):
+    invalidate_questionnaires([instance.slug])
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_changed(sender, instance, **kwargs):
+    bump_version({'pk': instance.questionnaire_id})
+
+
+@receiver(post_save, sender=Option)
+@receiver(post_delete, sender=Option)
+def option_changed(sender, instance, **kwargs):
+    bump_version({'question__id': instance.question_id})
@@ -1,53 +1,42 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
-from .models import Questionnaire, Question, Option, UserAnswer, UserResult
-from django.http import HttpResponse
+from django.http import Http404
+from .models import Questionnaire, UserResult
+from .registry import get_questionnaire
+from .services import InvalidSubmission, save_submission
 from django.contrib import messages
-from django.db.models import Q
 
-@login_required
-def take_vark_quiz(request):
-    if request.user.role != 'student':
-        return redirect('login')
-
-    questionnaire = get_object_or_404(Questionnaire, title__iexact="VARK")
-    questions = questionnaire.question_set.prefetch_related('options')
+def take_quiz(request, slug, template_name, fragment_name, result_url):
+    """Muestra y guarda un cuestionario a partir de su instantánea del registro."""
+    try:
+        questionnaire = get_questionnaire(slug)
+    except Questionnaire.DoesNotExist:
+        raise Http404("Cuestionario no encontrado")
 
     if request.method == "POST":
-        UserAnswer.objects.filter(user=request.user, question__in=questions).delete()
-
-        scores = {'V': 0, 'A': 0, 'R': 0, 'K': 0}
-
-        for question in questions:
-            selected_id = request.POST.get(f"question_{question.id}")
-            if selected_id:
-                option = Option.objects.get(id=selected_id)
-                UserAnswer.objects.create(
-                    user=request.user,
-                    question=question,
-                    selected_option=option
-                )
-                scores[option.category] += option.value
+        try:
+            save_submission(request.user, questionnaire, request.POST)
+        except InvalidSubmission:
+            messages.error(request, "Alguna respuesta no es válida. Vuelve a intentarlo.")
+            return redirect(request.path)
 
-        dominant = max(scores, key=scores.get)
+        return redirect(result_url)
 
-        UserResult.objects.update_or_create(
-            user=request.user,
-            questionnaire=questionnaire,
-            defaults={"dominant_category": dominant}
-        )
-
-        return redirect("vark_result")
-
-    return render(request, "quizzes/vark_quiz.html", {
+    return render(request, template_name, {
         "questionnaire": questionnaire,
-        "questions": questions
+        "questions_html": questionnaire.render_questions(fragment_name),
     })
 
+@login_required
+def take_vark_quiz(request):
+    if request.user.role != 'student':
+        return redirect('login')
+    return take_quiz(request, 'vark', "quizzes/vark_quiz.html", "quizzes/_vark_questions.html", "vark_result")
+
 @login_required
 def vark_result(request):
     try:
-        result = UserResult.objects.get(user=request.user, questionnaire__title="VARK")
+        result = UserResult.objects.get(user=request.user, questionnaire__slug="vark")
     except UserResult.DoesNotExist:
         messages.warning(request, "Primero debes realizar el test VARK para ver tus resultados.")
         return redirect('take_vark_quiz')
@@ -100,66 +89,13 @@ def vark_result(request):
 
 @login_required
 def take_chapman_quiz(request):
-    questionnaire = get_object_or_404(Questionnaire, title__iexact="Chapman")
-    questions = questionnaire.question_set.prefetch_related('options')
-
-    if request.method == "POST":
-        UserAnswer.objects.filter(user=request.user, question__in=questions).delete()
-
-        # Nuevo mapeo para las categorías del test adaptado
-        CATEGORY_MAP = {
-            'A': 'Palabras de Afirmación',
-            'B': 'Tiempo de Calidad',
-            'C': 'Recibir Detalles o Regalos',
-            'D': 'Actos de Servicio',
-            'E': 'Contacto o Presencia Física y Emocional',
-        }
-
-        REVERSE_CATEGORY_MAP = {v: k for k, v in CATEGORY_MAP.items()}
-
-        scores = {
-            'Palabras de Afirmación': 0,
-            'Tiempo de Calidad': 0,
-            'Recibir Detalles o Regalos': 0,
-            'Actos de Servicio': 0,
-            'Contacto o Presencia Física y Emocional': 0,
-        }
-
-        for question in questions:
-            selected_id = request.POST.get(f"question_{question.id}")
-            if selected_id:
-                option = Option.objects.get(id=selected_id)
-                UserAnswer.objects.create(
-                    user=request.user,
-                    question=question,
-                    selected_option=option
-                )
-                # Mapear la categoría directamente ya que las opciones usan A, B, C, D, E
-                translated_category = CATEGORY_MAP.get(option.category, option.category)
-                scores[translated_category] += option.value
-
-        dominant = max(scores, key=scores.get)  # Dominante en forma larga
-
-        UserResult.objects.filter(user=request.user, questionnaire=questionnaire).delete()
-
-        UserResult.objects.create(
-            user=request.user,
-            questionnaire=questionnaire,
-            dominant_category=REVERSE_CATEGORY_MAP[dominant]  # Guardamos solo 'A', 'B', etc.
-        )
-
-        return redirect("chapman_result")
-
-    return render(request, "quizzes/chapman_quiz.html", {
-        "questionnaire": questionnaire,
-        "questions": questions
-    })
+    return take_quiz(request, 'chapman', "quizzes/chapman_quiz.html", "quizzes/_chapman_questions.html", "chapman_result")
 
     
 @login_required
 def chapman_result(request):
     try:
-        result = UserResult.objects.get(user=request.user, questionnaire__title__iexact="Chapman")
+        result = UserResult.objects.get(user=request.user, questionnaire__slug="chapman")
     except UserResult.DoesNotExist:
         messages.warning(request, "Primero debes realizar el test de Chapman para ver tus resultados.")
         return redirect('take_chapman_quiz')
@@ -90,6 +90,32 @@ DATABASES = {
     }
 }
 
+# Caché compartida (instantáneas de alumnos por grupo, etc.). Por defecto memoria
+# local del proceso; en producción puede apuntarse a Redis/Memcached por entorno.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'relaciona'),
+    },
+    # Contadores de los límites de intentos (unirse con código): siempre en
+    # memoria del proceso, así que el límite es por proceso
+    'ratelimit': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'relaciona-ratelimit',
+    },
+}
+# Intentos por minuto con un mismo código de invitación (ver teachers/joining.py)
+JOIN_RATE_LIMIT = int(os.getenv('JOIN_RATE_LIMIT', '300'))
+# Intentos por minuto de un mismo alumno, con cualquier código
+JOIN_USER_RATE_LIMIT = int(os.getenv('JOIN_USER_RATE_LIMIT', '20'))
+
+# Minijuegos: rondas con token firmado y marcador en cookie firmada, sin
+# escribir en la tabla de sesiones en cada respuesta (ver minigames/tokens.py)
+MINIGAMES_ROUND_TOKENS = os.getenv('MINIGAMES_ROUND_TOKENS', 'True') == 'True'
+# Marcadores persistentes (GameScore): se vuelcan en bloque cada N segundos o N respuestas
+MINIGAMES_SCORE_FLUSH_SECONDS = int(os.getenv('MINIGAMES_SCORE_FLUSH_SECONDS', '5'))
+MINIGAMES_SCORE_FLUSH_EVENTS = int(os.getenv('MINIGAMES_SCORE_FLUSH_EVENTS', '50'))
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
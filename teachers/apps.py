@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TeachersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'teachers'
+
+    def ready(self):
+        # Registra los receptores que mantienen las estadísticas de los grupos
+        from . import signals  # noqa: F401
@@ -0,0 +1,86 @@
+"""
+Resumen de los grupos de un profesor para sus páginas de inicio.
+
+view_groups.html pedía group.students.count dos veces por grupo y
+teacher_home.html recorría user.teaching_groups.all en la plantilla: 2N+1
+consultas por visita. Aquí una sola consulta devuelve cada grupo con sus
+recuentos anotados (alumnos, tests hechos y última actividad) y el resultado
+se guarda en la caché por profesor.
+
+Se invalida desde teachers/signals.py (grupos y pertenencia) y desde
+teachers/stats.py (resultados de tests). Los marcadores de los minijuegos
+cambian en cada ronda y no invalidan: su hora de actividad puede llegar con
+hasta DASHBOARD_CACHE_TIMEOUT de retraso.
+"""
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, Greatest
+
+from minigames.models import GameScore
+from quizzes.models import UserResult
+from .models import ClassGroup, GroupCategoryStats
+
+DASHBOARD_CACHE_TIMEOUT = 60 * 5
+
+GroupSummary = namedtuple(
+    'GroupSummary', 'id name invite_code students vark_done chapman_done last_activity'
+)
+
+
+def dashboard_cache_key(teacher_id):
+    return f'teachers:dashboard:{teacher_id}'
+
+
+def _per_group(queryset, group_field, aggregate):
+    # Agregado correlacionado por grupo; 0 en vez de NULL si no hay filas
+    return Coalesce(Subquery(
+        queryset.filter(**{group_field: OuterRef('pk')})
+        .values(group_field).annotate(total=aggregate).values('total')[:1],
+        output_field=IntegerField(),
+    ), 0)
+
+
+def _tests_done(slug):
+    # Sale de GroupCategoryStats: la suma de sus recuentos es cuántos alumnos lo han hecho
+    return _per_group(GroupCategoryStats.objects.filter(questionnaire__slug=slug), 'group', Sum('count'))
+
+
+def _load(teacher_id):
+    last_result = Subquery(
+        UserResult.objects.filter(user__student_groups=OuterRef('pk'), completed_at__isnull=False)
+        .order_by('-completed_at').values('completed_at')[:1]
+    )
+    last_game = Subquery(
+        GameScore.objects.filter(group=OuterRef('pk')).order_by('-updated_at').values('updated_at')[:1]
+    )
+    groups = (
+        ClassGroup.objects.filter(teacher_id=teacher_id)
+        .order_by('id')
+        .annotate(
+            students_count=_per_group(ClassGroup.students.through.objects.all(), 'classgroup', Count('*')),
+            vark_done=_tests_done('vark'),
+            chapman_done=_tests_done('chapman'),
+            # Greatest con NULL da NULL en algunas bases de datos: se rellena con el otro
+            last_activity=Greatest(Coalesce(last_result, last_game), Coalesce(last_game, last_result)),
+        )
+        .values_list('id', 'name', 'invite_code', 'students_count', 'vark_done', 'chapman_done', 'last_activity')
+    )
+    return [GroupSummary(*row) for row in groups]
+
+
+def teacher_dashboard(teacher_id):
+    """Lista de GroupSummary de los grupos del profesor (una consulta si no está en caché)."""
+    key = dashboard_cache_key(teacher_id)
+    groups = cache.get(key)
+    if groups is None:
+        groups = _load(teacher_id)
+        cache.set(key, groups, DASHBOARD_CACHE_TIMEOUT)
+    return groups
+
+
+def invalidate_teacher_dashboards(teacher_ids):
+    keys = [dashboard_cache_key(teacher_id) for teacher_id in set(teacher_ids) if teacher_id]
+    if keys:
+        cache.delete_many(keys)
@@ -0,0 +1,112 @@
+"""
+Exportación de los grupos de un profesor (CSV o JSONL).
+
+Una fila por alumno y grupo con los datos del perfil, los resultados de VARK y
+Chapman y los marcadores de los minijuegos. Las filas se generan en streaming:
+la pertenencia a los grupos se recorre con .iterator() (cursor de servidor en
+Postgres) y, por cada bloque de alumnos, los resultados y marcadores salen de
+dos consultas más. Nunca está el fichero entero en memoria.
+"""
+import csv
+import json
+from itertools import islice
+
+from minigames.models import GameScore
+from quizzes.models import UserResult
+from .models import ClassGroup
+
+EXPORT_CHUNK_SIZE = 500
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+# Campos del perfil (del modelo UserProfile) que se exportan
+PROFILE_FIELDS = (
+    'username', 'full_name', 'nickname', 'email', 'date_of_birth', 'gender', 'residence_area',
+    'favorite_song', 'favorite_artist', 'favorite_movie', 'favorite_place',
+)
+TESTS = ('vark', 'chapman')
+GAMES = [game for game, _label in GameScore.GAME_CHOICES]
+
+COLUMNS = (
+    'group_id', 'group', 'student_id', *PROFILE_FIELDS,
+    *(f'{test}{suffix}' for test in TESTS for suffix in ('', '_scores', '_completed_at')),
+    *(f'{game}_{stat}' for game in GAMES for stat in ('correct', 'total', 'best_streak')),
+)
+
+
+def iter_export_rows(teacher, group_ids=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Genera un dict por (grupo, alumno), en el orden de COLUMNS."""
+    groups = ClassGroup.objects.filter(teacher=teacher)
+    if group_ids is not None:
+        groups = groups.filter(pk__in=group_ids)
+    members = (
+        ClassGroup.students.through.objects.filter(classgroup__in=groups)
+        .order_by('classgroup_id', 'userprofile_id')
+        .values_list('classgroup_id', 'classgroup__name', 'userprofile_id',
+                     *(f'userprofile__{field}' for field in PROFILE_FIELDS))
+        .iterator(chunk_size=chunk_size)
+    )
+    while True:
+        chunk = list(islice(members, chunk_size))
+        if not chunk:
+            return
+        user_ids = {row[2] for row in chunk}
+
+        results = {}
+        for user_id, slug, dominant, scores, completed_at in UserResult.objects.filter(
+            user_id__in=user_ids, questionnaire__slug__in=TESTS
+        ).values_list('user_id', 'questionnaire__slug', 'dominant_category', 'scores', 'completed_at'):
+            results[user_id, slug] = (dominant, scores, completed_at)
+
+        game_scores = {}
+        for group_id, user_id, game, correct, total, best in GameScore.objects.filter(
+            group_id__in={row[0] for row in chunk}, player_id__in=user_ids
+        ).values_list('group_id', 'player_id', 'game', 'correct', 'total', 'best_streak'):
+            game_scores[group_id, user_id, game] = (correct, total, best)
+
+        for group_id, group_name, user_id, *profile in chunk:
+            row = {'group_id': group_id, 'group': group_name, 'student_id': user_id}
+            row.update(zip(PROFILE_FIELDS, profile))
+            for test in TESTS:
+                dominant, scores, completed_at = results.get((user_id, test), (None, None, None))
+                row[test] = dominant
+                row[f'{test}_scores'] = scores
+                row[f'{test}_completed_at'] = completed_at
+            for game in GAMES:
+                correct, total, best = game_scores.get((group_id, user_id, game), (0, 0, 0))
+                row[f'{game}_correct'], row[f'{game}_total'], row[f'{game}_best_streak'] = correct, total, best
+            yield row
+
+
+class _Echo:
+    """Pseudo-fichero para csv.writer: devuelve la línea en vez de guardarla."""
+
+    def write(self, value):
+        return value
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def iter_export_lines(rows, fmt):
+    """Convierte las filas en líneas de texto CSV (con cabecera) o JSONL."""
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(COLUMNS)
+        for row in rows:
+            yield writer.writerow([_cell(row[column]) for column in COLUMNS])
+    elif fmt == 'jsonl':
+        for row in rows:
+            yield json.dumps(row, ensure_ascii=False, default=_cell) + '\n'
+    else:
+        raise ValueError(f"Formato de exportación no válido: {fmt}")
@@ -1,18 +1,95 @@
 from django import forms
+from django.core.exceptions import ValidationError
 from .models import ClassGroup
 from accounts.models import UserProfile
+from minigames.models import ContentEntry, ContentPack
+
+
+class StudentIdsField(forms.Field):
+    """Ids de alumnos separados por comas (los rellena el selector de alumnos)."""
+    widget = forms.HiddenInput
+
+    def to_python(self, value):
+        if not value:
+            return set()
+        try:
+            return {int(v) for v in str(value).split(',') if v.strip()}
+        except ValueError:
+            raise ValidationError('Lista de alumnos no válida.')
+
+    def validate(self, value):
+        super().validate(value)
+        # Solo se comprueban los ids enviados, no todos los alumnos de la plataforma
+        if value:
+            found = set(UserProfile.objects.filter(role='student', id__in=value).values_list('id', flat=True))
+            if found != value:
+                raise ValidationError('Algún alumno seleccionado no existe.')
+
+    def prepare_value(self, value):
+        if isinstance(value, (set, list, tuple)):
+            return ','.join(str(v) for v in sorted(value))
+        return value
+
 
 class ClassGroupForm(forms.ModelForm):
-    students = forms.ModelMultipleChoiceField(
-        queryset=UserProfile.objects.filter(role='student'),
-        widget=forms.CheckboxSelectMultiple,
-        required=False,
-        label='Alumnos del grupo'        
-    )
+    # Cambios de alumnos como diferencias (altas y bajas) en vez de la lista
+    # completa: el coste depende del grupo, no del número total de alumnos
+    add_students = StudentIdsField(required=False)
+    remove_students = StudentIdsField(required=False)
 
     class Meta:
         model = ClassGroup
-        fields = ['name', 'students']
+        fields = ['name']
         labels = {
             'name': 'Nombre del grupo',
         }
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('add_students', set()) & cleaned_data.get('remove_students', set()):
+            raise ValidationError('Un alumno no puede añadirse y quitarse a la vez.')
+        return cleaned_data
+
+    def save(self, commit=True):
+        group = super().save(commit=commit)
+        if commit:
+            self.save_students()
+        else:
+            # El que llama guarda el grupo y después save_m2m(): ahí van los alumnos
+            save_m2m = self.save_m2m
+
+            def save_m2m_and_students():
+                save_m2m()
+                self.save_students()
+            self.save_m2m = save_m2m_and_students
+        return group
+
+    def save_students(self):
+        # Un DELETE y un INSERT en bloque en la tabla intermedia
+        if self.cleaned_data.get('remove_students'):
+            self.instance.students.remove(*self.cleaned_data['remove_students'])
+        if self.cleaned_data.get('add_students'):
+            self.instance.students.add(*self.cleaned_data['add_students'])
+
+
+class RosterImportForm(forms.Form):
+    file = forms.FileField(
+        label='Archivo CSV',
+        help_text='Cabecera con username (obligatoria) y, si quieres, full_name, email y password.'
+    )
+
+
+class ContentPackForm(forms.ModelForm):
+    class Meta:
+        model = ContentPack
+        fields = ['game', 'name', 'is_active']
+        labels = {'game': 'Juego'}
+
+
+# Palabras del paquete; en Charadas la pista no se usa
+ContentEntryFormSet = forms.inlineformset_factory(
+    ContentPack, ContentEntry,
+    fields=['category', 'text', 'hint', 'order'],
+    labels={'order': 'Orden'},
+    extra=5, can_delete=True,
+)
@@ -0,0 +1,173 @@
+"""
+Códigos de invitación de los grupos.
+
+ClassGroup.save sacaba 6 caracteres al azar y repetía mientras el código ya
+existiera: como mínimo una consulta más por grupo, un bucle cada vez más largo
+a medida que se llena el espacio y, aun así, dos guardados a la vez podían
+sacar el mismo código. Ahora:
+
+- cada código sale de un número de una secuencia (InviteCodeSequence) que
+  nunca se repite;
+- ese número se baraja con una permutación con clave (red de Feistel sobre
+  30 bits, con cycle-walking para no salirse de CODE_SPACE): los códigos no
+  son consecutivos ni se pueden adivinar, pero siguen siendo únicos;
+- se escribe con un alfabeto sin caracteres que se confunden (0/O, 1/I/L) y
+  lleva al final un carácter de control, que detecta una errata o dos
+  caracteres seguidos cambiados de sitio sin ir a la base de datos.
+
+Los números se reservan en bloques de INVITE_CODE_BLOCK, así que casi todos
+los grupos se crean sin ninguna consulta extra.
+
+Los códigos antiguos (6 caracteres al azar) siguen valiendo; los nuevos tienen
+7 y no pueden coincidir con ellos. La clave de la permutación se guarda junto
+al contador, en InviteCodeSequence.key (al azar, la crea la migración): si
+cambiara, un código nuevo podría repetir uno ya repartido, así que no depende
+de SECRET_KEY ni de ningún otro ajuste.
+"""
+import hashlib
+import secrets
+import threading
+from functools import lru_cache
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import F
+
+ALPHABET = '23456789ABCDEFGHJKMNPQRSTUVWXYZ'
+BASE = len(ALPHABET)
+CODE_LENGTH = 6  # sin contar el carácter de control
+CODE_SPACE = BASE ** CODE_LENGTH  # 887.503.681 códigos
+LEGACY_CODE_LENGTH = 6
+
+HALF_BITS = 15  # 2 ** 30 > CODE_SPACE
+ROUNDS = 4
+INVITE_CODE_BLOCK = 32
+
+
+ROUND_KEY_BYTES = 16
+
+
+def new_permutation_key():
+    """Clave nueva para InviteCodeSequence.key: una clave de 16 bytes por vuelta, en hex."""
+    return secrets.token_hex(ROUNDS * ROUND_KEY_BYTES)
+
+
+@lru_cache(maxsize=4)
+def _round_keys(key):
+    raw = bytes.fromhex(key)
+    return tuple(raw[i:i + ROUND_KEY_BYTES] for i in range(0, ROUNDS * ROUND_KEY_BYTES, ROUND_KEY_BYTES))
+
+
+def _feistel(value, keys):
+    mask = (1 << HALF_BITS) - 1
+    left, right = value >> HALF_BITS, value & mask
+    for key in keys:
+        digest = hashlib.blake2b(right.to_bytes(2, 'big'), key=key, digest_size=2).digest()
+        left, right = right, left ^ (int.from_bytes(digest, 'big') & mask)
+    return (left << HALF_BITS) | right
+
+
+def permute(number, key):
+    """Biyección de [0, CODE_SPACE) en sí mismo, distinta para cada clave (hex)."""
+    if not 0 <= number < CODE_SPACE:
+        raise ValueError(f"Número de código fuera de rango: {number}")
+    keys = _round_keys(key)
+    value = _feistel(number, keys)
+    # Cycle-walking: la red permuta 2 ** 30 valores; se repite hasta caer dentro
+    while value >= CODE_SPACE:
+        value = _feistel(value, keys)
+    return value
+
+
+def check_character(body):
+    """Carácter de control de body: suma de cada carácter por su posición, módulo BASE."""
+    # BASE (31) es primo: cambiar un carácter o intercambiar dos seguidos
+    # siempre cambia la suma
+    total = sum(position * ALPHABET.index(char) for position, char in enumerate(body, 1))
+    return ALPHABET[total % BASE]
+
+
+def encode_invite_code(number, key):
+    value = permute(number, key)
+    chars = []
+    for _ in range(CODE_LENGTH):
+        value, digit = divmod(value, BASE)
+        chars.append(ALPHABET[digit])
+    body = ''.join(reversed(chars))
+    return body + check_character(body)
+
+
+def normalize_invite_code(raw):
+    """Como lo escribe el alumno -> como está guardado (mayúsculas, sin espacios ni guiones)."""
+    return ''.join(raw.split()).replace('-', '').upper()
+
+
+def is_valid_invite_code(code):
+    """
+    False si code no puede ser un código: los nuevos se comprueban con el
+    carácter de control; de los antiguos solo se puede mirar la longitud.
+    """
+    if len(code) == LEGACY_CODE_LENGTH:
+        return code.isalnum()
+    return (
+        len(code) == CODE_LENGTH + 1
+        and all(char in ALPHABET for char in code)
+        and check_character(code[:-1]) == code[-1]
+    )
+
+
+def _reserve(count):
+    # Sube el contador en una transacción propia y devuelve el rango reservado y la clave
+    Sequence = apps.get_model('teachers', 'InviteCodeSequence')
+    with transaction.atomic():
+        if not Sequence.objects.filter(pk=1).update(next_value=F('next_value') + count):
+            # Solo pasa si la tabla se ha vaciado (la migración crea la fila)
+            Sequence.objects.get_or_create(pk=1, defaults={'key': new_permutation_key()})
+            return _reserve(count)
+        end, key = Sequence.objects.filter(pk=1).values_list('next_value', 'key').get()
+    return end - count, end, key
+
+
+class _Allocator:
+    """Bloque de números ya reservados en este proceso."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.next = self.limit = 0
+        self.key = None
+
+    def take(self, count):
+        """count códigos: números del bloque (o de una reserva nueva) ya codificados."""
+        with self.lock:
+            numbers = list(range(self.next, min(self.limit, self.next + count)))
+            self.next += len(numbers)
+            key = self.key
+        codes = [encode_invite_code(number, key) for number in numbers]
+        missing = count - len(numbers)
+        if missing:
+            start, end, key = _reserve(missing + INVITE_CODE_BLOCK)
+            codes += [encode_invite_code(number, key) for number in range(start, start + missing)]
+            # El resto del bloque solo se aprovecha si la reserva llega a
+            # confirmarse; si se deshace, otro proceso volverá a reservarlo
+            transaction.on_commit(lambda: self.keep(start + missing, end, key))
+        return codes
+
+    def keep(self, start, end, key):
+        with self.lock:
+            self.next, self.limit, self.key = start, end, key
+
+
+_allocator = _Allocator()
+
+
+def allocate_invite_codes(count):
+    """count códigos nuevos, distintos entre sí y de todos los ya repartidos."""
+    return _allocator.take(count)
+
+
+def assign_invite_codes(groups):
+    """Da código a los grupos que no lo tienen (p. ej. antes de un bulk_create)."""
+    pending = [group for group in groups if not group.invite_code]
+    for group, code in zip(pending, allocate_invite_codes(len(pending))):
+        group.invite_code = code
+    return groups
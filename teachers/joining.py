@@ -0,0 +1,166 @@
+"""
+Unirse a un grupo con el código de invitación.
+
+Al empezar la clase el profesor proyecta el código y 30-200 alumnos lo envían
+en el mismo minuto. Cada envío hacía get(invite_code=...), luego
+students.filter(id=...).exists() y luego add() (que, para lanzar sus señales,
+vuelve a consultar qué filas existen). Ahora:
+
+- el código se traduce a grupo con un mapa en la caché (también los códigos
+  que no existen, durante poco tiempo); se borra al guardar o borrar el grupo
+  y al cambiarle el código;
+- la pertenencia se escribe con un INSERT ... SELECT ... ON CONFLICT DO
+  NOTHING que solo inserta si el grupo sigue teniendo ese código: sin
+  comprobación previa, y el número de filas insertadas dice si el alumno ya
+  estaba. Así el mapa puede ser de la memoria del proceso: si otro proceso
+  ha cambiado el código o borrado el grupo, el INSERT no mete a nadie, se
+  mira por qué (una consulta, solo en ese caso) y se olvida el código;
+- cada código y cada alumno tienen un límite de intentos por minuto en una
+  caché local ('ratelimit'), que no hace ninguna consulta: el del código
+  frena una avalancha sobre un grupo y el del alumno, que alguien pruebe
+  códigos al azar.
+
+Como el INSERT no pasa por students.add(), las estadísticas, la instantánea
+de los minijuegos y el resumen del profesor se actualizan aquí.
+"""
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import IntegrityError, connection, transaction
+
+from minigames.roster import invalidate_group_rosters
+from .dashboard import invalidate_teacher_dashboards
+from .models import ClassGroup
+from .stats import record_membership_change
+
+INVITE_CODE_CACHE_TIMEOUT = 60 * 10
+INVITE_CODE_MISS_TIMEOUT = 30
+JOIN_RATE_LIMIT = getattr(settings, 'JOIN_RATE_LIMIT', 300)
+JOIN_USER_RATE_LIMIT = getattr(settings, 'JOIN_USER_RATE_LIMIT', 20)
+JOIN_RATE_WINDOW = 60
+
+JoinTarget = namedtuple('JoinTarget', 'id name teacher_id')
+
+JOINED = 'joined'
+ALREADY_MEMBER = 'already_member'
+INVALID_CODE = 'invalid_code'
+RATE_LIMITED = 'rate_limited'
+
+_MISSING = 0  # Se guarda en la caché para los códigos que no existen
+
+
+def invite_code_cache_key(code):
+    return f'teachers:invite-code:{code}'
+
+
+def group_for_invite_code(code):
+    """JoinTarget del grupo con ese código, o None si no existe."""
+    key = invite_code_cache_key(code)
+    target = cache.get(key)
+    if target is None:
+        row = ClassGroup.objects.filter(invite_code=code).values_list('id', 'name', 'teacher_id').first()
+        target = JoinTarget(*row) if row else _MISSING
+        cache.set(key, target, INVITE_CODE_CACHE_TIMEOUT if row else INVITE_CODE_MISS_TIMEOUT)
+    return target or None
+
+
+def forget_invite_codes(codes):
+    keys = [invite_code_cache_key(code) for code in codes if code]
+    if keys:
+        cache.delete_many(keys)
+
+
+def _rate_allowed(name, limit):
+    limiter = caches['ratelimit']
+    key = f'join:{name}:{int(time.time() // JOIN_RATE_WINDOW)}'
+    limiter.add(key, 0, JOIN_RATE_WINDOW * 2)
+    try:
+        return limiter.incr(key) <= limit
+    except ValueError:
+        return True  # La clave ha caducado entre add e incr: ventana nueva
+
+
+def join_rate_allowed(code, user_id):
+    """Cuenta un intento del alumno con este código; False si alguno se ha pasado del límite del minuto."""
+    return (
+        _rate_allowed(f'user:{user_id}', JOIN_USER_RATE_LIMIT)
+        and _rate_allowed(f'code:{code}', JOIN_RATE_LIMIT)
+    )
+
+
+def _membership_insert_sql(rows, returning=False):
+    through = ClassGroup.students.through._meta
+    quote = connection.ops.quote_name
+    user_column = quote(through.get_field('userprofile').column)
+    sql = 'INSERT INTO {} ({}, {}) VALUES {} ON CONFLICT DO NOTHING'.format(
+        quote(through.db_table),
+        quote(through.get_field('classgroup').column),
+        user_column,
+        ', '.join(['(%s, %s)'] * rows),
+    )
+    return f'{sql} RETURNING {user_column}' if returning else sql
+
+
+def add_member(group_id, user_id, invite_code):
+    """
+    Mete al alumno en el grupo si no estaba y el grupo sigue teniendo ese
+    código; True si se ha insertado la fila.
+    """
+    through = ClassGroup.students.through._meta
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}, {}) SELECT {}, %s FROM {} WHERE {} = %s AND {} = %s ON CONFLICT DO NOTHING'.format(
+        quote(through.db_table),
+        quote(through.get_field('classgroup').column),
+        quote(through.get_field('userprofile').column),
+        quote(ClassGroup._meta.pk.column),
+        quote(ClassGroup._meta.db_table),
+        quote(ClassGroup._meta.pk.column),
+        quote(ClassGroup._meta.get_field('invite_code').column),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [user_id, group_id, invite_code])
+        return cursor.rowcount == 1
+
+
+def add_members(group_id, user_ids, batch_size=500):
+    """
+    Mete a varios alumnos en el grupo; devuelve los ids de los que no estaban
+    (las filas que de verdad se han insertado, aunque otro se una a la vez).
+    """
+    user_ids = list(user_ids)
+    inserted = set()
+    with connection.cursor() as cursor:
+        for start in range(0, len(user_ids), batch_size):
+            batch = user_ids[start:start + batch_size]
+            cursor.execute(
+                _membership_insert_sql(len(batch), returning=True),
+                [value for user_id in batch for value in (group_id, user_id)],
+            )
+            inserted.update(row[0] for row in cursor.fetchall())
+    return inserted
+
+
+def join_with_code(user, code):
+    """Une al alumno al grupo del código (ya normalizado); devuelve (estado, JoinTarget o None)."""
+    if not join_rate_allowed(code, user.pk):
+        return RATE_LIMITED, None
+    group = group_for_invite_code(code)
+    if group is None:
+        return INVALID_CODE, None
+    try:
+        with transaction.atomic():  # Punto de guardado: el error no rompe la transacción de fuera
+            inserted = add_member(group.id, user.pk, code)
+    except IntegrityError:
+        inserted = False  # El grupo se ha borrado justo a la vez
+    if not inserted:
+        if ClassGroup.objects.filter(pk=group.id, invite_code=code).exists():
+            return ALREADY_MEMBER, group
+        # El mapa de este proceso tenía un código cambiado o un grupo borrado
+        forget_invite_codes([code])
+        return INVALID_CODE, None
+    record_membership_change([(group.id, user.pk)], 1)
+    invalidate_group_rosters([group.id])
+    invalidate_teacher_dashboards([group.teacher_id])
+    return JOINED, group
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import UserProfile
+from teachers.export import EXPORT_FORMATS, iter_export_lines, iter_export_rows
+
+
+class Command(BaseCommand):
+    help = 'Exporta en streaming los grupos de un profesor (alumnos, resultados y marcadores) en CSV o JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('teacher', help='Nombre de usuario del profesor')
+        parser.add_argument('--group', type=int, action='append', help='Id del grupo (se puede repetir; por defecto, todos)')
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', help='Fichero de salida (por defecto, la salida estándar)')
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        try:
+            teacher = UserProfile.objects.get(username=options['teacher'], role='teacher')
+        except UserProfile.DoesNotExist:
+            raise CommandError(f"No existe el profesor \"{options['teacher']}\".")
+
+        rows = iter_export_rows(teacher, options['group'], chunk_size=options['chunk_size'])
+        lines = iter_export_lines(rows, options['format'])
+        if options['output']:
+            # newline='': las líneas del CSV ya llevan su \r\n
+            written = 0
+            with open(options['output'], 'w', encoding='utf-8', newline='') as fp:
+                for line in lines:
+                    fp.write(line)
+                    written += 1
+            self.stdout.write(self.style.SUCCESS(f"{written} líneas escritas en {options['output']}"))
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,48 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from teachers.models import ClassGroup
+from teachers.roster_import import PASSWORD_HASH_WORKERS, RosterImportError, import_roster, read_roster_csv
+
+
+class Command(BaseCommand):
+    help = 'Da de alta en un grupo los alumnos de un CSV (username, full_name, email, password)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('group', type=int, help='Id del grupo')
+        parser.add_argument('csv', help='Ruta del CSV')
+        parser.add_argument('--report', help='Guarda el informe por fila en este CSV')
+        parser.add_argument('--workers', type=int, default=PASSWORD_HASH_WORKERS, help='Hilos para cifrar contraseñas')
+
+    def handle(self, *args, **options):
+        try:
+            group = ClassGroup.objects.get(pk=options['group'])
+        except ClassGroup.DoesNotExist:
+            raise CommandError(f"No existe el grupo {options['group']}.")
+
+        started = time.monotonic()
+        try:
+            with open(options['csv'], encoding='utf-8-sig') as fp:
+                rows = read_roster_csv(fp.read())
+        except (OSError, UnicodeDecodeError, RosterImportError) as e:
+            raise CommandError(str(e))
+        report = import_roster(group, rows, workers=options['workers'])
+
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8', newline='') as fp:
+                writer = csv.writer(fp)
+                writer.writerow(['line', 'username', 'status', 'message', 'password'])
+                writer.writerows(report)
+        else:
+            for row in report:
+                self.stdout.write(f"{row.line}\t{row.username}\t{row.status}\t{row.message}\t{row.password}")
+
+        counts = {}
+        for row in report:
+            counts[row.status] = counts.get(row.status, 0) + 1
+        summary = ', '.join(f'{status}: {n}' for status, n in counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"{group.name}: {len(report)} filas en {time.monotonic() - started:.2f}s ({summary})"
+        ))
@@ -0,0 +1,87 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from accounts.models import UserProfile
+from accounts.text import build_search_text
+from teachers.models import ClassGroup
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Prueba de carga de join_group_by_code: N alumnos envían a la vez el código de un grupo '
+        'recién creado. Falla si el p99 pasa del objetivo. Los datos de la prueba se borran al terminar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=20, help='Peticiones simultáneas')
+        parser.add_argument('--target-ms', type=float, default=250, help='p99 máximo aceptable')
+
+    def handle(self, *args, **options):
+        if options['students'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--students y --concurrency tienen que ser positivos.')
+        prefix = f'loadtest-{uuid.uuid4().hex[:8]}'
+        host = next((h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+        teacher = UserProfile.objects.create_user(f'{prefix}-prof', role='teacher')
+        try:
+            group = ClassGroup.objects.create(name=prefix, teacher=teacher)
+            UserProfile.objects.bulk_create([
+                UserProfile(username=f'{prefix}-{i}', role='student', search_text=build_search_text([f'{prefix}-{i}']))
+                for i in range(options['students'])
+            ])
+            clients = []
+            for student in UserProfile.objects.filter(username__startswith=f'{prefix}-', role='student'):
+                client = Client(HTTP_HOST=host)
+                client.force_login(student)
+                clients.append(client)
+            url = reverse('join_group')
+
+            def join(client):
+                try:
+                    started = time.perf_counter()
+                    response = client.post(url, {'invite_code': group.invite_code})
+                    return (time.perf_counter() - started) * 1000, response.status_code
+                finally:
+                    connections.close_all()  # Cada hilo abre su conexión
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                results = list(pool.map(join, clients))
+            elapsed = time.perf_counter() - started
+
+            for client in clients:
+                client.logout()
+            members = group.students.count()
+        finally:
+            UserProfile.objects.filter(username__startswith=f'{prefix}-').delete()
+
+        latencies = [ms for ms, _status in results]
+        statuses = {}
+        for _ms, status in results:
+            statuses[status] = statuses.get(status, 0) + 1
+        p99 = percentile(latencies, 0.99)
+        self.stdout.write(
+            f"{len(results)} peticiones en {elapsed:.2f}s con {options['concurrency']} a la vez; "
+            f"respuestas: {statuses}; alumnos en el grupo: {members}"
+        )
+        self.stdout.write(
+            f"  p50 {percentile(latencies, 0.5):.1f} ms · p95 {percentile(latencies, 0.95):.1f} ms · "
+            f"p99 {p99:.1f} ms · máx {max(latencies):.1f} ms"
+        )
+        if members != len(results) or set(statuses) != {302}:
+            raise CommandError('No todos los alumnos se han unido al grupo.')
+        if p99 > options['target_ms']:
+            raise CommandError(f"p99 de {p99:.1f} ms por encima del objetivo ({options['target_ms']:.0f} ms).")
+        self.stdout.write(self.style.SUCCESS(f"p99 dentro del objetivo ({options['target_ms']:.0f} ms)."))
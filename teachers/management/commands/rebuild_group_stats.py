@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from teachers.models import ClassGroup
+from teachers.stats import rebuild_group_stats
+
+
+class Command(BaseCommand):
+    help = 'Recalcula desde cero las estadísticas de categorías de los grupos (GroupCategoryStats)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--group', type=int, action='append', help='Id del grupo (se puede repetir; por defecto, todos)')
+
+    def handle(self, *args, **options):
+        group_ids = options['group']
+        if group_ids:
+            missing = set(group_ids) - set(ClassGroup.objects.filter(pk__in=group_ids).values_list('id', flat=True))
+            if missing:
+                raise CommandError(f"No existen los grupos {sorted(missing)}.")
+
+        started = time.monotonic()
+        rows = rebuild_group_stats(group_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f"{rows} recuentos reconstruidos en {time.monotonic() - started:.2f}s"
+        ))
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.27 on 2026-10-18 15:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def fill_group_stats(apps, schema_editor):
+    GroupCategoryStats = apps.get_model('teachers', 'GroupCategoryStats')
+    UserResult = apps.get_model('quizzes', 'UserResult')
+    rows = (
+        UserResult.objects.filter(user__student_groups__isnull=False)
+        .values('user__student_groups', 'questionnaire_id', 'dominant_category')
+        .annotate(n=Count('id'))
+    )
+    GroupCategoryStats.objects.bulk_create([
+        GroupCategoryStats(
+            group_id=row['user__student_groups'], questionnaire_id=row['questionnaire_id'],
+            category=row['dominant_category'], count=row['n'],
+        )
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0010_userresult_scores'),
+        ('teachers', '0002_classgroup_invite_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupCategoryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=1)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_stats', to='teachers.classgroup')),
+                ('questionnaire', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='group_stats', to='quizzes.questionnaire')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='groupcategorystats',
+            constraint=models.UniqueConstraint(fields=('group', 'questionnaire', 'category'), name='unique_group_category_stat'),
+        ),
+        migrations.RunPython(fill_group_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.27 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+def create_sequence(apps, schema_editor):
+    # La fila única del contador; los códigos antiguos no salen de aquí
+    apps.get_model('teachers', 'InviteCodeSequence').objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teachers', '0003_group_category_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InviteCodeSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('next_value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_sequence, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.27 on 2026-10-18 18:00
+
+import hashlib
+import secrets
+
+from django.conf import settings
+from django.db import migrations, models
+
+ROUNDS = 4
+CODE_LENGTH = 7
+
+
+def set_key(apps, schema_editor):
+    # Hasta ahora la clave salía de INVITE_CODE_KEY o SECRET_KEY. Si ya hay
+    # códigos de 7 caracteres se conservan las mismas claves de vuelta (para
+    # no repetir ninguno); si no, una clave nueva al azar
+    Sequence = apps.get_model('teachers', 'InviteCodeSequence')
+    ClassGroup = apps.get_model('teachers', 'ClassGroup')
+    if ClassGroup.objects.filter(invite_code__regex=rf'^.{{{CODE_LENGTH}}}$').exists():
+        secret = getattr(settings, 'INVITE_CODE_KEY', settings.SECRET_KEY)
+        key = ''.join(
+            hashlib.sha256(f'invite-code:{i}:{secret}'.encode()).digest()[:16].hex() for i in range(ROUNDS)
+        )
+    else:
+        key = secrets.token_hex(ROUNDS * 16)
+    sequence, _created = Sequence.objects.get_or_create(pk=1)
+    sequence.key = key
+    sequence.save(update_fields=['key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teachers', '0004_invite_code_sequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invitecodesequence',
+            name='key',
+            field=models.CharField(default='', editable=False, max_length=128),
+            preserve_default=False,
+        ),
+        migrations.RunPython(set_key, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,6 @@
-import string
-import random
 from django.db import models
 from accounts.models import UserProfile
-
-def generate_invite_code():
-    """Genera un código aleatorio único de 6 caracteres."""
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+from .invite_codes import allocate_invite_codes
 
 class ClassGroup(models.Model):
     name = models.CharField(max_length=100)
@@ -30,14 +25,47 @@ class ClassGroup(models.Model):
     )
 
     def save(self, *args, **kwargs):
-        # Si el grupo no tiene código (es nuevo o se está creando), le asignamos uno
+        # Si el grupo no tiene código (es nuevo o se está creando), le asignamos uno.
+        # Es único por construcción: no hace falta comprobarlo (ver invite_codes.py)
         if not self.invite_code:
-            self.invite_code = generate_invite_code()
-            # Verificación de unicidad
-            while ClassGroup.objects.filter(invite_code=self.invite_code).exists():
-                self.invite_code = generate_invite_code()
+            self.invite_code = allocate_invite_codes(1)[0]
         super().save(*args, **kwargs)
 
+    def rotate_invite_code(self):
+        """Cambia el código (el anterior deja de valer) y lo guarda."""
+        # teachers/signals.py lo quita del mapa de códigos de la caché
+        self._previous_invite_code = self.invite_code
+        self.invite_code = allocate_invite_codes(1)[0]
+        self.save(update_fields=['invite_code'])
+        return self.invite_code
+
     def __str__(self):
         # He añadido el código al str para que lo veas fácil en el Admin de Django
-        return f"{self.name} - {self.invite_code} ({self.teacher.username})"
\ No newline at end of file
+        return f"{self.name} - {self.invite_code} ({self.teacher.username})"
+
+class InviteCodeSequence(models.Model):
+    """Contador (una sola fila) del que salen los códigos de invitación."""
+    next_value = models.BigIntegerField(default=0)
+    # Clave de la permutación de los códigos (ver invite_codes.py); no se cambia nunca
+    key = models.CharField(max_length=128, editable=False)
+
+    def __str__(self):
+        return f"Siguiente código: {self.next_value}"
+
+class GroupCategoryStats(models.Model):
+    """
+    Cuántos alumnos de cada grupo tienen cada categoría dominante en cada test.
+    Se mantiene al día desde teachers/stats.py; rebuild_group_stats lo rehace.
+    """
+    group = models.ForeignKey(ClassGroup, on_delete=models.CASCADE, related_name='category_stats')
+    questionnaire = models.ForeignKey('quizzes.Questionnaire', on_delete=models.CASCADE, related_name='group_stats')
+    category = models.CharField(max_length=1)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['group', 'questionnaire', 'category'], name='unique_group_category_stat'),
+        ]
+
+    def __str__(self):
+        return f"{self.group.name} - {self.category}: {self.count}"
@@ -0,0 +1,148 @@
+"""
+Alta de alumnos en un grupo a partir de un CSV.
+
+Hasta ahora un grupo solo se llenaba con los alumnos metiendo el código de
+invitación uno a uno o marcando casillas. Aquí se lee un CSV con cabecera
+(username obligatorio; full_name, email y password opcionales) y:
+
+- los alumnos que no existen se crean con un bulk_create; sus contraseñas se
+  cifran antes, en un pool de hilos acotado (PBKDF2 suelta el GIL);
+- todas las pertenencias se insertan en bloque con add_members, que dice
+  qué alumnos no estaban ya en el grupo;
+- se devuelve un informe por fila, con las contraseñas generadas.
+
+bulk_create no lanza señales, así que las estadísticas, la instantánea del
+grupo para los minijuegos y el resumen del profesor se actualizan a mano.
+"""
+import csv
+import io
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils.crypto import get_random_string
+
+from accounts.models import UserProfile
+from accounts.text import build_answer_keys, build_search_text
+from minigames.roster import invalidate_group_rosters
+from .dashboard import invalidate_teacher_dashboards
+from .joining import add_members
+from .stats import record_membership_change
+
+MAX_ROSTER_ROWS = 2000
+PASSWORD_HASH_WORKERS = 4
+# Sin caracteres que se confunden al copiarlos de un papel (0/O, 1/l/I)
+PASSWORD_CHARS = 'abcdefghjkmnpqrstuvwxyzABCDEFGHJKLMNPQRSTUVWXYZ23456789'
+
+RowReport = namedtuple('RowReport', 'line username status message password')
+
+STATUS_CREATED = 'creado'
+STATUS_ADDED = 'añadido'
+STATUS_ALREADY = 'ya estaba'
+STATUS_ERROR = 'error'
+
+
+class RosterImportError(ValueError):
+    """El CSV no se puede procesar (cabecera, tamaño...)."""
+
+
+def read_roster_csv(text):
+    """Devuelve [(nº de línea, {columna: valor})] del CSV (separado por comas o punto y coma)."""
+    try:
+        dialect = csv.Sniffer().sniff(text[:2048], delimiters=',;')
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(io.StringIO(text), dialect=dialect)
+    fields = [name.strip().lower() for name in reader.fieldnames or ()]
+    if 'username' not in fields:
+        raise RosterImportError('El CSV necesita una cabecera con la columna "username".')
+    reader.fieldnames = fields
+    rows = [
+        (reader.line_num, {key: (value or '').strip() for key, value in row.items() if key})
+        for row in reader
+    ]
+    rows = [(line, row) for line, row in rows if any(row.values())]
+    if len(rows) > MAX_ROSTER_ROWS:
+        raise RosterImportError(f'Como máximo {MAX_ROSTER_ROWS} alumnos por importación.')
+    return rows
+
+
+def _validate_username(username):
+    if not username:
+        return 'Falta el nombre de usuario.'
+    try:
+        UserProfile.username_validator(username)
+    except ValidationError as e:
+        return ' '.join(e.messages)
+    if len(username) > UserProfile._meta.get_field('username').max_length:
+        return 'Nombre de usuario demasiado largo.'
+    return None
+
+
+def import_roster(group, rows, workers=PASSWORD_HASH_WORKERS):
+    """Da de alta en el grupo los alumnos de rows (ver read_roster_csv); devuelve [RowReport]."""
+    report = {}
+    wanted = {}  # username -> (línea, fila)
+    for line, row in rows:
+        username = row.get('username', '')
+        error = _validate_username(username)
+        if error is None and username in wanted:
+            error = f'Repetido (ya aparece en la línea {wanted[username][0]}).'
+        if error:
+            report[line] = RowReport(line, username, STATUS_ERROR, error, '')
+        else:
+            wanted[username] = (line, row)
+
+    existing = {
+        username: (user_id, role)
+        for username, user_id, role in UserProfile.objects.filter(username__in=wanted)
+        .values_list('username', 'id', 'role')
+    }
+    for username, (user_id, role) in existing.items():
+        if role != 'student':
+            line = wanted.pop(username)[0]
+            report[line] = RowReport(line, username, STATUS_ERROR, 'El usuario existe y no es un alumno.', '')
+
+    # Contraseñas de los nuevos: las que vengan en el CSV o una generada
+    new = [username for username in wanted if username not in existing]
+    passwords = {
+        username: wanted[username][1].get('password') or get_random_string(10, PASSWORD_CHARS)
+        for username in new
+    }
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        hashes = dict(zip(new, pool.map(make_password, (passwords[username] for username in new))))
+
+    profiles = []
+    for username in new:
+        row = wanted[username][1]
+        profile = UserProfile(
+            username=username, password=hashes[username], role='student',
+            full_name=row.get('full_name') or None, email=row.get('email', ''),
+        )
+        profile.answer_keys = build_answer_keys(getattr(profile, f) for f in UserProfile.ANSWER_KEY_FIELDS)
+        profile.search_text = build_search_text(getattr(profile, f) for f in UserProfile.SEARCH_TEXT_FIELDS)
+        profiles.append(profile)
+
+    with transaction.atomic():
+        UserProfile.objects.bulk_create(profiles, batch_size=500)
+        # Ids de todos (también de los recién creados, por si la base de datos no los devuelve)
+        ids = dict(UserProfile.objects.filter(username__in=wanted).values_list('username', 'id'))
+        # Solo cuentan las filas insertadas: si alguien se une a la vez con el
+        # código, su fila ya la ha contado join_with_code
+        joined = add_members(group.id, ids.values())
+        record_membership_change([(group.id, user_id) for user_id in joined], 1)
+    invalidate_group_rosters([group.id])
+    invalidate_teacher_dashboards([group.teacher_id])
+
+    for username, (line, row) in wanted.items():
+        if username in passwords:
+            # Solo se muestra la contraseña si la hemos generado nosotros
+            generated = '' if row.get('password') else passwords[username]
+            report[line] = RowReport(line, username, STATUS_CREATED, 'Alumno creado y añadido al grupo.', generated)
+        elif ids[username] not in joined:
+            report[line] = RowReport(line, username, STATUS_ALREADY, 'Ya estaba en el grupo.', '')
+        else:
+            report[line] = RowReport(line, username, STATUS_ADDED, 'Alumno existente añadido al grupo.', '')
+    return [report[line] for line in sorted(report)]
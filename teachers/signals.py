@@ -0,0 +1,71 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from quizzes.models import UserResult
+from .dashboard import invalidate_teacher_dashboards
+from .joining import forget_invite_codes
+from .models import ClassGroup
+from .stats import record_membership_change, record_result_changes
+
+# Los envíos de tests y los comandos de corrección escriben con upserts en
+# bloque (sin señales) y actualizan las estadísticas ellos mismos; estas
+# señales cubren el resto de caminos (admin, shell, borrados en cascada).
+
+
+@receiver(pre_save, sender=UserResult)
+def result_before_save(sender, instance, **kwargs):
+    instance._previous_category = None
+    if instance.pk:
+        instance._previous_category = (
+            UserResult.objects.filter(pk=instance.pk).values_list('dominant_category', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=UserResult)
+def result_saved(sender, instance, **kwargs):
+    record_result_changes([(
+        instance.user_id, instance.questionnaire_id,
+        getattr(instance, '_previous_category', None), instance.dominant_category,
+    )])
+
+
+@receiver(pre_delete, sender=UserResult)
+def result_deleted(sender, instance, **kwargs):
+    # En pre_delete: si se borra el alumno, aún siguen sus filas de pertenencia a grupos
+    record_result_changes([(instance.user_id, instance.questionnaire_id, instance.dominant_category, None)])
+
+
+@receiver(m2m_changed, sender=ClassGroup.students.through)
+def group_membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    members = instance.student_groups if reverse else instance.students
+    if action == 'pre_remove':
+        # remove() pasa en pk_set todo lo que se le pide quitar, aunque no
+        # estuviera: se apunta aquí quién estaba de verdad
+        instance._removed_members = set(members.filter(pk__in=pk_set).values_list('pk', flat=True))
+        return
+    sign = {'post_add': 1, 'post_remove': -1, 'pre_clear': -1}.get(action)
+    if sign is None:
+        return
+    if action == 'post_remove':
+        pk_set = instance.__dict__.pop('_removed_members', ())
+    elif action == 'pre_clear':
+        # Tras el clear ya no sabríamos quién estaba en el grupo
+        pk_set = members.values_list('id', flat=True)
+    if reverse:
+        # user.student_groups.add/remove(...): pk_set son ids de grupos
+        pairs = [(group_id, instance.pk) for group_id in pk_set]
+        teachers = ClassGroup.objects.filter(pk__in=[group_id for group_id, _ in pairs]).values_list('teacher_id', flat=True)
+    else:
+        pairs = [(instance.pk, user_id) for user_id in pk_set]
+        teachers = [instance.teacher_id]
+    if pairs:
+        invalidate_teacher_dashboards(teachers)
+    record_membership_change(pairs, sign)
+
+
+@receiver(post_save, sender=ClassGroup)
+@receiver(post_delete, sender=ClassGroup)
+def group_changed(sender, instance, **kwargs):
+    invalidate_teacher_dashboards([instance.teacher_id])
+    # El código actual (puede estar guardado como inexistente) y el anterior si se ha cambiado
+    forget_invite_codes([instance.invite_code, getattr(instance, '_previous_invite_code', None)])
@@ -0,0 +1,134 @@
+"""
+Estadísticas de categorías por grupo (GroupCategoryStats).
+
+La página de estadísticas cargaba todos los UserResult del grupo (con un join
+por título del cuestionario) y los contaba en Python en cada visita. Ahora los
+recuentos por (grupo, cuestionario, categoría) están en una tabla que se
+actualiza con deltas:
+
+- al guardar o cambiar un resultado (quizzes/services.py y las señales de
+  teachers/signals.py para el resto de caminos, como el admin);
+- al entrar o salir alumnos de un grupo (m2m_changed).
+
+Si algo se desincroniza, rebuild_group_stats los rehace desde cero.
+"""
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+
+from quizzes.models import UserResult
+from .dashboard import invalidate_teacher_dashboards
+from .models import ClassGroup, GroupCategoryStats
+
+Membership = ClassGroup.students.through
+
+
+def apply_deltas(deltas):
+    """
+    Suma a cada (group_id, questionnaire_id, categoría) su delta.
+
+    Primero se crean a 0 las filas que falten (ignore_conflicts) y luego un
+    UPDATE count = count + delta por cada delta distinto: así dos envíos a la
+    vez no pisan el recuento del otro. Normalmente son 2 o 3 consultas.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta and key[2]}
+    if not deltas:
+        return
+    by_delta = {}
+    for key, delta in deltas.items():
+        by_delta.setdefault(delta, []).append(key)
+    with transaction.atomic():
+        GroupCategoryStats.objects.bulk_create([
+            GroupCategoryStats(group_id=group_id, questionnaire_id=questionnaire_id, category=category)
+            for group_id, questionnaire_id, category in deltas
+        ], ignore_conflicts=True)
+        for delta, keys in by_delta.items():
+            condition = reduce(or_, (
+                Q(group_id=group_id, questionnaire_id=questionnaire_id, category=category)
+                for group_id, questionnaire_id, category in keys
+            ))
+            GroupCategoryStats.objects.filter(condition).update(count=Greatest(F('count') + delta, 0))
+
+
+def record_result_changes(changes):
+    """
+    changes son tuplas (user_id, questionnaire_id, categoría anterior, nueva);
+    None si no había resultado o si se ha borrado. Una consulta para saber los
+    grupos de los alumnos y las de apply_deltas. También invalida el resumen
+    de los profesores de esos grupos (cambia su última actividad).
+    """
+    changes = list(changes)
+    if not changes:
+        return
+    groups, teachers = {}, set()
+    for user_id, group_id, teacher_id in Membership.objects.filter(
+        userprofile_id__in={user_id for user_id, *_ in changes}
+    ).values_list('userprofile_id', 'classgroup_id', 'classgroup__teacher_id'):
+        groups.setdefault(user_id, []).append(group_id)
+        teachers.add(teacher_id)
+    invalidate_teacher_dashboards(teachers)
+
+    deltas = Counter()
+    for user_id, questionnaire_id, old, new in changes:
+        if old == new:
+            continue
+        for group_id in groups.get(user_id, ()):
+            deltas[group_id, questionnaire_id, old] -= 1
+            deltas[group_id, questionnaire_id, new] += 1
+    apply_deltas(deltas)
+
+
+def record_membership_change(pairs, sign):
+    """
+    Alumnos que entran (sign=1) o salen (sign=-1) de grupos; pairs son
+    (group_id, user_id). Se suman o restan todos sus resultados.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return
+    results = {}
+    for user_id, questionnaire_id, category in UserResult.objects.filter(
+        user_id__in={user_id for _group_id, user_id in pairs}
+    ).values_list('user_id', 'questionnaire_id', 'dominant_category'):
+        results.setdefault(user_id, []).append((questionnaire_id, category))
+
+    deltas = Counter()
+    for group_id, user_id in pairs:
+        for questionnaire_id, category in results.get(user_id, ()):
+            deltas[group_id, questionnaire_id, category] += sign
+    apply_deltas(deltas)
+
+
+def rebuild_group_stats(group_ids=None):
+    """Rehace los recuentos desde los UserResult; devuelve cuántas filas quedan."""
+    # Un solo filter: con dos, la relación m2m se uniría dos veces
+    membership = {'user__student_groups__isnull': False}
+    stats = GroupCategoryStats.objects.all()
+    if group_ids is not None:
+        membership['user__student_groups__in'] = group_ids
+        stats = stats.filter(group_id__in=group_ids)
+    results = UserResult.objects.filter(**membership)
+    rows = [
+        GroupCategoryStats(
+            group_id=row['user__student_groups'], questionnaire_id=row['questionnaire_id'],
+            category=row['dominant_category'], count=row['n'],
+        )
+        for row in results.values('user__student_groups', 'questionnaire_id', 'dominant_category')
+        .annotate(n=Count('id'))
+    ]
+    with transaction.atomic():
+        stats.delete()
+        GroupCategoryStats.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def group_category_counts(group_id, slug):
+    """{categoría: alumnos} del grupo en el cuestionario indicado (una consulta)."""
+    return dict(
+        GroupCategoryStats.objects.filter(group_id=group_id, questionnaire__slug=slug, count__gt=0)
+        .values_list('category', 'count')
+    )
@@ -7,9 +7,17 @@ from .views import student_detail
 urlpatterns = [
     path('crear/', views.create_group, name='create_group'),
     path('mis-grupos/', views.view_groups, name='view_groups'),
+    path('mis-grupos/exportar/', views.export_groups, name='export_groups'),
     path('grupo/<int:group_id>/', views.group_detail, name='group_detail'),
     path('grupo/<int:group_id>/estadisticas/', views.group_statistics, name='group_statistics'),
+    path('grupo/<int:group_id>/estadisticas/datos/', views.group_statistics_data, name='group_statistics_data'),
     path('grupo/<int:group_id>/editar/', edit_group, name='edit_group'),
+    path('grupo/<int:group_id>/importar/', views.import_group_roster, name='import_group_roster'),
+    path('grupo/<int:group_id>/nuevo-codigo/', views.rotate_invite_code, name='rotate_invite_code'),
     path('grupo/<int:group_id>/eliminar/', delete_group, name='delete_group'),
     path('alumno/<int:student_id>/', student_detail, name='student_detail'),
+    path('alumnos/buscar/', views.search_students, name='search_students'),
+    path('contenido/', views.content_packs, name='content_packs'),
+    path('contenido/nuevo/', views.edit_content_pack, name='create_content_pack'),
+    path('contenido/<int:pack_id>/editar/', views.edit_content_pack, name='edit_content_pack'),
 ]
\ No newline at end of file
@@ -1,12 +1,59 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from .forms import ClassGroupForm
+from django.db import transaction
+from django.db.models import Count
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from .forms import ClassGroupForm, ContentEntryFormSet, ContentPackForm, RosterImportForm
 from .models import ClassGroup
+from .dashboard import teacher_dashboard
+from .export import EXPORT_FORMATS, iter_export_lines, iter_export_rows
+from .roster_import import RosterImportError, import_roster, read_roster_csv
+from .stats import group_category_counts
 from accounts.models import UserProfile
+from accounts.search import search_profiles
+from minigames.models import ContentPack
+from quizzes.constants import CHAPMAN_CHOICES
 from quizzes.models import UserResult
+from quizzes.services import dominant_category
 from django.contrib import messages
 import json
 
+# Categorías (en el orden de la gráfica) de cada cuestionario con estadísticas
+STATISTICS_LABELS = {
+    'vark': [('V', 'Visual'), ('A', 'Auditivo'), ('R', 'Lectura/Escritura'), ('K', 'Kinestésico')],
+    'chapman': CHAPMAN_CHOICES,
+}
+
+# Resultados por página del buscador de alumnos
+STUDENT_SEARCH_PAGE_SIZE = 20
+
+
+@login_required
+def search_students(request):
+    # JSON para el selector de alumnos: ?q=texto&desde=<id>&grupo=<id> (excluye a los del grupo)
+    if request.user.role != 'teacher':
+        return JsonResponse({'error': 'Solo para profesores'}, status=403)
+
+    students = UserProfile.objects.filter(role='student')
+    # Sin ordenar por parecido: se pagina por id
+    students = search_profiles(students, request.GET.get('q', ''), ranked=False)
+    group_id = _page_param(request, 'grupo')
+    if group_id is not None:
+        students = students.exclude(student_groups=group_id)
+    after = _page_param(request, 'desde')
+    if after is not None:
+        students = students.filter(id__gt=after)
+
+    rows = list(students.order_by('id').values('id', 'username', 'full_name')[:STUDENT_SEARCH_PAGE_SIZE + 1])
+    has_more = len(rows) > STUDENT_SEARCH_PAGE_SIZE
+    rows = rows[:STUDENT_SEARCH_PAGE_SIZE]
+    return JsonResponse({
+        'results': [{'id': r['id'], 'name': r['full_name'] or r['username'], 'username': r['username']} for r in rows],
+        'next': rows[-1]['id'] if has_more else None,
+    })
+
+
 @login_required
 def create_group(request):
     if request.user.role != 'teacher':
@@ -31,46 +78,86 @@ def view_groups(request):
     if request.user.role != 'teacher':
         return redirect('login')
 
-    groups = ClassGroup.objects.filter(teacher=request.user)
+    groups = teacher_dashboard(request.user.id)
     return render(request, 'teachers/view_groups.html', {'groups': groups})
 
+# Alumnos por página en el detalle del grupo (paginación por clave: ?desde=<id> / ?antes=<id>)
+GROUP_DETAIL_PAGE_SIZE = 50
+VARK_STYLE_LABELS = dict(STATISTICS_LABELS['vark'])
+CHAPMAN_LABELS = dict(CHAPMAN_CHOICES)
+
+
+def keyset_page(queryset, after=None, before=None, size=GROUP_DETAIL_PAGE_SIZE):
+    """
+    Una página ordenada por id sin OFFSET: la consulta cuesta lo mismo en la
+    primera página que en la última. Devuelve (filas, id_anterior, id_siguiente);
+    los ids son para los enlaces ?antes= y ?desde=, o None si no hay más.
+    """
+    if before is not None:
+        rows = list(queryset.filter(id__lt=before).order_by('-id')[:size + 1])
+        has_more = len(rows) > size
+        rows = rows[:size][::-1]
+        # Si venimos de ?antes=, detrás de esta página está al menos el alumno before
+        return rows, rows[0].id if has_more else None, rows[-1].id if rows else None
+    if after is not None:
+        queryset = queryset.filter(id__gt=after)
+    rows = list(queryset.order_by('id')[:size + 1])
+    has_more = len(rows) > size
+    rows = rows[:size]
+    return rows, rows[0].id if after is not None and rows else None, rows[-1].id if has_more else None
+
+
+MAX_ID = 2 ** 63 - 1  # BigAutoField
+
+
+def _page_param(request, name):
+    # Id o cursor de la URL; None si no es un entero que pueda ser un id
+    value = request.GET.get(name, '')
+    if not (value.isascii() and value.isdigit()):
+        return None
+    value = int(value)
+    return value if value <= MAX_ID else None
+
+
 @login_required
 def group_detail(request, group_id):
     group = get_object_or_404(ClassGroup, id=group_id, teacher=request.user)
-    students = group.students.all()
-
-    style_labels = {
-        'V': 'Visual',
-        'A': 'Auditivo',
-        'R': 'Lectura/Escritura',
-        'K': 'Kinestésico',
-    }
-
-    student_styles = {}
+    # Una sola consulta para la página: solo las columnas que se muestran y
+    # los resultados de VARK y Chapman anotados con subconsultas
+    students = (
+        group.students.only('id', 'username', 'nickname')
+        .annotate(vark=dominant_category('vark'), chapman=dominant_category('chapman'))
+    )
+    after, before = _page_param(request, 'desde'), _page_param(request, 'antes')
+    students, previous_id, next_id = keyset_page(students, after=after, before=before)
     for student in students:
-        result = UserResult.objects.filter(user=student, questionnaire__title="VARK").first()
-        style_code = result.dominant_category if result else None
-        student_styles[student.id] = style_labels.get(style_code) if style_code else None
+        student.vark_style = VARK_STYLE_LABELS.get(student.vark)
+        student.chapman_label = CHAPMAN_LABELS.get(student.chapman)
 
     return render(request, 'teachers/group_detail.html', {
         'group': group,
         'students': students,
-        'student_styles': student_styles,
+        'previous_id': previous_id,
+        'next_id': next_id,
+        # Un cursor fuera de la lista (p. ej. un enlace viejo) da una página vacía, no un grupo vacío
+        'paged': after is not None or before is not None,
+        'last_page_before': after + 1 if after is not None else None,
     })
 
+def statistics_series(group, slug):
+    """Etiquetas y recuentos del grupo en un cuestionario (una consulta a GroupCategoryStats)."""
+    if slug not in STATISTICS_LABELS:
+        raise Http404("Cuestionario sin estadísticas")
+    counts = group_category_counts(group.id, slug)
+    labels = STATISTICS_LABELS[slug]
+    return [label for _code, label in labels], [counts.get(code, 0) for code, _label in labels]
+
+
 @login_required
 def group_statistics(request, group_id):
     group = get_object_or_404(ClassGroup, id=group_id, teacher=request.user)
 
-    students = group.students.all()
-    results = UserResult.objects.filter(user__in=students, questionnaire__title="VARK")
-
-    counts = {'V': 0, 'A': 0, 'R': 0, 'K': 0}
-    for r in results:
-        counts[r.dominant_category] += 1
-
-    labels = ['Visual', 'Auditivo', 'Lectura/Escritura', 'Kinestésico']
-    data = [counts['V'], counts['A'], counts['R'], counts['K']]
+    labels, data = statistics_series(group, 'vark')
     has_data = any(data)
 
     return render(request, 'teachers/group_statistics.html', {
@@ -80,6 +167,67 @@ def group_statistics(request, group_id):
     'vark_data': has_data,
 })
 
+
+@login_required
+def group_statistics_data(request, group_id):
+    # Mismos datos que la página, en JSON para las gráficas (?test=vark|chapman)
+    group = get_object_or_404(ClassGroup, id=group_id, teacher=request.user)
+    slug = request.GET.get('test', 'vark')
+    labels, data = statistics_series(group, slug)
+    return JsonResponse({'group': group.id, 'test': slug, 'labels': labels, 'data': data, 'total': sum(data)})
+
+@login_required
+def export_groups(request):
+    # ?formato=csv|jsonl y, opcionalmente, ?grupo=<id> (si no, todos los grupos del profesor)
+    if request.user.role != 'teacher':
+        return redirect('login')
+
+    fmt = request.GET.get('formato', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        raise Http404("Formato no válido")
+    group_ids = None
+    if request.GET.get('grupo'):
+        group_id = _page_param(request, 'grupo')
+        if group_id is None:
+            raise Http404("Grupo no válido")
+        group = get_object_or_404(ClassGroup, id=group_id, teacher=request.user)
+        group_ids = [group.id]
+
+    # Las filas se generan mientras se envía la respuesta
+    response = StreamingHttpResponse(
+        iter_export_lines(iter_export_rows(request.user, group_ids), fmt),
+        content_type=EXPORT_FORMATS[fmt],
+    )
+    filename = f"grupos-{timezone.localdate():%Y%m%d}.{fmt}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+@login_required
+def import_group_roster(request, group_id):
+    group = get_object_or_404(ClassGroup, id=group_id, teacher=request.user)
+    report = None
+
+    if request.method == 'POST':
+        form = RosterImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                text = form.cleaned_data['file'].read().decode('utf-8-sig')
+                report = import_roster(group, read_roster_csv(text))
+            except UnicodeDecodeError:
+                form.add_error('file', 'El archivo debe estar en UTF-8.')
+            except RosterImportError as e:
+                form.add_error('file', str(e))
+            else:
+                messages.success(request, 'Importación terminada. Revisa el informe y guarda las contraseñas generadas.')
+    else:
+        form = RosterImportForm()
+
+    return render(request, 'teachers/import_roster.html', {
+        'form': form,
+        'group': group,
+        'report': report,
+    })
+
 @login_required
 def edit_group(request, group_id):
     group = get_object_or_404(ClassGroup, id=group_id, teacher=request.user)
@@ -95,9 +243,18 @@ def edit_group(request, group_id):
 
     return render(request, 'teachers/edit_group.html', {
         'form': form,
-        'group': group
+        'group': group,
+        'members': group.students.only('id', 'username', 'full_name').order_by('id'),
     })
 
+@login_required
+def rotate_invite_code(request, group_id):
+    group = get_object_or_404(ClassGroup, id=group_id, teacher=request.user)
+    if request.method == 'POST':
+        code = group.rotate_invite_code()
+        messages.success(request, f'Nuevo código de invitación: {code}. El anterior ya no sirve.')
+    return redirect('group_detail', group_id=group.id)
+
 @login_required
 def delete_group(request, group_id):
     group = get_object_or_404(ClassGroup, id=group_id, teacher=request.user)
@@ -117,7 +274,7 @@ def student_detail(request, student_id):
     # Obtenemos el resultado del test VARK
     vark_result = UserResult.objects.filter(
         user=student,
-        questionnaire__title="VARK"
+        questionnaire__slug='vark'
     ).first()
 
     # Buscamos el grupo al que pertenece el alumno dentro de los grupos de este profesor
@@ -127,4 +284,40 @@ def student_detail(request, student_id):
         'student': student,
         'vark_result': vark_result,
         'group': group,
-    })
\ No newline at end of file
+    })
+
+# --- PAQUETES DE PALABRAS (El Impostor, Charadas) ---
+# Cada profesor crea y edita los suyos; los que vienen de serie solo se tocan en el admin
+
+@login_required
+def content_packs(request):
+    if request.user.role != 'teacher':
+        return redirect('login')
+
+    packs = ContentPack.objects.filter(created_by=request.user).annotate(words=Count('entries'))
+    return render(request, 'teachers/content_packs.html', {'packs': packs})
+
+@login_required
+def edit_content_pack(request, pack_id=None):
+    if request.user.role != 'teacher':
+        return redirect('login')
+
+    pack = get_object_or_404(ContentPack, id=pack_id, created_by=request.user) if pack_id else None
+    if request.method == 'POST':
+        form = ContentPackForm(request.POST, instance=pack)
+        entries = ContentEntryFormSet(request.POST, instance=form.instance)
+        if form.is_valid() and entries.is_valid():
+            with transaction.atomic():
+                pack = form.save(commit=False)
+                if pack.created_by_id is None:
+                    pack.created_by = request.user
+                pack.save()
+                entries.instance = pack
+                entries.save()
+            messages.success(request, f'Paquete "{pack.name}" guardado.')
+            return redirect('content_packs')
+    else:
+        form = ContentPackForm(instance=pack)
+        entries = ContentEntryFormSet(instance=pack or ContentPack())
+
+    return render(request, 'teachers/edit_content_pack.html', {'form': form, 'entries': entries, 'pack': pack})